@@ -1,7 +1,14 @@
+import io
+import pickle
 import os
+import shutil
+import tempfile
+
+import numpy as np
 
 import neurom as nm
 import neurom.io
+from neurom.io import neurolucida, swc
 import neurom.fst._core
 from neurom.check import neuron_checks as nc
 from neurom.check import structural_checks as sc
@@ -24,6 +31,69 @@ class TimeLoadMorphology(object):
         nm.load_neuron(path)
 
 
+class TimeReadSWC(object):
+    '''Compare the SWC reader to np.loadtxt on a multi-MB file'''
+    def setup(self):
+        data = np.loadtxt(os.path.join(DATA_DIR, 'swc/Neuron.swc'))
+        n_rows, copies = len(data), 200
+        data = np.tile(data, (copies, 1))
+        offsets = np.repeat(np.arange(copies) * n_rows, n_rows)
+        data[:, swc.ID] += offsets
+        data[data[:, swc.P] != -1, swc.P] += offsets[data[:, swc.P] != -1]
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'big.swc')
+        np.savetxt(self.path, data, fmt='%d %d %.5f %.5f %.5f %.5f %d',
+                   header='benchmark SWC file')
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def time_read(self):
+        swc.read(self.path)
+
+    def time_parse(self):
+        with open(self.path, 'rb') as fd:
+            swc._parse(fd.read())
+
+    def time_parse_loadtxt(self):
+        np.loadtxt(self.path)
+
+
+class TimeReadASC(object):
+    '''Compare the Neurolucida reader to the recursive parser on a multi-MB file'''
+    MARKERS = u'''
+(FilledCircle
+  (Color RGB (64, 0, 128))
+  (Name "Marker 11")
+  ( -189.59    55.67    28.68     0.12)  ; 1
+)  ;  End of markers
+'''
+
+    def setup(self):
+        with io.open(os.path.join(DATA_DIR, 'neurolucida/bio_neuron-000.asc'),
+                     encoding='utf-8') as fd:
+            content = fd.read()
+        soma_end = content.index(');') + 2
+        content = (content[:soma_end] +
+                   (content[soma_end:] + self.MARKERS * 100) * 20)
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'big.asc')
+        with io.open(self.path, 'w', encoding='utf-8') as fd:
+            fd.write(content)
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def time_read(self):
+        neurolucida.read(self.path)
+
+    def time_parse_text(self):
+        with io.open(self.path, encoding='utf-8') as fd:
+            neurolucida._parse_text(fd.read())
+
+
 class TimeFeatures(object):
     def setup(self):
         path = os.path.join(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
@@ -173,3 +243,52 @@ class TimeChecks:
 
     def time_has_no_fat_ends(self):
         nc.has_no_fat_ends(self.neuron, multiple_of_mean=2.0, final_point_count=5)
+
+
+class MemPopulation(object):
+    '''Memory used by the section and neurite objects of a large population'''
+    N_NEURONS = 200
+
+    def setup(self):
+        path = os.path.join(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
+        self.data_wrapper = neurom.io.load_data(path)
+
+    def _population(self):
+        # the h5 sections are views of the shared data block, which is counted once
+        return [neurom.fst._core.FstNeuron(self.data_wrapper) for _ in range(self.N_NEURONS)]
+
+    def mem_population(self):
+        return self._population()
+
+    def mem_population_memoized(self):
+        pop = self._population()
+        for neuron in pop:
+            nm.get('section_lengths', neuron)
+            nm.get('total_length_per_neurite', neuron)
+        return pop
+
+    def peakmem_population(self):
+        self._population()
+
+
+class TimePickle(object):
+    '''Pickling of neurons and populations, eg: to send them to worker processes'''
+    def setup(self):
+        self.neuron = nm.load_neuron(os.path.join(DATA_DIR, 'h5/v1/bio_neuron-000.h5'))
+        self.population = nm.load_neurons(os.path.join(DATA_DIR, 'valid_set'))
+        self.pickled_neuron = pickle.dumps(self.neuron, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def time_dump_neuron(self):
+        pickle.dumps(self.neuron, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def time_load_neuron(self):
+        pickle.loads(self.pickled_neuron)
+
+    def time_dump_population(self):
+        pickle.dumps(self.population, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def track_neuron_pickle_size(self):
+        return len(self.pickled_neuron)
+
+    def track_population_pickle_size(self):
+        return len(pickle.dumps(self.population, protocol=pickle.HIGHEST_PROTOCOL))
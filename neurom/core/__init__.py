@@ -28,9 +28,9 @@
 
 ''' Core functionality and data types of NeuroM '''
 
-from .tree import Tree
+from .tree import Tree, TopologyIndex
 from .types import NeuriteType
 from ._soma import Soma, make_soma, SomaError
 from ._neuron import (Section, Neurite, Neuron, iter_neurites,
                       iter_sections, iter_segments, graft_neuron)
-from .population import Population
+from .population import Population, LazyPopulation
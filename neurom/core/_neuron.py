@@ -37,9 +37,10 @@ from neurom import morphmath
 from neurom._compat import filter, map, zip
 from neurom.core._soma import Soma
 from neurom.core.dataformat import COLS
-from neurom.utils import memoize
+from neurom.utils import cached_property, invalidate_cache
 
 from . import NeuriteType, Tree
+from .tree import ITER_MODES, TopologyIndex
 
 
 def iter_neurites(obj, mapfun=None, filt=None):
@@ -83,6 +84,9 @@ def iter_sections(neurites, iterator_type=Tree.ipreorder, neurite_filter=None):
         iterator_type: type of the iteration (ipreorder, iupstream, ibifurcation_point)
         neurite_filter: optional top level filter on properties of neurite neurite objects.
 
+    The sections of Neurite objects are iterated from the cached orders of their topology
+    index when iterator_type is one of neurom.core.tree.ITER_MODES.
+
     Examples:
 
         Get the number of points in each section of all the axons in a neuron population
@@ -93,8 +97,13 @@ def iter_sections(neurites, iterator_type=Tree.ipreorder, neurite_filter=None):
         >>> n_points = [len(s.points) for s in iter_sections(pop,  neurite_filter=filter)]
 
     '''
-    return chain.from_iterable(iterator_type(neurite.root_node)
-                               for neurite in iter_neurites(neurites, filt=neurite_filter))
+    neurites = iter_neurites(neurites, filt=neurite_filter)
+    if iterator_type in ITER_MODES:
+        return chain.from_iterable(neurite.topology.iter_nodes(iterator_type)
+                                   if isinstance(neurite, Neurite) else
+                                   iterator_type(neurite.root_node)
+                                   for neurite in neurites)
+    return chain.from_iterable(iterator_type(neurite.root_node) for neurite in neurites)
 
 
 def iter_segments(obj, neurite_filter=None):
@@ -124,6 +133,7 @@ def graft_neuron(root_section):
 
 class Section(Tree):
     '''Class representing a neurite section'''
+    __slots__ = ('id', 'points', 'type', '_cached_length', '_cached_area', '_cached_volume')
 
     def __init__(self, points, section_id=None, section_type=NeuriteType.undefined):
         super(Section, self).__init__()
@@ -131,31 +141,28 @@ class Section(Tree):
         self.points = points
         self.type = section_type
 
-    @property
-    @memoize
+    @cached_property
     def length(self):
         '''Return the path length of this section.'''
         return morphmath.section_length(self.points)
 
-    @property
-    @memoize
+    @cached_property
     def area(self):
         '''Return the surface area of this section.
 
         The area is calculated from the segments, as defined by this
         section's points
         '''
-        return sum(morphmath.segment_area(s) for s in iter_segments(self))
+        return np.sum(morphmath.segment_areas(self.points[:-1], self.points[1:]))
 
-    @property
-    @memoize
+    @cached_property
     def volume(self):
         '''Return the volume of this section.
 
         The volume is calculated from the segments, as defined by this
         section's points
         '''
-        return sum(morphmath.segment_volume(s) for s in iter_segments(self))
+        return np.sum(morphmath.segment_volumes(self.points[:-1], self.points[1:]))
 
     def __str__(self):
         return 'Section(id=%s, type=%s, n_points=%s) <parent: %s, nchildren: %d>' % \
@@ -164,27 +171,41 @@ class Section(Tree):
     __repr__ = __str__
 
 
+def _shares_first_point(section, parent):
+    '''Check if the first point of section is stored in the last one of parent
+
+    It is the case for sections that are views of consecutive rows of a data block.
+    '''
+    return (len(section.points) > 0 and len(parent.points) > 0 and
+            np.may_share_memory(section.points[:1], parent.points[-1:]))
+
+
 class Neurite(object):
     '''Class representing a neurite tree'''
+    __slots__ = ('root_node', 'type', '_cached_points', '_cached_bounding_box',
+                 '_cached_length', '_cached_area', '_cached_volume', '_cached_topology',
+                 '_cached_section_lengths', '_cached_path_distances')
 
     def __init__(self, root_node):
         self.root_node = root_node
         self.type = root_node.type if hasattr(
             root_node, 'type') else NeuriteType.undefined
 
-    @property
-    @memoize
+    @cached_property
     def points(self):
         '''Return unordered array with all the points in this neurite'''
         # add all points in a section except the first one, which is a duplicate
-        _pts = [v for s in self.root_node.ipreorder()
-                for v in s.points[1:, COLS.XYZR]]
         # except for the very first point, which is not a duplicate
-        _pts.insert(0, self.root_node.points[0][COLS.XYZR])
-        return np.array(_pts)
+        return np.concatenate([self.root_node.points[:1, COLS.XYZR]] +
+                              [s.points[1:, COLS.XYZR] for s in self.root_node.ipreorder()])
 
-    @property
-    @memoize
+    @cached_property
+    def bounding_box(self):
+        '''Return the [[min_x, min_y, min_z], [max_x, max_y, max_z]] box of this neurite'''
+        points = self.points[:, COLS.XYZ]
+        return np.array([np.min(points, axis=0), np.max(points, axis=0)])
+
+    @cached_property
     def length(self):
         '''Return the total length of this neurite.
 
@@ -192,8 +213,7 @@ class Neurite(object):
         '''
         return sum(s.length for s in self.iter_sections())
 
-    @property
-    @memoize
+    @cached_property
     def area(self):
         '''Return the surface area of this neurite.
 
@@ -201,8 +221,7 @@ class Neurite(object):
         '''
         return sum(s.area for s in self.iter_sections())
 
-    @property
-    @memoize
+    @cached_property
     def volume(self):
         '''Return the volume of this neurite.
 
@@ -210,13 +229,62 @@ class Neurite(object):
         '''
         return sum(s.volume for s in self.iter_sections())
 
-    def transform(self, trans):
-        '''Return a copy of this neurite with a 3D transformation applied'''
-        clone = deepcopy(self)
-        for n in clone.iter_sections():
-            n.points[:, 0:3] = trans(n.points[:, 0:3])
+    @cached_property
+    def topology(self):
+        '''Return the TopologyIndex of the sections of this neurite
 
-        return clone
+        It must be invalidated with neurom.utils.invalidate_cache if sections are added.
+        '''
+        return TopologyIndex(self.root_node)
+
+    @cached_property
+    def section_lengths(self):
+        '''Return the lengths of the sections, in the order of topology.nodes'''
+        sections = self.topology.nodes
+        counts = [len(s.points) for s in sections]
+        points = np.concatenate([s.points[:, COLS.XYZ] for s in sections])
+        point_sections = np.repeat(np.arange(len(sections)), counts)
+        # the segments between the last point of a section and the first of the next are not
+        in_section = point_sections[1:] == point_sections[:-1]
+        lengths = np.linalg.norm(np.diff(points, axis=0)[in_section], axis=1)
+        return np.bincount(point_sections[1:][in_section], weights=lengths,
+                           minlength=len(sections))
+
+    @cached_property
+    def path_distances(self):
+        '''Return the path distances from the root to the end of each section
+
+        The sections are in the order of topology.nodes. The path distance of a section is
+        the sum of the lengths of its ancestors and its own, added in a single pass: in
+        pre-order, the ancestors of section i are the sections j such that
+        j <= i < j + subtree_size[j].
+        '''
+        topology = self.topology
+        lengths = self.section_lengths
+        n_sections = len(topology)
+        increments = (np.bincount(np.arange(n_sections), weights=lengths,
+                                  minlength=n_sections + 1) -
+                      np.bincount(np.arange(n_sections) + topology.subtree_size, weights=lengths,
+                                  minlength=n_sections + 1))
+        return np.cumsum(increments[:n_sections])
+
+    def transform(self, trans, inplace=False):
+        '''Return a copy of this neurite with a 3D transformation applied
+
+        If inplace is True, the points of this neurite are transformed instead and
+        the neurite is returned. The cached values of a neuron it belongs to are not updated.
+        '''
+        neurite = self if inplace else deepcopy(self)
+        for n in neurite.iter_sections():
+            points = n.points
+            if inplace and n.parent is not None and _shares_first_point(n, n.parent):
+                # already transformed with the parent section
+                points = points[1:]
+            points[:, 0:3] = trans(points[:, 0:3])
+            invalidate_cache(n)
+        invalidate_cache(neurite)
+
+        return neurite
 
     def iter_sections(self, order=Tree.ipreorder):
         '''iteration over section nodes'''
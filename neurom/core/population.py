@@ -31,6 +31,8 @@
 
 from itertools import chain
 
+from pylru import lrucache
+
 
 class Population(object):
     '''Neuron Population Class
@@ -52,6 +54,23 @@ class Population(object):
         self.neurites = tuple(chain.from_iterable(neu.neurites for neu in neurons))
         self.name = name
 
+    def transform(self, trans, inplace=False):
+        '''Return a population of copies of the neurons with a 3D transformation applied
+
+        If inplace is True, the neurons of this population are transformed instead and
+        the population is returned.
+        '''
+        if not inplace:
+            return Population([neu.transform(trans) for neu in self.neurons], self.name)
+        for neu in self.neurons:
+            neu.transform(trans, inplace=True)
+        self.somata = tuple(neu.soma for neu in self.neurons)
+        return self
+
+    def __reduce__(self):
+        '''Pickle the neurons and the name only, the somata and neurites are theirs'''
+        return Population, (self.neurons, self.name)
+
     def __iter__(self):
         '''Iterator to populations's neurons'''
         return iter(self.neurons)
@@ -66,3 +85,74 @@ class Population(object):
 
     def __str__(self):
         return 'Population <name: %s, nneurons: %d>' % (self.name, len(self.neurons))
+
+
+class LazyPopulation(object):
+    '''Neuron Population Class loading its neurons on demand
+
+    Features:
+        - same interface as Population.
+        - neurons are loaded when accessed, and the last cache_size of them are\
+          kept in an LRU cache.
+        - neurites and somata are iterators over the neurons, so that features\
+          of populations larger than memory can be computed.
+    '''
+    def __init__(self, files, neuron_loader, name='Population', cache_size=16):
+        '''Construct a lazy neuron population
+
+        Arguments:
+            files: sequence of neuron file names.
+            neuron_loader: function taking a filename and returning a neuron.
+            name: Optional name for this Population.
+            cache_size: number of loaded neurons to keep alive.
+        '''
+        self.files = tuple(files)
+        self.neuron_loader = neuron_loader
+        self.name = name
+        self.cache_size = cache_size
+        self._cache = lrucache(cache_size)
+
+    @property
+    def neurons(self):
+        '''The neurons, loaded on demand'''
+        return self
+
+    @property
+    def somata(self):
+        '''Iterator to the somata of the neurons'''
+        return (neu.soma for neu in self)
+
+    @property
+    def neurites(self):
+        '''Iterator to the neurites of the neurons'''
+        return chain.from_iterable(neu.neurites for neu in self)
+
+    def _load(self, filename):
+        '''Get the neuron of a file, from the cache if possible'''
+        try:
+            return self._cache[filename]
+        except KeyError:
+            neuron = self._cache[filename] = self.neuron_loader(filename)
+            return neuron
+
+    def __reduce__(self):
+        '''Pickle the files and the loader, not the cached neurons'''
+        return LazyPopulation, (self.files, self.neuron_loader, self.name, self.cache_size)
+
+    def __iter__(self):
+        '''Iterator to populations's neurons'''
+        return (self._load(f) for f in self.files)
+
+    def __len__(self):
+        '''Length of neuron collection'''
+        return len(self.files)
+
+    def __getitem__(self, idx):
+        '''Get neuron at index idx, or a lazy population if idx is a slice'''
+        if isinstance(idx, slice):
+            return LazyPopulation(self.files[idx], self.neuron_loader,
+                                  name=self.name, cache_size=self.cache_size)
+        return self._load(self.files[idx])
+
+    def __str__(self):
+        return 'LazyPopulation <name: %s, nneurons: %d>' % (self.name, len(self.files))
@@ -124,6 +124,34 @@ def test_iter_sections_ileaf():
                           [n for n in core.iter_sections(POP, iterator_type=Tree.ileaf)])
 
 
+def test_iter_sections_topology_orders():
+    for order in (Tree.ipreorder, Tree.ipostorder, Tree.ileaf,
+                  Tree.iforking_point, Tree.ibifurcation_point):
+        ref = [s for n in POP.neurites for s in order(n.root_node)]
+        assert_sequence_equal(ref, list(core.iter_sections(POP, iterator_type=order)))
+        assert_sequence_equal(ref, [n.topology.nodes[i] for n in POP.neurites
+                                    for i in n.topology.positions(order)])
+
+    # sections of non Neurite objects are iterated with the generators
+    roots = [n.root_node for n in NRN1.neurites]
+    neurites = [core.Neurite(r) for r in roots]
+    ref = [s for n in neurites for s in n.iter_sections(Tree.ileaf)]
+    assert_sequence_equal(ref, list(core.iter_sections([type('N', (object, ), {'root_node': r})
+                                                        for r in roots],
+                                                       iterator_type=Tree.ileaf)))
+
+
+def test_iter_sections_custom_iterator():
+    # iterators that are not topology orders are called on the root sections
+    assert_sequence_equal([n.root_node for n in POP.neurites],
+                          list(core.iter_sections(POP, iterator_type=Tree.iupstream)))
+
+    def children(root):
+        return iter(root.children)
+    assert_sequence_equal([c for n in POP.neurites for c in n.root_node.children],
+                          list(core.iter_sections(POP, iterator_type=children)))
+
+
 def test_iter_segments_nrn():
 
     ref = list(core.iter_segments(NRN1))
@@ -64,6 +64,61 @@ def test_init():
     nt.eq_(len(nrt.points), 13)
 
 
+def test_neurite_slots():
+    nrt = Neurite(ROOT_NODE)
+    nt.ok_(not hasattr(nrt, '__dict__'))
+    nt.assert_almost_equal(nrt.length, REF_LEN)
+
+
+def test_neurite_transform_invalidates_cache():
+    root_node = Section(POINTS0.copy())
+    root_node.add_child(Section(POINTS1.copy()))
+    nrt = Neurite(root_node)
+    nt.assert_almost_equal(nrt.length, REF_LEN)
+    nt.assert_almost_equal(root_node.length, REF_LEN / 2)
+
+    clone = nrt.transform(lambda p: 2 * p)
+    nt.assert_almost_equal(clone.length, 2 * REF_LEN)
+    nt.assert_almost_equal(clone.root_node.length, REF_LEN)
+    nt.eq_(len(clone.points), 13)
+    nt.assert_almost_equal(nrt.length, REF_LEN)
+
+
+def test_neurite_transform_inplace_shared_point():
+    # the child section is a view whose first point is the last point of its parent
+    points = np.vstack((POINTS0, POINTS1[1:]))
+    root_node = Section(points[:7])
+    root_node.add_child(Section(points[6:]))
+    nrt = Neurite(root_node)
+    nt.assert_true(nrt.transform(lambda p: p + [1., 2., 3.], inplace=True) is nrt)
+    np.testing.assert_allclose(points[:, :3], np.vstack((POINTS0, POINTS1[1:]))[:, :3] + [1, 2, 3])
+    nt.assert_almost_equal(nrt.length, REF_LEN)
+
+
+def test_neurite_topology():
+    nrt = Neurite(ROOT_NODE)
+    nt.eq_(nrt.topology.nodes, list(ROOT_NODE.ipreorder()))
+    nt.ok_(nrt.topology is nrt.topology)
+    nt.eq_(nrt.topology.depth.tolist(), [0, 1])
+
+
+def test_neurite_points():
+    nrt = Neurite(ROOT_NODE)
+    np.testing.assert_array_equal(nrt.points, np.vstack((POINTS0, POINTS1[1:])))
+    np.testing.assert_array_equal(nrt.bounding_box, [[0, 0, 0], [6, 0, 6]])
+
+
+def test_neurite_path_distances():
+    root_node = Section(POINTS0)
+    child = Section(POINTS1)
+    root_node.add_child(child)
+    child.add_child(Section(POINTS1[-2:]))
+    root_node.add_child(Section(POINTS0[-3:]))
+    nrt = Neurite(root_node)
+    np.testing.assert_allclose(nrt.section_lengths, [6, 6, 1, 2])
+    np.testing.assert_allclose(nrt.path_distances, [6, 12, 13, 8])
+
+
 def test_neurite_type():
     root_node = Section(POINTS0, section_type=nm.AXON)
     nrt = Neurite(root_node)
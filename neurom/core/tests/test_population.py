@@ -27,15 +27,19 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
+import pickle
 from os.path import join as joinp
 
 from nose import tools as nt
-from neurom.core.population import Population
+from neurom.core.population import LazyPopulation, Population
 from neurom import load_neuron
 
 _path = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = joinp(_path, '../../../test_data')
 
+FILES = [joinp(DATA_PATH, f)
+         for f in ('swc/Neuron.swc', 'swc/Single_basal.swc', 'swc/Neuron_small_radius.swc')]
+
 NRN1 = load_neuron(joinp(DATA_PATH, 'swc/Neuron.swc'))
 NRN2 = load_neuron(joinp(DATA_PATH, 'swc/Single_basal.swc'))
 NRN3 = load_neuron(joinp(DATA_PATH, 'swc/Neuron_small_radius.swc'))
@@ -79,3 +83,67 @@ def test_getitem():
 
 def test_str():
     nt.ok_('Population' in str(POP))
+
+
+def _counting_loader():
+    loaded = []
+
+    def loader(filename):
+        loaded.append(filename)
+        return load_neuron(filename)
+    return loader, loaded
+
+
+def test_lazy_population():
+    loader, loaded = _counting_loader()
+    pop = LazyPopulation(FILES, loader, name='foo', cache_size=2)
+    nt.eq_(loaded, [])
+    nt.eq_(len(pop), 3)
+    nt.eq_(len(pop.neurons), 3)
+    nt.eq_(pop.name, 'foo')
+    nt.eq_(loaded, [])
+
+    nt.eq_([n.name for n in pop], ['Neuron', 'Single_basal', 'Neuron_small_radius'])
+    nt.eq_(len(list(pop.somata)), 3)
+    nt.eq_(len(list(pop.neurites)), TOT_NEURITES)
+    nt.ok_('LazyPopulation' in str(pop))
+
+
+def test_lazy_population_lru():
+    loader, loaded = _counting_loader()
+    pop = LazyPopulation(FILES, loader, cache_size=2)
+    nt.ok_(pop[0] is pop[0])
+    nt.ok_(pop[-1] is pop[2])
+    nt.eq_(loaded, [FILES[0], FILES[2]])
+
+    pop[1]
+    nt.eq_(loaded, [FILES[0], FILES[2], FILES[1]])
+    pop[0]
+    nt.eq_(loaded, [FILES[0], FILES[2], FILES[1], FILES[0]])
+    nt.assert_raises(IndexError, pop.__getitem__, 3)
+
+
+def test_lazy_population_slice():
+    pop = LazyPopulation(FILES, load_neuron)[1:]
+    nt.ok_(isinstance(pop, LazyPopulation))
+    nt.eq_([n.name for n in pop], ['Single_basal', 'Neuron_small_radius'])
+
+
+def test_population_pickle():
+    pop = pickle.loads(pickle.dumps(POP))
+    nt.eq_(pop.name, 'foo')
+    nt.eq_([n.name for n in pop], [n.name for n in POP])
+    nt.eq_(len(pop.somata), 3)
+    nt.eq_(len(pop.neurites), TOT_NEURITES)
+    nt.ok_(pop.neurites[0] is pop.neurons[0].neurites[0])
+
+
+def test_lazy_population_pickle():
+    pop = LazyPopulation(FILES, load_neuron, name='foo', cache_size=2)
+    pop[0]
+    loaded = pickle.loads(pickle.dumps(pop))
+    nt.eq_(loaded.files, pop.files)
+    nt.eq_(loaded.name, 'foo')
+    nt.eq_(loaded.cache_size, 2)
+    nt.eq_(len(loaded._cache), 0)
+    nt.eq_([n.name for n in loaded], ['Neuron', 'Single_basal', 'Neuron_small_radius'])
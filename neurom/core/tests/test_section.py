@@ -27,6 +27,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import math
+from copy import deepcopy
 from nose import tools as nt
 import neurom as nm
 from neurom.core import Section
@@ -88,4 +89,17 @@ def test_section_volume():
     nt.assert_almost_equal(sec.volume, volume)
 
 
+def test_section_slots():
 
+    sec = Section(POINTS, section_id=42, section_type=nm.AXON)
+    nt.ok_(not hasattr(sec, '__dict__'))
+    nt.assert_raises(AttributeError, setattr, sec, 'foo', 1)
+    nt.assert_almost_equal(sec.length, REF_LEN)
+
+    sec.add_child(Section(POINTS))
+    clone = deepcopy(sec)
+    nt.eq_(clone.id, 42)
+    nt.eq_(clone.type, nm.AXON)
+    nt.ok_(clone.children[0].parent is clone)
+    np.testing.assert_array_equal(clone.points, POINTS)
+    nt.assert_almost_equal(clone.length, REF_LEN)
@@ -28,7 +28,7 @@
 
 import sys
 from nose import tools as nt
-from neurom.core.tree import Tree
+from neurom.core.tree import Tree, TopologyIndex
 from neurom._compat import range
 
 REF_TREE = Tree()
@@ -243,3 +243,71 @@ def test_ibifurcation_point_upstream():
 def test_valiter_bifurcation_point():
     nt.ok_(list(REF_TREE2.ibifurcation_point()) ==
            [REF_TREE2, T11_, T12_, T1211_])
+
+
+def test_topology_index():
+    topology = TopologyIndex(REF_TREE2)
+    nodes = list(REF_TREE2.ipreorder())
+    nt.eq_(topology.nodes, nodes)
+    nt.eq_(len(topology), 14)
+    nt.eq_(topology.parents.tolist(),
+           [-1 if n.parent is None else nodes.index(n.parent) for n in nodes])
+    nt.eq_(topology.depth.tolist(), [sum(1 for _ in n.iupstream()) - 1 for n in nodes])
+    nt.eq_(topology.subtree_size.tolist(), [sum(1 for _ in n.ipreorder()) for n in nodes])
+    nt.eq_(topology.n_leaves.tolist(), [sum(1 for _ in n.ileaf()) for n in nodes])
+    nt.eq_(topology.is_leaf.tolist(), [n.is_leaf() for n in nodes])
+    nt.eq_(topology.is_forking_point.tolist(), [n.is_forking_point() for n in nodes])
+    nt.eq_(topology.is_bifurcation_point.tolist(), [n.is_bifurcation_point() for n in nodes])
+    nt.eq_([nodes[i] for i in topology.postorder], list(REF_TREE2.ipostorder()))
+
+    first, second = topology.children_subtree_sizes([0, 1])
+    nt.eq_(first.tolist(), [7, 5])
+    nt.eq_(second.tolist(), [6, 1])
+    first, second = topology.children_n_leaves([0, 1])
+    nt.eq_(first.tolist(), [4, 3])
+    nt.eq_(second.tolist(), [3, 1])
+
+
+def test_topology_index_single_node():
+    topology = TopologyIndex(Tree())
+    nt.eq_(topology.depth.tolist(), [0])
+    nt.eq_(topology.subtree_size.tolist(), [1])
+    nt.eq_(topology.n_leaves.tolist(), [1])
+    nt.eq_(topology.postorder.tolist(), [0])
+
+
+def test_topology_index_orders():
+    topology = TopologyIndex(REF_TREE2)
+    for order in (Tree.ipreorder, Tree.ipostorder, Tree.ileaf,
+                  Tree.iforking_point, Tree.ibifurcation_point):
+        ref = list(order(REF_TREE2))
+        nt.eq_(list(topology.iter_nodes(order)), ref)
+        nt.eq_([topology.nodes[i] for i in topology.positions(order)], ref)
+        nt.ok_(topology.positions(order) is topology.positions(order))
+    nt.assert_raises(ValueError, topology.positions, Tree.iupstream)
+
+
+
+def _recursive_strahler_order(node):
+    if not node.children:
+        return 1
+    orders = sorted((_recursive_strahler_order(c) for c in node.children), reverse=True)
+    return orders[0] + 1 if len(orders) > 1 and orders[1] == orders[0] else orders[0]
+
+
+def test_topology_index_strahler_orders():
+    topology = TopologyIndex(REF_TREE2)
+    nt.eq_(topology.strahler_orders.tolist(),
+           [_recursive_strahler_order(n) for n in topology.nodes])
+    nt.eq_(TopologyIndex(Tree()).strahler_orders.tolist(), [1])
+
+    # deeper than the recursion limit
+    root = node = Tree()
+    for _ in range(5000):
+        child = Tree()
+        node.add_child(child)
+        node.add_child(Tree())
+        node = child
+    orders = TopologyIndex(root).strahler_orders
+    nt.eq_(orders[0], 2)
+    nt.eq_(orders[-1], 1)
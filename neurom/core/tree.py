@@ -29,11 +29,16 @@
 '''Generic tree class and iteration functions'''
 from collections import deque
 
+import numpy as np
+
 from neurom._compat import filter
+from neurom.utils import cached_property
 
 
 class Tree(object):
     '''Simple recursive tree class'''
+    __slots__ = ('parent', 'children')
+
     def __init__(self):
         self.parent = None
         self.children = list()
@@ -117,3 +122,140 @@ class Tree(object):
         return bool(self.children)
 
     __bool__ = __nonzero__
+
+
+class TopologyIndex(object):
+    '''Topology of a tree, as arrays indexed by the pre-order position of its nodes
+
+    The index is built in a single pass over the tree, in O(n). The nodes are in the
+    order of Tree.ipreorder, so that the subtree of node i is the range of nodes
+    [i, i + subtree_size[i]). The subtree sizes and leaf counts serve the partition
+    and tree balance features.
+
+    Attributes:
+        nodes: the tree nodes, in pre-order
+        parents: the position of the parent of each node, -1 for the root
+        n_children: the number of children of each node
+        depth: the number of ancestors of each node, 0 for the root
+        subtree_size: the number of nodes in the subtree of each node, itself included
+        n_leaves: the number of leaves in the subtree of each node
+        is_leaf, is_forking_point, is_bifurcation_point: masks of the nodes
+        postorder: the positions of the nodes in the order of Tree.ipostorder
+        strahler_orders: the Strahler order of each node, computed on first access
+
+    The positions and the nodes in the order of the iteration functions of ITER_MODES are
+    cached, see positions and iter_nodes.
+    '''
+
+    def __init__(self, root):
+        nodes, parents, depth, n_children = [], [], [], []
+        stack = [(root, -1, 0)]
+        while stack:
+            node, parent, node_depth = stack.pop()
+            position = len(nodes)
+            nodes.append(node)
+            parents.append(parent)
+            depth.append(node_depth)
+            n_children.append(len(node.children))
+            stack.extend((child, position, node_depth + 1) for child in reversed(node.children))
+
+        self.nodes = nodes
+        self.parents = np.array(parents, dtype=np.intp)
+        self.depth = np.array(depth, dtype=np.intp)
+        self.n_children = np.array(n_children, dtype=np.intp)
+        self.is_leaf = self.n_children == 0
+        self.is_forking_point = self.n_children > 1
+        self.is_bifurcation_point = self.n_children == 2
+
+        # children follow their parent in pre-order, so a reversed pass accumulates
+        # the size of each subtree before adding it to its parent
+        subtree_size = [1] * len(nodes)
+        for i in range(len(nodes) - 1, 0, -1):
+            subtree_size[parents[i]] += subtree_size[i]
+        self.subtree_size = np.array(subtree_size, dtype=np.intp)
+
+        n_leaves = np.zeros(len(nodes) + 1, dtype=np.intp)
+        np.cumsum(self.is_leaf, out=n_leaves[1:])
+        positions = np.arange(len(nodes))
+        self.n_leaves = n_leaves[positions + self.subtree_size] - n_leaves[positions]
+
+        # a node comes after its descendants and after the preceding nodes that are
+        # not its ancestors in post-order
+        self.postorder = np.empty(len(nodes), dtype=np.intp)
+        self.postorder[positions - self.depth + self.subtree_size - 1] = positions
+
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _order(self, iter_mode):
+        '''Get the cached positions and nodes in the order of iter_mode'''
+        try:
+            return self._orders[iter_mode]
+        except KeyError:
+            try:
+                positions = ITER_MODES[iter_mode](self)
+            except KeyError:
+                raise ValueError('No index of the nodes in the order of %s' % iter_mode)
+            nodes = self.nodes
+            order = self._orders[iter_mode] = (positions, [nodes[i] for i in positions.tolist()])
+            return order
+
+    def positions(self, iter_mode=Tree.ipreorder):
+        '''Get the pre-order positions of the nodes in the order of iter_mode
+
+        iter_mode is one of the iteration functions of ITER_MODES, eg: Tree.ileaf
+        '''
+        return self._order(iter_mode)[0]
+
+    def iter_nodes(self, iter_mode=Tree.ipreorder):
+        '''Iterate over the nodes like iter_mode, one of the functions of ITER_MODES'''
+        return iter(self._order(iter_mode)[1])
+
+    @cached_property
+    def strahler_orders(self):
+        '''The Strahler order of each node, see neurom.fst.sectionfunc.strahler_order
+
+        Like subtree_size, it is computed in a single reversed pre-order pass, in which
+        the children of a node are visited before it.
+        '''
+        parents = self.parents.tolist()
+        n_children = self.n_children.tolist()
+        orders = [1] * len(parents)
+        max_child_order = [0] * len(parents)
+        n_max_children = [0] * len(parents)
+        for i in range(len(parents) - 1, -1, -1):
+            if n_children[i]:
+                orders[i] = max_child_order[i] + (n_max_children[i] > 1)
+            parent = parents[i]
+            if parent != -1:
+                if orders[i] > max_child_order[parent]:
+                    max_child_order[parent] = orders[i]
+                    n_max_children[parent] = 1
+                elif orders[i] == max_child_order[parent]:
+                    n_max_children[parent] += 1
+        return np.array(orders, dtype=np.intp)
+
+    def children_subtree_sizes(self, positions):
+        '''Get the subtree sizes of the first two children of the nodes at positions'''
+        first = np.asarray(positions) + 1
+        second = first + self.subtree_size[first]
+        return self.subtree_size[first], self.subtree_size[second]
+
+    def children_n_leaves(self, positions):
+        '''Get the numbers of leaves of the first two children of the nodes at positions'''
+        first = np.asarray(positions) + 1
+        second = first + self.subtree_size[first]
+        return self.n_leaves[first], self.n_leaves[second]
+
+
+# The iteration functions that TopologyIndex orders the nodes like, with the positions
+# of the nodes they yield, in order
+ITER_MODES = {
+    Tree.ipreorder: lambda index: np.arange(len(index)),
+    Tree.ipostorder: lambda index: index.postorder,
+    Tree.ileaf: lambda index: np.flatnonzero(index.is_leaf),
+    Tree.iforking_point: lambda index: np.flatnonzero(index.is_forking_point),
+    Tree.ibifurcation_point: lambda index: np.flatnonzero(index.is_bifurcation_point),
+}
@@ -46,6 +46,8 @@ from ..core import iter_neurites as _ineurites
 from ..core.types import tree_type_checker as _is_type
 from ..exceptions import NeuroMError
 from ._core import FstNeuron
+from ._columnar import ColumnarPopulation
+from . import _columnar
 
 NEURITEFEATURES = {
     'total_length': _nrt.total_length,
@@ -76,8 +78,11 @@ NEURITEFEATURES = {
     'remote_bifurcation_angles': _nrt.remote_bifurcation_angles,
     'partition': _nrt.bifurcation_partitions,
     'partition_asymmetry': _nrt.partition_asymmetries,
+    'colless_index_per_neurite': _nrt.colless_index_per_neurite,
+    'sackin_index_per_neurite': _nrt.sackin_index_per_neurite,
     'number_of_segments': _nrt.number_of_segments,
     'segment_lengths': _nrt.segment_lengths,
+    'segment_areas': _nrt.segment_areas,
     'segment_volumes': _nrt.segment_volumes,
     'segment_radii': _nrt.segment_radii,
     'segment_midpoints': _nrt.segment_midpoints,
@@ -127,12 +132,17 @@ def get(feature, obj, **kwargs):
     Returns:
         features as a 1D or 2D numpy array.
 
+    The features of a ColumnarPopulation are computed on its arrays if they have
+    a columnar implementation, and on its neurons otherwise.
     '''
+    if isinstance(obj, ColumnarPopulation) and feature in _columnar.FEATURES:
+        return _np.asarray(_columnar.FEATURES[feature](obj, **kwargs))
 
     feature = (NEURITEFEATURES[feature] if feature in NEURITEFEATURES
                else NEURONFEATURES[feature])
 
-    return _np.array(list(feature(obj, **kwargs)))
+    values = feature(obj, **kwargs)
+    return values if isinstance(values, _np.ndarray) else _np.array(list(values))
 
 
 _INDENT = ' ' * 4
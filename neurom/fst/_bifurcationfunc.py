@@ -77,6 +77,12 @@ def remote_bifurcation_angle(bif_point):
                                    bif_point.children[1].points[-1])
 
 
+def _children_subtree_sizes(bif_point):
+    '''Get the numbers of nodes in the two child subtrees of a bifurcation point'''
+    return (float(sum(1 for _ in bif_point.children[0].ipreorder())),
+            float(sum(1 for _ in bif_point.children[1].ipreorder())))
+
+
 def bifurcation_partition(bif_point):
     '''Calculate the partition at a bifurcation point
 
@@ -86,8 +92,7 @@ def bifurcation_partition(bif_point):
     defined as the ratio of the largest number to the smallest number.'''
     assert len(bif_point.children) == 2, 'A bifurcation point must have exactly 2 children'
 
-    n = float(sum(1 for _ in bif_point.children[0].ipreorder()))
-    m = float(sum(1 for _ in bif_point.children[1].ipreorder()))
+    n, m = _children_subtree_sizes(bif_point)
     return max(n, m) / min(n, m)
 
 
@@ -103,6 +108,5 @@ def partition_asymmetry(bif_point):
     at each branch point.'''
     assert len(bif_point.children) == 2, 'A bifurcation point must have exactly 2 children'
 
-    n = float(sum(1 for _ in bif_point.children[0].ipreorder()))
-    m = float(sum(1 for _ in bif_point.children[1].ipreorder()))
+    n, m = _children_subtree_sizes(bif_point)
     return abs(n - m) / abs(n + m)
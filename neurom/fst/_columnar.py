@@ -0,0 +1,311 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+'''Columnar, array based, representation of a population of neurons
+
+The points and the sections of all the neurons are stored in a few concatenated arrays,
+so that the features of a whole population are computed by vectorized operations instead
+of loops over the neurons and their sections.
+'''
+
+import numpy as np
+
+from neurom.core import NeuriteType
+from neurom.core.dataformat import COLS
+from neurom.fst._neuronfunc import neuron_population
+from neurom.utils import cached_property
+
+
+def _concatenate(arrays, dtype=np.intp):
+    '''Concatenate 1D arrays, an empty array if there are none'''
+    return np.concatenate(arrays).astype(dtype) if arrays else np.empty(0, dtype=dtype)
+
+
+def _offsets(sizes):
+    '''Get the offsets of consecutive groups of items of sizes, and the group of each item'''
+    sizes = np.array(sizes, dtype=np.intp)
+    return np.append(0, np.cumsum(sizes)), np.repeat(np.arange(len(sizes)), sizes)
+
+
+def _neurite_sections(neurite, flat, n_points, n_sections):
+    '''Get the starts, stops, parents and branch orders of the sections of a neurite
+
+    The sections are in pre-order, their points are the points of flat offset by n_points
+    and their parents are offset by n_sections.
+    '''
+    topology = neurite.topology
+    ids = [section.id for section in topology.nodes]
+    return (flat.starts[ids] + n_points,
+            flat.stops[ids] + n_points,
+            np.where(topology.parents == -1, -1, topology.parents + n_sections),
+            topology.depth)
+
+
+def _segment_counts(section_starts, section_stops):
+    '''Get the number of segments of each section'''
+    return np.maximum(section_stops - section_starts - 1, 0)
+
+
+class ColumnarPopulation(object):
+    '''Population of neurons stored as concatenated arrays
+
+    The sections of each neurite are contiguous and in pre-order, and the neurites are in
+    the order of the neurites of their neuron, so that the features are in the same order
+    as those of neurom.fst.get on the neurons.
+
+    Attributes:
+        neurons: the neurons the population is built from, used by the features that
+            have no columnar implementation
+        points: the [X, Y, Z, R] points of all the neurons
+        section_starts, section_stops: the range of the points of each section
+        section_parents: the parent section of each section, -1 for the neurite roots
+        section_branch_orders: the branch order of each section
+        section_neurites: the neurite of each section
+        neurite_offsets: the sections of neurite i are neurite_offsets[i]:neurite_offsets[i + 1]
+        neurite_types: the NeuriteType value of each neurite
+        neurite_neurons: the neuron of each neurite
+        neuron_offsets: the neurites of neuron i are neuron_offsets[i]:neuron_offsets[i + 1]
+    '''
+
+    def __init__(self, neurons, name='Population'):
+        '''Construct a columnar population
+
+        Arguments:
+            neurons: a population, a neuron or an iterable of neurons from neurom.fst
+            name: Optional name for this population.
+        '''
+        self.neurons = tuple(neuron_population(neurons) if hasattr(neurons, 'neurites')
+                             else neurons)
+        self.name = name
+
+        points, sections, neurite_types = [], [], []
+        n_points = n_sections = 0
+        for neuron in self.neurons:
+            points.append(neuron.flat.points[:, COLS.XYZR])
+            for neurite in neuron.neurites:
+                sections.append(_neurite_sections(neurite, neuron.flat, n_points, n_sections))
+                neurite_types.append(neurite.type.value)
+                n_sections += len(neurite.topology)
+            n_points += len(neuron.flat.points)
+
+        self.points = (np.concatenate(points).astype(np.float64) if points
+                       else np.empty((0, 4)))
+        starts, stops, parents, orders = zip(*sections) if sections else ((), (), (), ())
+        self.section_starts = _concatenate(starts)
+        self.section_stops = _concatenate(stops)
+        self.section_parents = _concatenate(parents)
+        self.section_branch_orders = _concatenate(orders)
+
+        self.neurite_offsets, self.section_neurites = _offsets([len(o) for o in orders])
+        self.neurite_types = np.array(neurite_types, dtype=np.intp)
+        self.neuron_offsets, self.neurite_neurons = _offsets([len(neuron.neurites)
+                                                              for neuron in self.neurons])
+
+    def __len__(self):
+        return len(self.neurons)
+
+    def __iter__(self):
+        return iter(self.neurons)
+
+    def __getitem__(self, idx):
+        return self.neurons[idx]
+
+    def __str__(self):
+        return 'ColumnarPopulation <name: %s, nneurons: %d>' % (self.name, len(self.neurons))
+
+    @property
+    def somata(self):
+        '''The somata of the neurons'''
+        return tuple(neu.soma for neu in self.neurons)
+
+    @property
+    def neurites(self):
+        '''The neurites of the neurons'''
+        return tuple(n for neu in self.neurons for n in neu.neurites)
+
+    @property
+    def section_neurons(self):
+        '''The neuron of each section'''
+        return self.neurite_neurons[self.section_neurites]
+
+    @cached_property
+    def segment_starts(self):
+        '''The first point of each segment, the second one is the next point'''
+        counts = _segment_counts(self.section_starts, self.section_stops)
+        offsets = np.cumsum(counts) - counts
+        return (np.arange(counts.sum(), dtype=np.intp) +
+                np.repeat(self.section_starts - offsets, counts))
+
+    @cached_property
+    def segment_sections(self):
+        '''The section of each segment'''
+        counts = _segment_counts(self.section_starts, self.section_stops)
+        return np.repeat(np.arange(len(counts)), counts)
+
+    @cached_property
+    def segment_lengths(self):
+        '''The length of each segment'''
+        starts = self.segment_starts
+        return np.linalg.norm(self.points[starts + 1, COLS.XYZ] - self.points[starts, COLS.XYZ],
+                              axis=1)
+
+    @cached_property
+    def section_lengths(self):
+        '''The length of each section'''
+        return np.bincount(self.segment_sections, weights=self.segment_lengths,
+                           minlength=len(self.section_starts))
+
+    def neurite_mask(self, neurite_type=NeuriteType.all):
+        '''Get a boolean mask of the neurites of type neurite_type'''
+        if neurite_type == NeuriteType.all:
+            return np.ones(len(self.neurite_types), dtype=bool)
+        return self.neurite_types == neurite_type.value
+
+    def section_mask(self, neurite_type=NeuriteType.all):
+        '''Get a boolean mask of the sections of the neurites of type neurite_type'''
+        return self.neurite_mask(neurite_type)[self.section_neurites]
+
+    def segment_mask(self, neurite_type=NeuriteType.all):
+        '''Get a boolean mask of the segments of the neurites of type neurite_type'''
+        return self.section_mask(neurite_type)[self.segment_sections]
+
+    def neurite_origins(self):
+        '''The first point of the root section of each neurite'''
+        roots = self.section_starts[self.neurite_offsets[:-1]]
+        return self.points[roots, COLS.XYZ]
+
+
+def _origins(pop, mask, items_neurites, origin):
+    '''Get the origin of each item, the neurite origin if origin is None'''
+    if origin is None:
+        return pop.neurite_origins()[items_neurites[mask]]
+    return np.asarray(origin, dtype=np.float64)[COLS.XYZ]
+
+
+def segment_lengths(pop, neurite_type=NeuriteType.all):
+    '''Lengths of the segments'''
+    return pop.segment_lengths[pop.segment_mask(neurite_type)]
+
+
+def segment_radii(pop, neurite_type=NeuriteType.all):
+    '''Arithmetic mean of the radii of the points of the segments'''
+    starts = pop.segment_starts[pop.segment_mask(neurite_type)]
+    return (pop.points[starts, COLS.R] + pop.points[starts + 1, COLS.R]) / 2.
+
+
+def segment_midpoints(pop, neurite_type=NeuriteType.all):
+    '''Mid-points of the segments'''
+    starts = pop.segment_starts[pop.segment_mask(neurite_type)]
+    return (pop.points[starts, COLS.XYZ] + pop.points[starts + 1, COLS.XYZ]) / 2.
+
+
+def segment_radial_distances(pop, neurite_type=NeuriteType.all, origin=None):
+    '''Distances of the mid-points of the segments to the origin
+
+    The origin is the first point of the neurite of each segment if it is None.
+    '''
+    mask = pop.segment_mask(neurite_type)
+    segment_neurites = pop.section_neurites[pop.segment_sections]
+    midpoints = segment_midpoints(pop, neurite_type)
+    return np.linalg.norm(midpoints - _origins(pop, mask, segment_neurites, origin), axis=1)
+
+
+def number_of_segments(pop, neurite_type=NeuriteType.all):
+    '''Number of segments of each neuron'''
+    segment_neurons = pop.section_neurons[pop.segment_sections]
+    return np.bincount(segment_neurons[pop.segment_mask(neurite_type)],
+                       minlength=len(pop.neurons))
+
+
+def section_lengths(pop, neurite_type=NeuriteType.all):
+    '''Lengths of the sections'''
+    return pop.section_lengths[pop.section_mask(neurite_type)]
+
+
+def section_branch_orders(pop, neurite_type=NeuriteType.all):
+    '''Branch orders of the sections'''
+    return pop.section_branch_orders[pop.section_mask(neurite_type)]
+
+
+def section_radial_distances(pop, neurite_type=NeuriteType.all, origin=None):
+    '''Distances of the end points of the sections to the origin
+
+    The origin is the first point of the neurite of each section if it is None.
+    '''
+    mask = pop.section_mask(neurite_type)
+    end_points = pop.points[pop.section_stops[mask] - 1, COLS.XYZ]
+    return np.linalg.norm(end_points - _origins(pop, mask, pop.section_neurites, origin),
+                          axis=1)
+
+
+def number_of_sections(pop, neurite_type=NeuriteType.all):
+    '''Number of sections of each neuron'''
+    return np.bincount(pop.section_neurons[pop.section_mask(neurite_type)],
+                       minlength=len(pop.neurons))
+
+
+def number_of_neurites(pop, neurite_type=NeuriteType.all):
+    '''Number of neurites of each neuron'''
+    return np.bincount(pop.neurite_neurons[pop.neurite_mask(neurite_type)],
+                       minlength=len(pop.neurons))
+
+
+def number_of_sections_per_neurite(pop, neurite_type=NeuriteType.all):
+    '''Number of sections of each neurite'''
+    return np.diff(pop.neurite_offsets)[pop.neurite_mask(neurite_type)]
+
+
+def total_length(pop, neurite_type=NeuriteType.all):
+    '''Total length of the neurites of each neuron'''
+    mask = pop.section_mask(neurite_type)
+    return np.bincount(pop.section_neurons[mask], weights=pop.section_lengths[mask],
+                       minlength=len(pop.neurons))
+
+
+def total_length_per_neurite(pop, neurite_type=NeuriteType.all):
+    '''Total length of each neurite'''
+    lengths = np.bincount(pop.section_neurites, weights=pop.section_lengths,
+                          minlength=len(pop.neurite_types))
+    return lengths[pop.neurite_mask(neurite_type)]
+
+
+FEATURES = {
+    'segment_lengths': segment_lengths,
+    'segment_radii': segment_radii,
+    'segment_midpoints': segment_midpoints,
+    'segment_radial_distances': segment_radial_distances,
+    'number_of_segments': number_of_segments,
+    'section_lengths': section_lengths,
+    'section_branch_orders': section_branch_orders,
+    'section_radial_distances': section_radial_distances,
+    'number_of_sections': number_of_sections,
+    'number_of_neurites': number_of_neurites,
+    'number_of_sections_per_neurite': number_of_sections_per_neurite,
+    'total_length': total_length,
+    'total_length_per_neurite': total_length_per_neurite,
+    'neurite_lengths': total_length_per_neurite,
+}
@@ -28,43 +28,84 @@
 
 '''Fast neuron IO module'''
 
+import weakref
 from copy import deepcopy
 
 import numpy as np
 
 from neurom.core import (Section, Neurite, Neuron, NeuriteType, SomaError,)
-from neurom.core.dataformat import POINT_TYPE, COLS, ROOT_ID
+from neurom.core.dataformat import COLS, ROOT_ID
 from neurom.core._soma import make_soma, SOMA_CONTOUR, SOMA_CYLINDER
+from neurom.fst._flat import FlatMorphology
+from neurom.io.datawrapper import DataWrapper
+from neurom.utils import cached_property, invalidate_cache
 
 
 class FstNeuron(Neuron):
     '''Class representing a neuron'''
 
     def __init__(self, data_wrapper, name='Neuron'):
+        self.flat = FlatMorphology(data_wrapper)
+        if self.flat.data_block is not data_wrapper.data_block:
+            # keep a single copy of the data block, the one the sections are views of
+            data_wrapper = DataWrapper(self.flat.data_block, data_wrapper.fmt,
+                                       data_wrapper.sections)
         self._data = data_wrapper
-        neurites, sections = make_neurites(self._data)
+        neurites, sections = make_neurites(self._data, self.flat, self)
         soma_check, soma_class = _SOMA_CONFIG[self._data.fmt]
         soma = make_soma(self._data.soma_points(), soma_check, soma_class)
         super(FstNeuron, self).__init__(soma, neurites, sections, name)
-        self._points = None
 
-    @property
+    @cached_property
     def points(self):
         '''Return unordered array with all the points in this neuron'''
-        if self._points is None:
-            _points = self.soma.points.tolist()
-            for n in self.neurites:
-                _points.extend(n.points.tolist())
-            self._points = np.array(_points)
+        return np.concatenate([self.soma.points] + [n.points for n in self.neurites])
 
-        return self._points
+    @cached_property
+    def bounding_box(self):
+        '''Return the [[min_x, min_y, min_z], [max_x, max_y, max_z]] box of this neuron
 
-    def transform(self, trans):
-        '''Return a copy of this neuron with a 3D transformation applied'''
+        It is the box of the bounding boxes of the soma and of the neurites.
+        '''
+        soma_points = self.soma.points[:, COLS.XYZ]
+        boxes = [np.array([np.min(soma_points, axis=0), np.max(soma_points, axis=0)])]
+        boxes.extend(n.bounding_box for n in self.neurites)
+        return np.array([np.min([b[0] for b in boxes], axis=0),
+                         np.max([b[1] for b in boxes], axis=0)])
+
+    def transform(self, trans, inplace=False):
+        '''Return a copy of this neuron with a 3D transformation applied
+
+        If inplace is True, the points of this neuron are transformed instead and
+        the neuron is returned. Note that the data block of the data wrapper the neuron
+        was built from is then modified as well if the neuron shares it.
+        '''
+        if inplace:
+            points = self.flat.points
+            points[:, COLS.XYZ] = trans(points[:, COLS.XYZ])
+            self.points_changed()
+            return self
         _data = deepcopy(self._data)
         _data.data_block[:, 0:3] = trans(_data.data_block[:, 0:3])
         return FstNeuron(_data, self.name)
 
+    def points_changed(self):
+        '''Update the soma and drop the cached values after the points were modified in place'''
+        soma_check, soma_class = _SOMA_CONFIG[self._data.fmt]
+        self.soma = make_soma(self._data.soma_points(), soma_check, soma_class)
+        for section in self.sections:
+            invalidate_cache(section)
+        for neurite in self.neurites:
+            invalidate_cache(neurite)
+        invalidate_cache(self)
+
+    def __reduce__(self):
+        '''Pickle the data wrapper and the name only, the neuron is built again when loaded
+
+        It avoids pickling the trees of sections, which is slow and recursive.
+        '''
+        return FstNeuron, (self._data, self.name)
+
     def __deepcopy__(self, memo):
         '''Deep-copy neuron object
 
@@ -75,42 +116,73 @@ class FstNeuron(Neuron):
         return FstNeuron(deepcopy(self._data, memo), self.name)
 
 
-def make_neurites(rdw):
-    '''Build neurite trees from a raw data wrapper'''
-    post_action = _NEURITE_ACTION[rdw.fmt]
-    trunks = rdw.neurite_root_section_ids()
-    if not trunks:
+class FstNeurite(Neurite):
+    '''Class representing a neurite of an FstNeuron
+
+    Its sections are views of the points of the FlatMorphology of the neuron, which
+    is referenced weakly.
+    '''
+    __slots__ = ('_neuron', )
+
+    def __init__(self, root_node, neuron):
+        super(FstNeurite, self).__init__(root_node)
+        self._neuron = weakref.ref(neuron)
+
+    def transform(self, trans, inplace=False):
+        '''Return a copy of this neurite with a 3D transformation applied
+
+        If inplace is True, the rows of the points this neurite owns in the data block of
+        its neuron, and their copies, are transformed instead, see FlatMorphology.point_rows,
+        the neuron is updated, see FstNeuron.points_changed, and the neurite is returned.
+        The soma point the neurite may start with is not transformed.
+        '''
+        neuron = self._neuron()
+        if not inplace or neuron is None:
+            return super(FstNeurite, self).transform(trans, inplace)
+        rows = neuron.flat.point_rows([s.id for s in self.iter_sections()])
+        points = neuron.flat.points
+        points[rows, COLS.XYZ] = trans(points[rows, COLS.XYZ])
+        neuron.points_changed()
+        return self
+
+    def __reduce__(self):
+        '''Pickle the sections only, the neuron is not referenced by the loaded neurite'''
+        return Neurite, (self.root_node, )
+
+
+def make_neurites(rdw, flat=None, neuron=None):
+    '''Build neurite trees from a raw data wrapper
+
+    The points of the sections are views of the points of flat, the FlatMorphology
+    of rdw, built if not given. The neurites are FstNeurites of neuron if given.
+    '''
+    if flat is None:
+        flat = FlatMorphology(rdw)
+    if not len(flat.neurite_roots):
         return [], []
 
+    post_action = _NEURITE_ACTION[rdw.fmt]
+    if post_action is not None:
+        post_action(flat)
+
     # One pass over sections to build nodes
     nodes = tuple(Section(section_id=i,
-                          points=rdw.data_block[sec.ids],
-                          section_type=_TREE_TYPES[sec.ntype])
-                  for i, sec in enumerate(rdw.sections))
+                          points=flat.points[start:stop],
+                          section_type=_TREE_TYPES[section_type])
+                  for i, (start, stop, section_type) in
+                  enumerate(zip(flat.starts.tolist(), flat.stops.tolist(), flat.types.tolist())))
 
     # One pass over nodes to connect children to parents
-    for i, node in enumerate(nodes):
-        parent_id = rdw.sections[i].pid
-        parent_type = nodes[parent_id].type
-        # only connect neurites
-        if parent_id != ROOT_ID and parent_type != NeuriteType.soma:
-            nodes[parent_id].add_child(node)
-
-    neurites = tuple(Neurite(nodes[i]) for i in trunks)
+    for i, parent_id in enumerate(flat.parents.tolist()):
+        if parent_id != ROOT_ID:
+            nodes[parent_id].add_child(nodes[i])
 
-    if post_action is not None:
-        for n in neurites:
-            post_action(n.root_node)
+    neurites = tuple(Neurite(nodes[i]) if neuron is None else FstNeurite(nodes[i], neuron)
+                     for i in flat.neurite_roots.tolist())
 
     return neurites, nodes
 
 
-def _remove_soma_initial_point(tree):
-    '''Remove tree's initial point if soma'''
-    if tree.points[0][COLS.TYPE] == POINT_TYPE.SOMA:
-        tree.points = tree.points[1:]
-
-
 def _check_soma_topology_swc(points):
     '''check if points form valid soma
 
@@ -125,10 +197,10 @@ def _check_soma_topology_swc(points):
         raise SomaError("Bifurcating soma")
 
 
-_TREE_TYPES = tuple(NeuriteType)
+_TREE_TYPES = dict((t.value, t) for t in NeuriteType)
 
 _NEURITE_ACTION = {
-    'SWC': _remove_soma_initial_point,
+    'SWC': FlatMorphology.remove_soma_initial_point,
     'H5V1': None,
     'H5V2': None,
     'NL-ASCII': None,
@@ -0,0 +1,191 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Array based representation of the sections of a neuron'''
+
+import numpy as np
+
+from neurom.core import NeuriteType
+from neurom.core.dataformat import COLS, POINT_TYPE, ROOT_ID
+from neurom.io.datawrapper import IS_SLICE, NTYPE, SECTION_PID, START, STOP, sections_to_table
+
+# NeuriteType value of each DataBlockSection ntype
+_NEURITE_TYPES = np.array([t.value for t in NeuriteType])
+
+
+def _section_rows(sections):
+    '''Get the arrays describing a list of DataBlockSection
+
+    Returns:
+        rows: the data block rows of the sections, concatenated
+        counts, ntypes, pids: the number of rows, the type and the parent of each section
+    '''
+    table, section_ids = sections_to_table(sections)
+    starts = table[:, START].astype(np.intp)
+    counts = table[:, STOP].astype(np.intp) - starts
+
+    # the rows of a slice section are consecutive from its start, the rows of the other
+    # sections are the consecutive section_ids from their start
+    offsets = np.cumsum(counts) - counts
+    rows = np.arange(counts.sum(), dtype=np.intp) + np.repeat(starts - offsets, counts)
+    listed = np.repeat(table[:, IS_SLICE] == 0, counts)
+    rows[listed] = section_ids[rows[listed]]
+    return (rows, counts,
+            table[:, NTYPE].astype(np.intp), table[:, SECTION_PID].astype(np.intp))
+
+
+class FlatMorphology(object):
+    '''Flat, array based, description of the sections of a neuron
+
+    The sections are indexed by their position in the data wrapper, which is also the id
+    of the corresponding neurom.core.Section.
+
+    The sections whose points are a range of consecutive rows of the data block are views
+    of it. The points of the other sections, eg: the SWC sections whose first point is the
+    last point of a parent that isn't the previous section, are copied once after the rows
+    of the data block.
+
+    Attributes:
+        points: the rows of the data block, followed by the points of the sections that
+            are not ranges of its rows, it is the data block itself if there are none
+        data_block: the rows of points that are the data block, the data block itself
+            if there are no copied sections
+        starts, stops: the range of the rows of each section in points
+        parents: the parent section of each section, -1 for the sections connected to
+            the soma and for the soma sections
+        pids: the parent section of each section in the data wrapper, the soma sections
+            included, -1 for the sections without parent
+        copied_rows: the row of the data block of each point after its rows
+        types: the NeuriteType value of each section
+        children_offsets, children: the children of section i are
+            children[children_offsets[i]:children_offsets[i + 1]], in increasing order
+        neurite_roots: the root section of each neurite
+    '''
+
+    def __init__(self, rdw):
+        rows, counts, ntypes, pids = _section_rows(rdw.sections)
+        self._set_points(np.asarray(rdw.data_block), rows, counts)
+
+        n_sections = len(rdw.sections)
+        self.types = _NEURITE_TYPES[ntypes]
+
+        self.pids = pids
+        connected = pids != ROOT_ID
+        connected[connected] = self.types[pids[connected]] != NeuriteType.soma
+        self.parents = np.where(connected, pids, ROOT_ID)
+
+        child_sections = np.flatnonzero(connected)
+        child_parents = self.parents[child_sections]
+        self.children = child_sections[np.argsort(child_parents, kind='mergesort')]
+        self.children_offsets = np.zeros(n_sections + 1, dtype=np.intp)
+        np.cumsum(np.bincount(child_parents, minlength=n_sections),
+                  out=self.children_offsets[1:])
+
+        self.neurite_roots = np.flatnonzero(~connected &
+                                            (pids != ROOT_ID) &
+                                            (ntypes != POINT_TYPE.SOMA))
+
+    def _set_points(self, data_block, rows, counts):
+        '''Set the points and the section ranges, with the fewest copied points'''
+        offsets = np.cumsum(counts) - counts
+        n_rows = len(data_block)
+
+        # a section is a range of rows if there is no gap between its consecutive rows
+        n_gaps = np.zeros(len(rows) + 2, dtype=np.intp)
+        np.cumsum(np.diff(rows) != 1, out=n_gaps[2:len(rows) + 1])
+        is_range = (counts < 2) | (n_gaps[offsets + counts] == n_gaps[offsets + 1])
+        copied = ~is_range
+
+        self.starts = np.where(is_range & (counts > 0), np.append(rows, 0)[offsets], 0)
+        if np.any(copied):
+            copied_rows = np.repeat(copied, counts)
+            self.points = np.empty((n_rows + copied_rows.sum(), ) + data_block.shape[1:],
+                                   dtype=data_block.dtype)
+            self.points[:n_rows] = data_block
+            self.copied_rows = rows[copied_rows]
+            self.points[n_rows:] = data_block[self.copied_rows]
+            self.data_block = self.points[:n_rows]
+            self.starts[copied] = n_rows + np.cumsum(counts[copied]) - counts[copied]
+        else:
+            self.points = self.data_block = data_block
+            self.copied_rows = np.empty(0, dtype=np.intp)
+        self.stops = self.starts + counts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def section_points(self, section_id):
+        '''Get the points of a section, a view of points'''
+        return self.points[self.starts[section_id]:self.stops[section_id]]
+
+    def _data_rows(self, rows):
+        '''Get the rows of the data block the rows of points are, or are copies of'''
+        n_rows = len(self.data_block)
+        is_copy = rows >= n_rows
+        if np.any(is_copy):
+            rows = rows.copy()
+            rows[is_copy] = self.copied_rows[rows[is_copy] - n_rows]
+        return rows
+
+    def point_rows(self, section_ids):
+        '''Get the rows of points holding the points owned by sections
+
+        A section owns its points, but its first one if it is the last point of its
+        parent in the data wrapper, eg: the soma point the neurites of an ASC file start
+        with. The rows of the data block the owned points are copies of, and the copies
+        of the rows of the data block, are included, so that modifying the points of the
+        rows keeps the copies up to date.
+        '''
+        section_ids = np.asarray(section_ids, dtype=np.intp)
+        starts = self.starts[section_ids]
+        counts = self.stops[section_ids] - starts
+        offsets = np.cumsum(counts) - counts
+        rows = self._data_rows(np.arange(counts.sum(), dtype=np.intp) +
+                               np.repeat(starts - offsets, counts))
+
+        pids = self.pids[section_ids]
+        has_parent = (pids != ROOT_ID) & (counts > 0)
+        has_parent[has_parent] = self.stops[pids[has_parent]] > self.starts[pids[has_parent]]
+        parent_ends = self._data_rows(self.stops[pids[has_parent]] - 1)
+        shared = offsets[has_parent][rows[offsets[has_parent]] == parent_ends]
+        rows = np.unique(np.delete(rows, shared))
+
+        return np.append(rows, len(self.data_block) +
+                         np.flatnonzero(np.in1d(self.copied_rows, rows)))
+
+    def section_children(self, section_id):
+        '''Get the children sections of a section'''
+        return self.children[self.children_offsets[section_id]:
+                             self.children_offsets[section_id + 1]]
+
+    def remove_soma_initial_point(self):
+        '''Remove the first point of the neurite root sections if it is a soma point'''
+        roots = self.neurite_roots[self.stops[self.neurite_roots] >
+                                   self.starts[self.neurite_roots]]
+        is_soma = self.points[self.starts[roots], COLS.TYPE] == POINT_TYPE.SOMA
+        self.starts[roots[is_soma]] += 1
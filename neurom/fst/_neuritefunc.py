@@ -66,19 +66,34 @@ def n_sections(neurites, neurite_type=NeuriteType.all, iterator_type=Tree.ipreor
                                         neurite_filter=is_type(neurite_type)))
 
 
+def _map_neurites(fun, neurites, neurite_type):
+    '''Concatenate the arrays of fun applied to the neurites of a type'''
+    values = [fun(n) for n in iter_neurites(neurites, filt=is_type(neurite_type))]
+    values = [v for v in values if len(v)]  # no value at all gives an empty float array
+    return np.concatenate(values) if values else np.array([])
+
+
+def _map_topology(fun, neurites, neurite_type):
+    '''Concatenate the arrays `fun` returns for the TopologyIndex of each neurite'''
+    return _map_neurites(lambda n: fun(n.topology), neurites, neurite_type)
+
+
 def n_bifurcation_points(neurites, neurite_type=NeuriteType.all):
     '''number of bifurcation points in a collection of neurites'''
-    return n_sections(neurites, neurite_type=neurite_type, iterator_type=Tree.ibifurcation_point)
+    return int(sum(np.count_nonzero(n.topology.is_bifurcation_point)
+                   for n in iter_neurites(neurites, filt=is_type(neurite_type))))
 
 
 def n_forking_points(neurites, neurite_type=NeuriteType.all):
     '''number of forking points in a collection of neurites'''
-    return n_sections(neurites, neurite_type=neurite_type, iterator_type=Tree.iforking_point)
+    return int(sum(np.count_nonzero(n.topology.is_forking_point)
+                   for n in iter_neurites(neurites, filt=is_type(neurite_type))))
 
 
 def n_leaves(neurites, neurite_type=NeuriteType.all):
     '''number of leaves points in a collection of neurites'''
-    return n_sections(neurites, neurite_type=neurite_type, iterator_type=Tree.ileaf)
+    return int(sum(np.count_nonzero(n.topology.is_leaf)
+                   for n in iter_neurites(neurites, filt=is_type(neurite_type))))
 
 
 def total_area_per_neurite(neurites, neurite_type=NeuriteType.all):
@@ -96,62 +111,41 @@ def map_sections(fun, neurites, neurite_type=NeuriteType.all, iterator_type=Tree
                                   neurite_filter=is_type(neurite_type)))
 
 
-def _section_length(section):
-    '''get section length of `section`'''
-    return morphmath.section_length(section.points)
-
-
 def section_lengths(neurites, neurite_type=NeuriteType.all):
     '''section lengths in a collection of neurites'''
-    return map_sections(_section_length, neurites, neurite_type=neurite_type)
+    return _sum_segment_kernel(morphmath.segment_lengths, neurites, neurite_type)
 
 
 def section_term_lengths(neurites, neurite_type=NeuriteType.all):
     '''Termination section lengths in a collection of neurites'''
-    return map_sections(_section_length, neurites, neurite_type=neurite_type,
-                        iterator_type=Tree.ileaf)
+    return _sum_segment_kernel(morphmath.segment_lengths, neurites, neurite_type,
+                               iterator_type=Tree.ileaf)
 
 
 def section_bif_lengths(neurites, neurite_type=NeuriteType.all):
     '''Bifurcation section lengths in a collection of neurites'''
-    return map_sections(_section_length, neurites, neurite_type=neurite_type,
-                        iterator_type=Tree.ibifurcation_point)
+    return _sum_segment_kernel(morphmath.segment_lengths, neurites, neurite_type,
+                               iterator_type=Tree.ibifurcation_point)
 
 
 def section_branch_orders(neurites, neurite_type=NeuriteType.all):
     '''section branch orders in a collection of neurites'''
-    return map_sections(sectionfunc.branch_order, neurites, neurite_type=neurite_type)
+    return _map_topology(lambda t: t.depth, neurites, neurite_type)
 
 
 def section_bif_branch_orders(neurites, neurite_type=NeuriteType.all):
     '''Bifurcation section branch orders in a collection of neurites'''
-    return map_sections(sectionfunc.branch_order, neurites, neurite_type=neurite_type,
-                        iterator_type=Tree.ibifurcation_point)
+    return _map_topology(lambda t: t.depth[t.is_bifurcation_point], neurites, neurite_type)
 
 
 def section_term_branch_orders(neurites, neurite_type=NeuriteType.all):
     '''Termination section branch orders in a collection of neurites'''
-    return map_sections(sectionfunc.branch_order, neurites, neurite_type=neurite_type,
-                        iterator_type=Tree.ileaf)
+    return _map_topology(lambda t: t.depth[t.is_leaf], neurites, neurite_type)
 
 
 def section_path_lengths(neurites, neurite_type=NeuriteType.all):
     '''Path lengths of a collection of neurites '''
-    # Calculates and stores the section lengths in one pass,
-    # then queries the lengths in the path length iterations.
-    # This avoids repeatedly calculating the lengths of the
-    # same sections.
-    dist = {}
-    neurite_filter = is_type(neurite_type)
-
-    for s in iter_sections(neurites, neurite_filter=neurite_filter):
-        dist[s] = s.length
-
-    def pl2(node):
-        '''Calculate the path length using cached section lengths'''
-        return sum(dist[n] for n in node.iupstream())
-
-    return map_sections(pl2, neurites, neurite_type=neurite_type)
+    return _map_neurites(lambda n: n.path_distances, neurites, neurite_type)
 
 
 def map_neurons(fun, neurites, neurite_type):
@@ -201,32 +195,56 @@ def map_segments(func, neurites, neurite_type):
     ]
 
 
+def _segments(neurites, neurite_type=NeuriteType.all, iterator_type=Tree.ipreorder):
+    '''Get the segments of the sections of a collection of neurites as arrays
+
+    The points of all the sections are concatenated once, so that the segment kernels of
+    morphmath compute the values of all the segments in single array operations.
+
+    Returns:
+        begins, ends: the [X, Y, Z, R] begin and end points of the segments
+        segment_sections: the position of the section of each segment in the iteration
+        section_count: the number of iterated sections
+    '''
+    sections = list(iter_sections(neurites,
+                                  iterator_type=iterator_type,
+                                  neurite_filter=is_type(neurite_type)))
+    begins, ends, segment_sections = sectionfunc.segment_arrays(sections)
+    return begins, ends, segment_sections, len(sections)
+
+
+def _map_segment_kernel(kernel, neurites, neurite_type):
+    '''Apply a segment kernel of morphmath to the segments of a collection of neurites'''
+    begins, ends, _, _ = _segments(neurites, neurite_type)
+    return kernel(begins, ends)
+
+
+def _sum_segment_kernel(kernel, neurites, neurite_type, iterator_type=Tree.ipreorder):
+    '''Sum a segment kernel of morphmath over the segments of each section'''
+    begins, ends, segment_sections, section_count = _segments(neurites, neurite_type,
+                                                              iterator_type)
+    sums = np.bincount(segment_sections, weights=kernel(begins, ends), minlength=section_count)
+    return sums.astype(float, copy=False)  # bincount of no segment is an int array
+
+
 def segment_lengths(neurites, neurite_type=NeuriteType.all):
     '''Lengths of the segments in a collection of neurites'''
-    def _seg_len(sec):
-        '''list of segment lengths of a section'''
-        return np.linalg.norm(np.diff(sec.points[:, COLS.XYZ], axis=0), axis=1)
+    return _map_segment_kernel(morphmath.segment_lengths, neurites, neurite_type)
+
 
-    return map_segments(_seg_len, neurites, neurite_type)
+def segment_areas(neurites, neurite_type=NeuriteType.all):
+    '''Areas of the segments in a collection of neurites'''
+    return _map_segment_kernel(morphmath.segment_areas, neurites, neurite_type)
 
 
 def segment_volumes(neurites, neurite_type=NeuriteType.all):
     '''Volumes of the segments in a collection of neurites'''
-    def _func(sec):
-        '''list of segment volumes of a section'''
-        return [morphmath.segment_volume(seg) for seg in zip(sec.points[:-1], sec.points[1:])]
-
-    return map_segments(_func, neurites, neurite_type)
+    return _map_segment_kernel(morphmath.segment_volumes, neurites, neurite_type)
 
 
 def segment_radii(neurites, neurite_type=NeuriteType.all):
     '''arithmetic mean of the radii of the points in segments in a collection of neurites'''
-    def _seg_radii(sec):
-        '''vectorized mean radii'''
-        pts = sec.points[:, COLS.R]
-        return np.divide(np.add(pts[:-1], pts[1:]), 2.0)
-
-    return map_segments(_seg_radii, neurites, neurite_type)
+    return _map_segment_kernel(morphmath.segment_radii, neurites, neurite_type)
 
 
 def segment_taper_rates(neurites, neurite_type=NeuriteType.all):
@@ -234,14 +252,7 @@ def segment_taper_rates(neurites, neurite_type=NeuriteType.all):
 
     The taper rate is defined as the absolute radii differences divided by length of the section
     '''
-    def _seg_taper_rates(sec):
-        '''vectorized taper rates'''
-        pts = sec.points[:, COLS.XYZR]
-        diff = np.diff(pts, axis=0)
-        distance = np.linalg.norm(diff[:, COLS.XYZ], axis=1)
-        return np.divide(2 * np.abs(diff[:, COLS.R]), distance)
-
-    return map_segments(_seg_taper_rates, neurites, neurite_type)
+    return _map_segment_kernel(morphmath.segment_taper_rates, neurites, neurite_type)
 
 
 def segment_meander_angles(neurites, neurite_type=NeuriteType.all):
@@ -252,27 +263,18 @@ def segment_meander_angles(neurites, neurite_type=NeuriteType.all):
 
 def segment_midpoints(neurites, neurite_type=NeuriteType.all):
     '''Return a list of segment mid-points in a collection of neurites'''
-    def _seg_midpoint(sec):
-        '''Return the mid-points of segments in a section'''
-        pts = sec.points[:, COLS.XYZ]
-        return np.divide(np.add(pts[:-1], pts[1:]), 2.0)
-
-    return map_segments(_seg_midpoint, neurites, neurite_type)
+    return _map_segment_kernel(morphmath.segment_midpoints, neurites, neurite_type)
 
 
 def segment_radial_distances(neurites, neurite_type=NeuriteType.all, origin=None):
     '''Lengths of the segments in a collection of neurites'''
-    def _seg_rd(sec, pos):
-        '''list of radial distances of all segments of a section'''
-        mid_pts = np.divide(np.add(sec.points[:-1], sec.points[1:])[:, :3], 2.0)
-        return np.sqrt([morphmath.point_dist2(p, pos) for p in mid_pts])
-
     dist = []
     for n in iter_neurites(neurites, filt=is_type(neurite_type)):
         pos = n.root_node.points[0] if origin is None else origin
-        dist.extend([s for ss in n.iter_sections() for s in _seg_rd(ss, pos)])
+        midpoints = _map_segment_kernel(morphmath.segment_midpoints, n, NeuriteType.all)
+        dist.append(np.linalg.norm(midpoints - np.asarray(pos)[COLS.XYZ], axis=1))
 
-    return dist
+    return np.concatenate(dist) if dist else np.array([])
 
 
 def local_bifurcation_angles(neurites, neurite_type=NeuriteType.all):
@@ -292,19 +294,57 @@ def remote_bifurcation_angles(neurites, neurite_type=NeuriteType.all):
 
 
 def bifurcation_partitions(neurites, neurite_type=NeuriteType.all):
-    '''Partition at bifurcation points of a collection of neurites'''
-    return map(_bifurcationfunc.bifurcation_partition,
-               iter_sections(neurites,
-                             iterator_type=Tree.ibifurcation_point,
-                             neurite_filter=is_type(neurite_type)))
+    '''Partition at bifurcation points of a collection of neurites
+
+    See _bifurcationfunc.bifurcation_partition
+    '''
+    def _partitions(topology):
+        '''partitions of the bifurcation points of a neurite'''
+        n, m = topology.children_subtree_sizes(np.flatnonzero(topology.is_bifurcation_point))
+        return np.true_divide(np.maximum(n, m), np.minimum(n, m))
+
+    return _map_topology(_partitions, neurites, neurite_type)
 
 
 def partition_asymmetries(neurites, neurite_type=NeuriteType.all):
-    '''Partition asymmetry at bifurcation points of a collection of neurites'''
-    return map(_bifurcationfunc.partition_asymmetry,
-               iter_sections(neurites,
-                             iterator_type=Tree.ibifurcation_point,
-                             neurite_filter=is_type(neurite_type)))
+    '''Partition asymmetry at bifurcation points of a collection of neurites
+
+    See _bifurcationfunc.partition_asymmetry
+    '''
+    def _asymmetries(topology):
+        '''partition asymmetries of the bifurcation points of a neurite'''
+        n, m = topology.children_subtree_sizes(np.flatnonzero(topology.is_bifurcation_point))
+        return np.true_divide(np.abs(n - m), n + m)
+
+    return _map_topology(_asymmetries, neurites, neurite_type)
+
+
+def colless_index_per_neurite(neurites, neurite_type=NeuriteType.all):
+    '''Colless indices of the neurites in a collection
+
+    The Colless index of a neurite is the sum over its bifurcation points of the absolute
+    difference of the numbers of leaves of the two child subtrees. It is 0 for perfectly
+    balanced neurites.
+    '''
+    def _colless_index(topology):
+        '''Colless index of a neurite'''
+        n, m = topology.children_n_leaves(np.flatnonzero(topology.is_bifurcation_point))
+        return np.sum(np.abs(n - m))
+
+    return np.array([_colless_index(n.topology)
+                     for n in iter_neurites(neurites, filt=is_type(neurite_type))],
+                    dtype=np.intp)
+
+
+def sackin_index_per_neurite(neurites, neurite_type=NeuriteType.all):
+    '''Sackin indices of the neurites in a collection
+
+    The Sackin index of a neurite is the sum over its leaves of their numbers of
+    ancestors, ie: the sum of the branch orders of the terminal sections.
+    '''
+    return np.array([np.sum(n.topology.depth[n.topology.is_leaf])
+                     for n in iter_neurites(neurites, filt=is_type(neurite_type))],
+                    dtype=np.intp)
 
 
 def section_radial_distances(neurites, neurite_type=NeuriteType.all, origin=None):
@@ -320,8 +360,7 @@ def section_radial_distances(neurites, neurite_type=NeuriteType.all, origin=None
 
 def number_of_sections_per_neurite(neurites, neurite_type=NeuriteType.all):
     '''Get the number of sections per neurite in a collection of neurites'''
-    return list(sum(1 for _ in n.iter_sections())
-                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+    return list(len(n.topology) for n in iter_neurites(neurites, filt=is_type(neurite_type)))
 
 
 def total_length_per_neurite(neurites, neurite_type=NeuriteType.all):
@@ -332,9 +371,7 @@ def total_length_per_neurite(neurites, neurite_type=NeuriteType.all):
 
 def terminal_path_lengths_per_neurite(neurites, neurite_type=NeuriteType.all):
     '''Get the path lengths to each terminal point per neurite in a collection'''
-    return list(sectionfunc.section_path_length(s)
-                for n in iter_neurites(neurites, filt=is_type(neurite_type))
-                for s in iter_sections(n, iterator_type=Tree.ileaf))
+    return _map_neurites(lambda n: n.path_distances[n.topology.is_leaf], neurites, neurite_type)
 
 
 def total_volume_per_neurite(neurites, neurite_type=NeuriteType.all):
@@ -359,12 +396,12 @@ def neurite_volume_density(neurites, neurite_type=NeuriteType.all):
 
 def section_volumes(neurites, neurite_type=NeuriteType.all):
     '''section volumes in a collection of neurites'''
-    return map_sections(sectionfunc.section_volume, neurites, neurite_type=neurite_type)
+    return _sum_segment_kernel(morphmath.segment_volumes, neurites, neurite_type)
 
 
 def section_areas(neurites, neurite_type=NeuriteType.all):
     '''section areas in a collection of neurites'''
-    return map_sections(sectionfunc.section_area, neurites, neurite_type=neurite_type)
+    return _sum_segment_kernel(morphmath.segment_areas, neurites, neurite_type)
 
 
 def section_tortuosity(neurites, neurite_type=NeuriteType.all):
@@ -384,5 +421,5 @@ def principal_direction_extents(neurites, neurite_type=NeuriteType.all, directio
 
 
 def section_strahler_orders(neurites, neurite_type=NeuriteType.all):
-    '''Inter-segment opening angles in a section'''
-    return map_sections(sectionfunc.strahler_order, neurites, neurite_type)
+    '''Strahler orders of the sections in a collection of neurites'''
+    return _map_topology(lambda t: t.strahler_orders, neurites, neurite_type)
@@ -34,8 +34,9 @@ from neurom.geom import bounding_box
 from neurom.core.types import NeuriteType
 from neurom.core.types import tree_type_checker as is_type
 from neurom.core.dataformat import COLS
-from neurom.core._neuron import iter_neurites, iter_segments
+from neurom.core._neuron import iter_sections
 from neurom import morphmath
+from neurom.fst import sectionfunc
 
 
 def neuron_population(nrns):
@@ -140,69 +141,101 @@ def trunk_origin_elevations(nrn, neurite_type=NeuriteType.all):
             for s in n.neurites if neurite_filter(s)]
 
 
-def sholl_crossings(neurites, center, radii):
+def _sholl_distances2(neurites, center, planar=False, neurite_filter=None):
+    '''Get the sorted squared distances of the nearest and farthest ends of the segments
+
+    The distances are to center, and in the XY plane if planar is True.
+    '''
+    begins, ends, _ = sectionfunc.segment_arrays(list(iter_sections(
+        neurites, neurite_filter=neurite_filter)))
+    n_dims = 2 if planar else 3
+    center = np.asarray(center, dtype=np.float64)[:n_dims]
+    begin_dist2 = np.sum(np.square(begins[:, :n_dims] - center), axis=1)
+    end_dist2 = np.sum(np.square(ends[:, :n_dims] - center), axis=1)
+    return np.minimum(begin_dist2, end_dist2), np.maximum(begin_dist2, end_dist2)
+
+
+def _count_crossings(near_dist2, far_dist2, radii):
+    '''Count the segments crossing each radius
+
+    A segment crosses a radius r if near_dist2 <= r ** 2 <= far_dist2. As near_dist2 is
+    never greater than far_dist2, the count is the number of segments with
+    near_dist2 <= r ** 2 minus the number of those with far_dist2 < r ** 2, which are
+    both given by binary searches in the sorted distances.
+    '''
+    r2 = np.square(np.asarray(radii, dtype=np.float64))
+    return (np.searchsorted(np.sort(near_dist2), r2, side='right') -
+            np.searchsorted(np.sort(far_dist2), r2, side='left'))
+
+
+def sholl_crossings(neurites, center, radii, planar=False):
     '''calculate crossings of neurites
 
     Args:
-        nrn(morph): morphology on which to perform Sholl analysis
+        neurites: neurite, neuron or population on which to perform Sholl analysis
+        center: the center of the Sholl spheres
         radii(iterable of floats): radii for which crossings will be counted
+        planar(bool): if True, the crossings of circles in the XY plane are counted
 
     Returns:
         Array of same length as radii, with a count of the number of crossings
         for the respective radius
     '''
-    def _count_crossings(neurite, radius):
-        '''count_crossings of segments in neurite with radius'''
-        r2 = radius ** 2
-        count = 0
-        for start, end in iter_segments(neurite):
-            start_dist2, end_dist2 = (morphmath.point_dist2(center, start),
-                                      morphmath.point_dist2(center, end))
+    near_dist2, far_dist2 = _sholl_distances2(neurites, center, planar)
+    return _count_crossings(near_dist2, far_dist2, radii)
 
-            count += int(start_dist2 <= r2 <= end_dist2 or
-                         end_dist2 <= r2 <= start_dist2)
 
-        return count
+def _sholl_max_radius(neuron, far_dist2, center):
+    '''Get the largest Sholl radius of a neuron
 
-    return np.array([sum(_count_crossings(neurite, r)
-                         for neurite in iter_neurites(neurites))
-                     for r in radii])
+    It is the largest absolute coordinate of the bounding box of the neuron if the circles
+    are centered on the soma, the largest distance of the segment ends to center otherwise.
+    '''
+    if center is None:
+        return np.max(np.abs(bounding_box(neuron)))
+    return np.sqrt(np.max(far_dist2)) if len(far_dist2) else 0.
 
 
-def sholl_frequency(nrn, neurite_type=NeuriteType.all, step_size=10):
+def sholl_frequency(nrn, neurite_type=NeuriteType.all, step_size=10, center=None,
+                    planar=False):
     '''perform Sholl frequency calculations on a population of neurites
 
     Args:
         nrn(morph): nrn or population
         neurite_type(NeuriteType): which neurites to operate on
         step_size(float): step size between Sholl radii
+        center: the center of the concentric circles for all the neurons, their soma
+            centers if None
+        planar(bool): if True, the crossings of circles in the XY plane are counted
 
     Note:
         Given a neuron, the soma center is used for the concentric circles,
         which range from the soma radii, and the maximum radial distance
-        in steps of `step_size`.  When a population is given, the concentric
-        circles range from the smallest soma radius to the largest radial neurite
-        distance.  Finally, each segment of the neuron is tested, so a neurite that
+        in steps of `step_size`. With a given center, the circles range up to the
+        largest distance of the neurite points to center.  When a population is given,
+        the concentric circles range from the smallest soma radius to the largest radial
+        neurite distance.  Finally, each segment of the neuron is tested, so a neurite that
         bends back on itself, and crosses the same Sholl radius will get counted as
         having crossed multiple times.
+
+        The distances of the segments of all the neurons are computed once, and the
+        crossings of all the radii are counted together.
     '''
     nrns = neuron_population(nrn)
     neurite_filter = is_type(neurite_type)
 
     min_soma_edge = float('Inf')
     max_radii = 0
-    neurites_list = []
+    near_dist2, far_dist2 = [], []
     for neuron in nrns:
-        neurites_list.extend(((neurites, neuron.soma.center)
-                              for neurites in neuron.neurites
-                              if neurite_filter(neurites)))
+        near, far = _sholl_distances2(neuron, neuron.soma.center if center is None else center,
+                                      planar, neurite_filter)
+        near_dist2.append(near)
+        far_dist2.append(far)
 
         min_soma_edge = min(min_soma_edge, neuron.soma.radius)
-        max_radii = max(max_radii, np.max(np.abs(bounding_box(neuron))))
+        max_radii = max(max_radii, _sholl_max_radius(neuron, far, center))
 
     radii = np.arange(min_soma_edge, max_radii + step_size, step_size)
-    ret = np.zeros_like(radii)
-    for neurites, center in neurites_list:
-        ret += sholl_crossings(neurites, center, radii)
-
-    return ret
+    return _count_crossings(np.concatenate(near_dist2), np.concatenate(far_dist2),
+                            radii).astype(radii.dtype)
@@ -28,7 +28,11 @@
 
 '''Section functions and functional tools'''
 
+import numpy as np
+
 from neurom import morphmath as mm
+from neurom.core import TopologyIndex
+from neurom.core.dataformat import COLS
 from neurom._compat import range
 
 
@@ -37,6 +41,26 @@ def section_path_length(section):
     return sum(s.length for s in section.iupstream())
 
 
+def segment_arrays(sections):
+    '''Get the segments of a list of sections as arrays
+
+    Returns:
+        begins, ends: the [X, Y, Z, R] begin and end points of the segments
+        segment_sections: the position in sections of the section of each segment
+    '''
+    counts = np.array([len(s.points) for s in sections], dtype=np.intp)
+    if not counts.sum():
+        empty = np.empty((0, 4))
+        return empty, empty, np.empty(0, dtype=np.intp)
+
+    points = np.concatenate([s.points[:, COLS.XYZR] for s in sections if len(s.points)])
+    is_begin = np.ones(len(points), dtype=bool)
+    is_begin[np.cumsum(counts[counts > 0]) - 1] = False
+    is_end = np.roll(is_begin, 1)
+    segment_sections = np.repeat(np.arange(len(sections)), np.maximum(counts - 1, 0))
+    return points[is_begin], points[is_end], segment_sections
+
+
 def section_volume(section):
     '''Volume of a section'''
     return section.volume
@@ -110,19 +134,11 @@ def strahler_order(section):
        children with greater number, then the Strahler number of the node is
        i + 1.
 
-    No efforts have been invested in making it computationnaly efficient, but
-    it computes acceptably fast on tested morphologies (i.e., no waiting time).
+    The orders of the whole subtree of the section are computed without recursion, see
+    neurom.core.TopologyIndex.strahler_orders, which has the orders of all the sections of
+    a neurite.
     '''
-    if section.children:
-        child_orders = [strahler_order(child) for child in section.children]
-        max_so_children = max(child_orders)
-        it = iter(co == max_so_children for co in child_orders)
-        #  check if there are *two* or more children w/ the max_so_children
-        any(it)
-        if any(it):
-            return max_so_children + 1
-        return max_so_children
-    return 1
+    return int(TopologyIndex(section).strahler_orders[0])
 
 
 def locate_segment_position(section, fraction):
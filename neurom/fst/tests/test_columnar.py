@@ -0,0 +1,110 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+'''Test neurom.fst._columnar module'''
+import os
+
+import numpy as np
+from nose import tools as nt
+
+import neurom as nm
+from neurom import load_neuron, load_neurons
+from neurom.core.population import Population
+from neurom.fst import ColumnarPopulation, _columnar
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data')
+VALID_PATH = os.path.join(DATA_PATH, 'valid_set')
+STRAHLER_PATH = os.path.join(DATA_PATH, 'swc', 'strahler.swc')
+
+POP = load_neurons(VALID_PATH)
+COLUMNAR_POP = ColumnarPopulation(POP)
+
+
+def test_columnar_population():
+    nt.eq_(len(COLUMNAR_POP), len(POP))
+    nt.eq_(COLUMNAR_POP.neurons, POP.neurons)
+    nt.eq_(len(COLUMNAR_POP.neurites), len(POP.neurites))
+    nt.eq_(len(COLUMNAR_POP.neurite_types), len(POP.neurites))
+    nt.eq_(COLUMNAR_POP.neuron_offsets[-1], len(POP.neurites))
+    nt.eq_(COLUMNAR_POP.neurite_offsets[-1], len(COLUMNAR_POP.section_starts))
+    nt.eq_(COLUMNAR_POP.points.shape[1], 4)
+
+
+def test_columnar_population_neurons():
+    nt.eq_(list(COLUMNAR_POP), list(POP.neurons))
+    nt.ok_(COLUMNAR_POP[0] is POP.neurons[0])
+    nt.eq_(COLUMNAR_POP[1:3], POP.neurons[1:3])
+    nt.eq_(COLUMNAR_POP.somata, tuple(POP.somata))
+    nt.eq_(str(ColumnarPopulation(POP, name='foo')),
+           'ColumnarPopulation <name: foo, nneurons: %d>' % len(POP))
+
+
+def test_columnar_population_empty():
+    pop = ColumnarPopulation([])
+    nt.eq_(len(pop), 0)
+    nt.eq_(pop.points.shape, (0, 4))
+    nt.eq_(len(pop.section_starts), 0)
+    np.testing.assert_array_equal(pop.neurite_offsets, [0])
+    np.testing.assert_array_equal(pop.neuron_offsets, [0])
+    nt.eq_(len(pop.segment_lengths), 0)
+
+
+def test_columnar_population_sections():
+    nrn = load_neuron(STRAHLER_PATH)
+    pop = ColumnarPopulation(nrn)
+    nt.eq_(pop.neurons, (nrn, ))
+    sections = list(nrn.neurites[0].iter_sections())
+    nt.eq_(len(pop.section_starts), len(sections))
+    for start, stop, section in zip(pop.section_starts, pop.section_stops, sections):
+        np.testing.assert_array_equal(pop.points[start:stop], section.points[:, :4])
+    parents = [sections.index(s.parent) if s.parent is not None else -1 for s in sections]
+    np.testing.assert_array_equal(pop.section_parents, parents)
+    np.testing.assert_array_equal(pop.section_neurites, 0)
+    nt.eq_(len(pop.segment_starts), sum(len(s.points) - 1 for s in sections))
+
+
+def test_columnar_features():
+    pop = Population([load_neuron(STRAHLER_PATH)] + list(POP))
+    columnar_pop = ColumnarPopulation(pop)
+    for feature in _columnar.FEATURES:
+        for neurite_type in (nm.ANY_NEURITE, nm.AXON, nm.BASAL_DENDRITE):
+            expected = nm.get(feature, pop, neurite_type=neurite_type)
+            values = nm.get(feature, columnar_pop, neurite_type=neurite_type)
+            nt.eq_(values.shape, expected.shape)
+            np.testing.assert_allclose(values, expected)
+
+
+def test_columnar_radial_distances_origin():
+    for feature in ('segment_radial_distances', 'section_radial_distances'):
+        np.testing.assert_allclose(nm.get(feature, COLUMNAR_POP, origin=[1., 2., 3.]),
+                                   nm.get(feature, POP, origin=[1., 2., 3.]))
+
+
+def test_columnar_fallback_features():
+    for feature in ('partition', 'soma_radii', 'section_areas'):
+        np.testing.assert_allclose(nm.get(feature, COLUMNAR_POP), nm.get(feature, POP))
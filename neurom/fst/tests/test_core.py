@@ -29,6 +29,7 @@
 '''Test neurom.fst._core module'''
 
 from copy import deepcopy
+import pickle
 import numpy as np
 from nose import tools as nt
 import os
@@ -89,3 +90,42 @@ def test_neurite_deepcopy():
     nt.assert_true(nrt is not nrt2)
 
     _check_cloned_neurites(nrt, nrt2)
+
+
+def test_neuron_pickle():
+    for filename in FILENAMES + [os.path.join(DATA_ROOT, 'swc', 'strahler.swc')]:
+        nrn = _io.load_neuron(filename)
+        nrn.neurites[0].length  # cached values are not pickled
+        loaded = pickle.loads(pickle.dumps(nrn, protocol=pickle.HIGHEST_PROTOCOL))
+        nt.eq_(loaded.name, nrn.name)
+        nt.eq_(len(loaded.sections), len(nrn.sections))
+        np.testing.assert_array_equal(loaded.points, nrn.points)
+        np.testing.assert_array_equal(loaded.soma.points, nrn.soma.points)
+        for a, b in zip(nrn.neurites, loaded.neurites):
+            _check_cloned_neurites(a, b)
+            nt.assert_almost_equal(a.length, b.length)
+
+
+def test_neurite_pickle():
+    nrn = _io.load_neuron(FILENAMES[0])
+    for neurite in nrn.neurites:
+        nt.ok_(isinstance(neurite, _core.FstNeurite))
+        loaded = pickle.loads(pickle.dumps(neurite, protocol=pickle.HIGHEST_PROTOCOL))
+        # the loaded neurite does not reference the neuron
+        nt.eq_(type(loaded), _core.Neurite)
+        _check_cloned_neurites(neurite, loaded)
+        nt.assert_almost_equal(loaded.length, neurite.length)
+
+
+def test_neuron_points():
+    for filename in FILENAMES:
+        nrn = _io.load_neuron(filename)
+        ref = nrn.soma.points.tolist()
+        for n in nrn.neurites:
+            ref.extend(n.points.tolist())
+        np.testing.assert_array_equal(nrn.points, ref)
+        nt.ok_(nrn.points is nrn.points)
+
+        pts = nrn.points[:, :3]
+        np.testing.assert_allclose(nrn.bounding_box, [pts.min(axis=0), pts.max(axis=0)])
+
@@ -0,0 +1,115 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Test neurom.fst._flat module'''
+import os
+
+import numpy as np
+from nose import tools as nt
+
+from neurom import load_neuron
+from neurom.core import NeuriteType, iter_sections
+from neurom.io.datawrapper import DataBlockSection, DataWrapper
+from neurom.fst._flat import FlatMorphology
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data/valid_set')
+FILENAMES = [os.path.join(DATA_PATH, f)
+             for f in ['Neuron.swc', 'Neuron_h5v1.h5', 'Neuron_h5v2.h5']]
+
+
+def test_flat_morphology():
+    data_block = np.zeros((7, 7))
+    data_block[:, 0] = np.arange(7)
+    sections = [DataBlockSection([0, 1], 1, -1),
+                DataBlockSection(slice(1, 4), 2, 0),
+                DataBlockSection([3, 4], 2, 1),
+                DataBlockSection([3, 5, 6], 3, 1)]
+    flat = FlatMorphology(DataWrapper(data_block, 'SWC', sections))
+    nt.eq_(len(flat), 4)
+    # only the last section is not a range of rows of the data block
+    np.testing.assert_array_equal(flat.points[:, 0], [0, 1, 2, 3, 4, 5, 6, 3, 5, 6])
+    np.testing.assert_array_equal(flat.data_block, data_block)
+    np.testing.assert_array_equal(flat.starts, [0, 1, 3, 7])
+    np.testing.assert_array_equal(flat.stops, [2, 4, 5, 10])
+    np.testing.assert_array_equal(flat.parents, [-1, -1, 1, 1])
+    np.testing.assert_array_equal(flat.types, [NeuriteType.soma, NeuriteType.axon,
+                                               NeuriteType.axon, NeuriteType.basal_dendrite])
+    np.testing.assert_array_equal(flat.neurite_roots, [1])
+    np.testing.assert_array_equal(flat.section_children(1), [2, 3])
+    np.testing.assert_array_equal(flat.section_children(2), [])
+    np.testing.assert_array_equal(flat.section_points(3)[:, 0], [3, 5, 6])
+    np.testing.assert_array_equal(flat.copied_rows, [3, 5, 6])
+    np.testing.assert_array_equal(flat.pids, [-1, 0, 1, 1])
+    # the copies of the rows, and the rows of the copies, without the first points
+    # which are the last points of the parents
+    np.testing.assert_array_equal(flat.point_rows([1]), [2, 3, 7])
+    np.testing.assert_array_equal(flat.point_rows([3]), [5, 6, 8, 9])
+    np.testing.assert_array_equal(flat.point_rows([0, 2]), [0, 1, 4])
+    np.testing.assert_array_equal(flat.point_rows([1, 2, 3]), [2, 3, 4, 5, 6, 7, 8, 9])
+
+    flat.remove_soma_initial_point()
+    np.testing.assert_array_equal(flat.starts, [0, 1, 3, 7])
+    data_block[0:2, 4] = 1
+    flat = FlatMorphology(DataWrapper(data_block, 'SWC', sections))
+    flat.remove_soma_initial_point()
+    np.testing.assert_array_equal(flat.starts, [0, 2, 3, 7])
+
+
+def test_flat_morphology_views():
+    data_block = np.zeros((5, 7))
+    sections = [DataBlockSection(slice(0, 1), 1, -1),
+                DataBlockSection(slice(1, 3), 2, 0),
+                DataBlockSection([], 2, 1),
+                DataBlockSection(slice(3, 5), 2, 1)]
+    flat = FlatMorphology(DataWrapper(data_block, 'H5V1', sections))
+    nt.ok_(flat.points is data_block)
+    nt.ok_(flat.data_block is data_block)
+    np.testing.assert_array_equal(flat.starts, [0, 1, 0, 3])
+    np.testing.assert_array_equal(flat.stops, [1, 3, 0, 5])
+    nt.eq_(len(flat.copied_rows), 0)
+    np.testing.assert_array_equal(flat.point_rows([1, 2, 3]), [1, 2, 3, 4])
+
+    flat = FlatMorphology(DataWrapper(data_block, 'SWC', []))
+    nt.eq_(len(flat), 0)
+    nt.ok_(flat.points is data_block)
+
+
+def test_sections_are_views():
+    for filename in FILENAMES:
+        nrn = load_neuron(filename)
+        flat = nrn.flat
+        nt.eq_(len(flat), len(nrn.sections))
+        np.testing.assert_array_equal(flat.neurite_roots, [n.root_node.id for n in nrn.neurites])
+        nt.ok_(nrn._data.data_block.base is flat.points or nrn._data.data_block is flat.points)
+        for sec in iter_sections(nrn):
+            nt.ok_(np.shares_memory(sec.points, flat.points))
+            np.testing.assert_array_equal(sec.points, flat.section_points(sec.id))
+            nt.eq_(sec.type, flat.types[sec.id])
+            nt.eq_([c.id for c in sec.children], flat.section_children(sec.id).tolist())
+            nt.eq_(sec.parent.id if sec.parent else -1, flat.parents[sec.id])
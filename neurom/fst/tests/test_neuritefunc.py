@@ -34,8 +34,10 @@ import os
 import numpy as np
 from numpy.testing import assert_allclose
 import neurom as nm
+from neurom import morphmath
 from neurom.geom import convex_hull
 from neurom.fst import _neuritefunc as _nf
+from neurom.fst import sectionfunc
 from neurom.fst.sectionfunc import section_volume
 from neurom.core import tree as tr
 from neurom.core import Section, Neurite, Population
@@ -192,6 +194,13 @@ def test_section_path_lengths():
                     (5., 10., 11., # type 3, basal dendrite
                      4., 10., 9.)) # type 2, axon
 
+def test_map_segments():
+    lengths = _nf.map_segments(
+        lambda s: np.linalg.norm(np.diff(s.points[:, :3], axis=0), axis=1),
+        SIMPLE, nm.NeuriteType.all)
+    assert_allclose(lengths, _nf.segment_lengths(SIMPLE))
+    assert_allclose(_nf.map_segments(lambda s: [len(s.points)], SIMPLE, nm.AXON), [2, 2, 2])
+
 def test_section_term_lengths():
     term_lengths = list(_nf.section_term_lengths(SIMPLE))
     assert_allclose(term_lengths,
@@ -202,6 +211,13 @@ def test_section_bif_lengths():
     assert_allclose(bif_lengths,
                     (5.,  4.))
 
+def test_section_bif_no_bifurcation():
+    neurite = Neurite(Section(np.array([[0., 0., 0., 1.], [1., 0., 0., 1.]])))
+    for feature in (_nf.section_bif_lengths, _nf.section_bif_branch_orders):
+        values = feature(neurite)
+        nt.eq_(len(values), 0)
+        nt.eq_(values.dtype, np.float64)
+
 def test_number_of_sections_per_neurite():
     sections = _nf.number_of_sections_per_neurite(SIMPLE)
     assert_allclose(sections,
@@ -251,6 +267,21 @@ def test_partition_asymmetry():
     assert_allclose(partition,
                     (0.0, 0.0))
 
+def test_tree_balance_indices():
+    nt.eq_(_nf.colless_index_per_neurite(SIMPLE).tolist(), [0, 0])
+    nt.eq_(_nf.sackin_index_per_neurite(SIMPLE).tolist(), [2, 2])
+
+    points = np.zeros((2, 4))
+    root = Section(points)
+    child = Section(points)
+    root.add_child(Section(points))
+    root.add_child(child)
+    child.add_child(Section(points))
+    child.add_child(Section(points))
+    nt.eq_(_nf.colless_index_per_neurite(Neurite(root)).tolist(), [1])
+    nt.eq_(_nf.sackin_index_per_neurite(Neurite(root)).tolist(), [5])
+
+
 def test_segment_lengths():
     segment_lengths = _nf.segment_lengths(SIMPLE)
     assert_allclose(segment_lengths,
@@ -269,6 +300,48 @@ def test_segment_volumes():
     result = _nf.segment_volumes(SIMPLE)
     assert_allclose(result, expected)
 
+def test_segment_areas():
+    result = _nf.segment_areas(SIMPLE)
+    nt.ok_(isinstance(result, np.ndarray))
+    assert_allclose(result, [morphmath.segment_area(seg)
+                             for seg in nm.iter_segments(SIMPLE)])
+
+
+def test_segment_features_arrays():
+    for feature in (_nf.segment_lengths, _nf.segment_volumes, _nf.segment_radii,
+                    _nf.segment_taper_rates, _nf.segment_midpoints,
+                    _nf.segment_radial_distances, _nf.section_lengths,
+                    _nf.section_areas, _nf.section_volumes):
+        nt.ok_(isinstance(feature(NRN), np.ndarray))
+        nt.eq_(len(feature(NRN, neurite_type=nm.SOMA)), 0)
+
+
+def test_section_features_segment_kernels():
+    sections = list(nm.iter_sections(NRN))
+    assert_allclose(_nf.section_lengths(NRN), [s.length for s in sections])
+    assert_allclose(_nf.section_areas(NRN), [s.area for s in sections])
+    assert_allclose(_nf.section_volumes(NRN), [s.volume for s in sections])
+    assert_allclose(_nf.section_term_lengths(NRN),
+                    [s.length for s in nm.iter_sections(NRN, iterator_type=tr.Tree.ileaf)])
+
+
+def test_path_lengths_deep_neurite():
+    # a long unbranched chain with a leaf at each section
+    node = root = Section(np.array([[0., 0., 0., 1.], [1., 0., 0., 1.]]))
+    for i in range(1, 1500):
+        child = Section(np.array([[i, 0., 0., 1.], [i + 1, 0., 0., 1.]]))
+        node.add_child(child)
+        node.add_child(Section(np.array([[i, 0., 0., 1.], [i, 2., 0., 1.]])))
+        node = child
+    nrt = Neurite(root)
+    path_lengths = _nf.section_path_lengths(nrt)
+    assert_allclose(path_lengths,
+                    [sectionfunc.section_path_length(s) for s in nrt.iter_sections()])
+    assert_allclose(_nf.terminal_path_lengths_per_neurite(nrt),
+                    [sectionfunc.section_path_length(s)
+                     for s in nrt.iter_sections(order=tr.Tree.ileaf)])
+
+
 def test_segment_midpoints():
     midpoints = np.array(_nf.segment_midpoints(SIMPLE))
     assert_allclose(midpoints,
@@ -193,3 +193,38 @@ def test_sholl_analysis_custom():
     nt.eq_(list(_nf.sholl_crossings(morph_C, center, radii=radii)),
            [2, 2, 2, 2, 2, 2, 10, 10])
     #view.neuron(morph_C)[0].savefig('foo.png')
+
+
+def test_sholl_crossings_planar():
+    morph = load_swc('''\
+ 1 1   0  0   0 1. -1
+ 2 3   0  0   0 1.  1
+ 3 3   0  0  50 1.  2
+ 4 3  30  0  50 1.  3''')
+    radii = [10., 40.]
+    nt.eq_(list(_nf.sholl_crossings(morph, (0, 0, 0), radii=radii)), [1, 1])
+    nt.eq_(list(_nf.sholl_crossings(morph, (0, 0, 0), radii=radii, planar=True)), [1, 0])
+
+
+def test_sholl_frequency_population_center():
+    freq = _nf.sholl_frequency(SIMPLE, step_size=1)
+    np.testing.assert_array_equal(
+        _nf.sholl_frequency(Population([SIMPLE, SIMPLE]), step_size=1), 2 * freq)
+    # with a given center, the circles range up to the farthest point, (6, 5) at 7.81,
+    # instead of the largest coordinate
+    centered = _nf.sholl_frequency(SIMPLE, step_size=1, center=SIMPLE.soma.center)
+    np.testing.assert_array_equal(centered, [2, 2, 2, 4, 5, 4, 3, 0])
+    np.testing.assert_array_equal(centered[:len(freq)], freq)
+
+    # the circles centered on the (6, 5) end point range up to (-5, -4), at 14.21
+    np.testing.assert_array_equal(
+        _nf.sholl_frequency(SIMPLE, step_size=1, center=[6., 5., 0.]),
+        [1, 1, 1, 1, 1, 3, 2, 2, 3, 3, 2, 1, 1, 1, 0])
+    # the farthest point from (100, 100, 100) is (-5, -4, 0), at 178.44
+    center = SIMPLE.soma.center + 100.
+    shifted = _nf.sholl_frequency(SIMPLE, step_size=1, center=center)
+    nt.eq_(len(shifted), 179)
+    np.testing.assert_array_equal(shifted,
+                                  _nf.sholl_crossings(SIMPLE, center, np.arange(1., 180.)))
+    nt.eq_(np.count_nonzero(shifted[:166]), 0)
+    np.testing.assert_array_equal(shifted[-2:], [1, 0])
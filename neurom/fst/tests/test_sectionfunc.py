@@ -143,6 +143,17 @@ def test_section_meander_angles_single_segment():
     nt.assert_equal(len(_sf.section_meander_angles(s)), 0)
 
 
+def test_branch_order():
+    root = Section(np.array([[0, 0, 0], [1, 1, 1]]))
+    child = root.add_child(Section(np.array([[1, 1, 1], [2, 2, 2]])))
+    grandchild = child.add_child(Section(np.array([[2, 2, 2], [3, 3, 3]])))
+    nt.eq_([_sf.branch_order(s) for s in (root, child, grandchild)], [0, 1, 2])
+
+    for neurite in NRN.neurites:
+        nt.eq_([_sf.branch_order(s) for s in neurite.iter_sections()],
+               list(_nf.section_branch_orders(neurite)))
+
+
 def test_strahler_order():
     path = os.path.join(SWC_PATH, 'strahler.swc')
     n = load_neuron(path)
@@ -176,3 +187,13 @@ def test_locate_segment_position():
         ValueError,
         _sf.locate_segment_position, s, -0.1
     )
+
+
+def test_strahler_order_deep():
+    root = node = Section(np.zeros((2, 4)))
+    for _ in range(5000):
+        child = Section(np.zeros((2, 4)))
+        node.add_child(child)
+        node.add_child(Section(np.zeros((2, 4))))
+        node = child
+    nt.eq_(_sf.strahler_order(root), 2)
@@ -36,9 +36,15 @@ from .transform import translate, rotate
 def bounding_box(obj):
     '''Get the (x, y, z) bounding box of an object containing points
 
+    The cached bounding box of the object is used if it has one, eg: neurites and
+    neurons from neurom.fst
+
     Returns:
         2D numpy array of [[min_x, min_y, min_z], [max_x, max_y, max_z]]
     '''
+    box = getattr(obj, 'bounding_box', None)
+    if isinstance(box, np.ndarray):
+        return box.copy()
     return np.array([np.min(obj.points[:, 0:3], axis=0),
                      np.max(obj.points[:, 0:3], axis=0)])
 
@@ -75,6 +75,17 @@ def test_bounding_box_neurite():
     nt.assert_true(np.allclose(geom.bounding_box(nrt), ref))
 
 
+def test_bounding_box_cached():
+    nrn = nm.load_neuron(os.path.join(SWC_DATA_PATH, 'Neuron.swc'))
+    box = geom.bounding_box(nrn)
+    nt.ok_(np.allclose(box, [nrn.points[:, :3].min(axis=0), nrn.points[:, :3].max(axis=0)]))
+    box[:] = 0
+    nt.ok_(np.allclose(geom.bounding_box(nrn), geom.bounding_box(NRN)))
+    for nrt in nrn.neurites:
+        nt.ok_(np.allclose(geom.bounding_box(nrt), [nrt.points[:, :3].min(axis=0),
+                                                   nrt.points[:, :3].max(axis=0)]))
+
+
 def test_convex_hull_points():
 
     # This leverages scipy ConvexHull and we don't want
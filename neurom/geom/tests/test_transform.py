@@ -27,8 +27,11 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import math
+import pickle
+from copy import deepcopy
+
 import neurom.geom.transform as gtr
-from neurom import load_neuron
+from neurom import load_neuron, load_neurons
 from neurom.fst import _neuritefunc as _nf
 from nose import tools as nt
 from neurom._compat import zip
@@ -44,6 +47,8 @@ TEST_ANGLE = np.pi / 3.
 _path = os.path.dirname(os.path.abspath(__file__))
 SWC_NRN_PATH = os.path.join(_path, '../../../test_data/swc/Neuron.swc')
 H5_NRN_PATH = os.path.join(_path, '../../../test_data/h5/v1/Neuron.h5')
+STRAHLER_NRN_PATH = os.path.join(_path, '../../../test_data/swc/strahler.swc')
+ASC_NRN_PATH = os.path.join(_path, '../../../test_data/neurolucida/sample.asc')
 
 
 def _Rx(angle):
@@ -78,6 +83,11 @@ def test_not_implemented_transform_call_raises():
     d = Dummy()
     d([1,2,3])
 
+@nt.raises(NotImplementedError)
+def test_not_implemented_transform_matrix_raises():
+    gtr.Transform3D().matrix
+
+
 @nt.raises(NotImplementedError)
 def test_translate_bad_type_raises():
     gtr.translate("hello", [1,2,3])
@@ -372,3 +382,150 @@ def test_rodrigues_to_dcm():
         nt.assert_true(np.allclose(Rx, _Rx(angle)))
         nt.assert_true(np.allclose(Ry, _Ry(angle)))
         nt.assert_true(np.allclose(Rz, _Rz(angle)))
+
+
+def test_transform_matrices():
+    points = np.random.random((10, 3))
+    for t in (gtr.Translation([1., -2., 3.]),
+              gtr.Rotation(_Rz(TEST_ANGLE)),
+              gtr.PivotRotation(_Rx(TEST_ANGLE), [1., 2., 3.])):
+        nt.eq_(t.matrix.shape, (4, 4))
+        np.testing.assert_allclose(gtr.Affine(t.matrix)(points), t(points))
+
+    affine = gtr.Affine(gtr.Translation([1., 2., 3.]).matrix[:3])
+    np.testing.assert_allclose(affine(points), points + [1., 2., 3.])
+
+
+def _assert_same_points(nrn_a, nrn_b):
+    np.testing.assert_allclose(nrn_a.points, nrn_b.points)
+    for s_a, s_b in zip(nrn_a.sections, nrn_b.sections):
+        np.testing.assert_allclose(s_a.points, s_b.points)
+    np.testing.assert_allclose(nrn_a.soma.points, nrn_b.soma.points)
+
+
+def test_transform_neuron_inplace():
+    for path in (SWC_NRN_PATH, H5_NRN_PATH):
+        nrn = load_neuron(path)
+        t = gtr.PivotRotation(_Rz(TEST_ANGLE), [1., 2., 3.])
+        expected = nrn.transform(t)
+        length = nrn.neurites[0].length
+        box = nrn.bounding_box
+
+        nt.assert_true(nrn.transform(t, inplace=True) is nrn)
+        _assert_same_points(nrn, expected)
+        nt.assert_almost_equal(nrn.neurites[0].length, length)
+        np.testing.assert_allclose(nrn.bounding_box, expected.bounding_box)
+        nt.assert_false(np.allclose(nrn.bounding_box, box))
+
+
+def test_translate_rotate_inplace():
+    nrn = load_neuron(SWC_NRN_PATH)
+    expected = gtr.rotate(gtr.translate(nrn, [1., 2., 3.]), TEST_UVEC, TEST_ANGLE)
+    nt.assert_true(gtr.translate(nrn, [1., 2., 3.], inplace=True) is nrn)
+    nt.assert_true(gtr.rotate(nrn, TEST_UVEC, TEST_ANGLE, inplace=True) is nrn)
+    _assert_same_points(nrn, expected)
+
+
+def test_transform_neurite_inplace():
+    # sections of strahler.swc are views sharing their first point with their parent
+    for path in (SWC_NRN_PATH, H5_NRN_PATH, STRAHLER_NRN_PATH):
+        nrn = load_neuron(path)
+        t = gtr.Translation([10., 20., 30.])
+        neurite = nrn.neurites[0]
+        expected = neurite.transform(t)
+
+        nt.assert_true(neurite.transform(t, inplace=True) is neurite)
+        np.testing.assert_allclose(neurite.points, expected.points)
+        np.testing.assert_allclose(neurite.bounding_box, expected.bounding_box)
+        np.testing.assert_allclose(nrn.bounding_box[1], np.max(nrn.points[:, :3], axis=0))
+
+
+def test_transform_neurite_inplace_copies():
+    # the copied first points of the SWC sections are transformed with the data block
+    for path in (SWC_NRN_PATH, H5_NRN_PATH):
+        nrn = load_neuron(path)
+        ref = load_neuron(path)
+        t = gtr.Translation([100., 0., 0.])
+        nrn.neurites[1].transform(t, inplace=True)
+
+        for copy in (deepcopy(nrn), pickle.loads(pickle.dumps(nrn))):
+            np.testing.assert_allclose(copy.neurites[1].points, nrn.neurites[1].points)
+            np.testing.assert_allclose(copy.neurites[1].points[:, :3],
+                                       ref.neurites[1].points[:, :3] + [100., 0., 0.])
+            for i in (0, 2, 3):
+                np.testing.assert_allclose(copy.neurites[i].points, ref.neurites[i].points)
+            _assert_same_points(copy, nrn)
+
+        flat = nrn.flat
+        np.testing.assert_array_equal(flat.points[len(flat.data_block):],
+                                      flat.data_block[flat.copied_rows])
+
+
+def test_transform_neurite_inplace_soma_point():
+    # the neurites of an ASC file start with the last soma point, which stays in place
+    nrn = load_neuron(ASC_NRN_PATH)
+    ref = load_neuron(ASC_NRN_PATH)
+    for i in range(len(nrn.neurites)):
+        nrn.neurites[i].transform(gtr.Translation([100., 0., 0.]), inplace=True)
+        np.testing.assert_allclose(nrn.soma.points, ref.soma.points)
+        np.testing.assert_allclose(nrn.neurites[i].points[0], ref.neurites[i].points[0])
+        np.testing.assert_allclose(nrn.neurites[i].points[1:, :3],
+                                   ref.neurites[i].points[1:, :3] + [100., 0., 0.])
+        for j in range(i + 1, len(nrn.neurites)):
+            np.testing.assert_allclose(nrn.neurites[j].points, ref.neurites[j].points)
+
+    flat = nrn.flat
+    np.testing.assert_array_equal(flat.points[len(flat.data_block):],
+                                  flat.data_block[flat.copied_rows])
+
+
+def test_transform_population():
+    pop = load_neurons([SWC_NRN_PATH, H5_NRN_PATH])
+    t = gtr.Translation([10., 20., 30.])
+    moved = pop.transform(t)
+    nt.eq_(len(moved), 2)
+    nt.eq_(len(moved.somata), 2)
+    for nrn, moved_nrn in zip(pop, moved):
+        np.testing.assert_allclose(moved_nrn.points[:, :3], nrn.points[:, :3] + [10., 20., 30.])
+
+    nt.assert_true(pop.transform(t, inplace=True) is pop)
+    for nrn, moved_nrn, soma in zip(pop, moved, pop.somata):
+        _assert_same_points(nrn, moved_nrn)
+        nt.assert_true(soma is nrn.soma)
+
+
+def test_transformed_view():
+    nrn = load_neuron(H5_NRN_PATH)
+    points = nrn.points.copy()
+    t0 = gtr.Translation([1., 2., 3.])
+    t1 = gtr.Rotation(_Ry(TEST_ANGLE))
+
+    view = gtr.TransformedView(nrn, t0).transform(t1)
+    nt.assert_true(view.obj is nrn)
+    expected = nrn.transform(t0).transform(t1)
+
+    np.testing.assert_allclose(view.points, expected.points)
+    np.testing.assert_allclose(nrn.points, points)
+    np.testing.assert_allclose(view.bounding_box, expected.bounding_box)
+    for neurite, expected_neurite in zip(view.neurites, expected.neurites):
+        np.testing.assert_allclose(neurite.points, expected_neurite.points)
+    _assert_same_points(view.materialize(), expected)
+
+
+def test_transform_neurons():
+    nrns = [load_neuron(SWC_NRN_PATH), load_neuron(H5_NRN_PATH), load_neuron(SWC_NRN_PATH)]
+    transforms = [gtr.Translation([1., 2., 3.]),
+                  gtr.PivotRotation(_Rx(TEST_ANGLE), [1., 2., 3.]),
+                  gtr.Rotation(_Rz(TEST_ANGLE)).matrix]
+    expected = [nrns[0].transform(transforms[0]),
+                nrns[1].transform(transforms[1]),
+                nrns[2].transform(gtr.Affine(transforms[2]))]
+
+    nt.eq_(gtr.transform_neurons(nrns, transforms), nrns)
+    for nrn, expected_nrn in zip(nrns, expected):
+        _assert_same_points(nrn, expected_nrn)
+
+
+@nt.raises(ValueError)
+def test_transform_neurons_wrong_count():
+    gtr.transform_neurons([load_neuron(SWC_NRN_PATH)], [])
@@ -53,6 +53,11 @@ class Transform3D(object):
         '''Apply a 3D transformation to a set of points'''
         raise NotImplementedError
 
+    @property
+    def matrix(self):
+        '''The 4x4 affine matrix of the transformation'''
+        raise NotImplementedError
+
 
 class Translation(Transform3D):
     '''class representing a 3D translation'''
@@ -69,6 +74,13 @@ class Translation(Transform3D):
         '''Apply a 3D translation to a set of points'''
         return points + self._trans
 
+    @property
+    def matrix(self):
+        '''The 4x4 affine matrix of the translation'''
+        matrix = np.identity(4)
+        matrix[:3, 3] = self._trans
+        return matrix
+
 
 class Rotation(Transform3D):
     '''Class representing a 3D rotation'''
@@ -85,6 +97,13 @@ class Rotation(Transform3D):
         '''Apply a 3D rotation to a set of points'''
         return np.dot(self._dcm, np.array(points).T).T
 
+    @property
+    def matrix(self):
+        '''The 4x4 affine matrix of the rotation'''
+        matrix = np.identity(4)
+        matrix[:3, :3] = self._dcm
+        return matrix
+
 
 class PivotRotation(Rotation):
     '''Class representing a 3D rotation about a pivot point'''
@@ -106,26 +125,145 @@ class PivotRotation(Rotation):
         points += self._origin
         return points
 
+    @property
+    def matrix(self):
+        '''The 4x4 affine matrix of the pivoted rotation'''
+        matrix = np.identity(4)
+        matrix[:3, :3] = self._dcm
+        matrix[:3, 3] = self._origin - np.dot(self._dcm, self._origin)
+        return matrix
+
+
+class Affine(Transform3D):
+    '''Class representing a 3D affine transformation'''
+    __doc__ += _TRANSFDOC
+
+    def __init__(self, matrix):
+        '''
+        Parameters:
+            matrix: a 4x4 affine matrix, or a 3x4 one without the last [0, 0, 0, 1] row
+        '''
+        self._matrix = np.identity(4)
+        self._matrix[:3] = np.asarray(matrix, dtype=float)[:3]
+
+    def __call__(self, points):
+        '''Apply a 3D affine transformation to a set of points'''
+        return np.dot(points, self._matrix[:3, :3].T) + self._matrix[:3, 3]
+
+    @property
+    def matrix(self):
+        '''The 4x4 affine matrix of the transformation'''
+        return self._matrix.copy()
+
+
+def _as_matrix(trans):
+    '''Get the 4x4 affine matrix of a Transform3D or of a 3x4 or 4x4 array'''
+    if isinstance(trans, Transform3D):
+        return trans.matrix
+    return Affine(trans).matrix
+
+
+class TransformedView(object):
+    '''Lazily transformed view of a neuron, neurite or other object with points
+
+    The affine transformation is stored as a 4x4 matrix and only applied to the points
+    when they are accessed, the object itself is neither copied nor modified. Transforming
+    a view composes the matrices and returns a new view.
+    '''
+
+    def __init__(self, obj, trans):
+        '''
+        Parameters:
+            obj: object with points, eg: a neuron or a neurite, or a TransformedView
+            trans: a Transform3D or a 3x4 or 4x4 affine matrix
+        '''
+        matrix = _as_matrix(trans)
+        if isinstance(obj, TransformedView):
+            matrix = np.dot(matrix, obj.matrix)
+            obj = obj.obj
+        self.obj = obj
+        self.matrix = matrix
+
+    def _apply(self, points):
+        '''Copy of points, with the transformation applied to the x, y, z columns'''
+        points = np.array(points, dtype=float)
+        points[:, :3] = np.dot(points[:, :3], self.matrix[:3, :3].T) + self.matrix[:3, 3]
+        return points
+
+    @property
+    def points(self):
+        '''The transformed points of the object'''
+        return self._apply(self.obj.points)
+
+    @property
+    def neurites(self):
+        '''Transformed views of the neurites of the object'''
+        return [TransformedView(n, self.matrix) for n in self.obj.neurites]
+
+    @property
+    def bounding_box(self):
+        '''The [[min_x, min_y, min_z], [max_x, max_y, max_z]] box of the transformed points'''
+        points = self.points[:, :3]
+        return np.array([np.min(points, axis=0), np.max(points, axis=0)])
+
+    def transform(self, trans):
+        '''Return a view of the object with trans applied after this view's transformation'''
+        return TransformedView(self, trans)
+
+    def materialize(self):
+        '''Return a transformed copy of the object'''
+        return self.obj.transform(Affine(self.matrix))
+
+
+def transform_neurons(neurons, transforms):
+    '''Transform neurons in place, each by its own affine transformation
+
+    The transformations are stacked into one array of 4x4 matrices, and the points of
+    each neuron are transformed by a single matrix product written into its data block,
+    without copying the neurons.
+
+    Parameters:
+        neurons: sequence of neurons from neurom.fst, modified in place
+        transforms: sequence of Transform3D or of 3x4 or 4x4 affine matrices,
+            one per neuron
+
+    Returns:
+        the neurons
+    '''
+    neurons = list(neurons)
+    matrices = np.array([_as_matrix(t) for t in transforms]).reshape(-1, 4, 4)
+    if len(matrices) != len(neurons):
+        raise ValueError('Got %d transformations for %d neurons' % (len(matrices), len(neurons)))
+
+    for neuron, matrix in zip(neurons, matrices):
+        points = neuron.flat.points
+        points[:, :3] = np.dot(points[:, :3], matrix[:3, :3].T) + matrix[:3, 3]
+        neuron.points_changed()
+    return neurons
+
 
-def translate(obj, t):
+def translate(obj, t, inplace=False):
     '''
     Translate object of supported type.
 
     Parameters :
         obj : object to be translated. Must implement a transform method.
         t: translation 3-vector
+        inplace: if True, obj is translated instead of a copy
 
     Returns:
-        copy of the object with the applied translation
+        copy of the object with the applied translation, or obj if inplace
     '''
 
     try:
+        if inplace:
+            return obj.transform(Translation(t), inplace=True)
         return obj.transform(Translation(t))
     except AttributeError:
         raise NotImplementedError
 
 
-def rotate(obj, axis, angle, origin=None):
+def rotate(obj, axis, angle, origin=None, inplace=False):
     '''
     Rotation around unit vector following the right hand rule
 
@@ -134,13 +272,17 @@ def rotate(obj, axis, angle, origin=None):
             Must implement a transform method.
         axis : unit vector for the axis of rotation
         angle : rotation angle in rads
+        origin : the pivot of the rotation, the origin if None
+        inplace : if True, obj is rotated instead of a copy
 
     Returns:
-        A copy of the object with the applied translation.
+        A copy of the object with the applied rotation, or obj if inplace.
     '''
     R = _rodrigues_to_dcm(axis, angle)
 
     try:
+        if inplace:
+            return obj.transform(PivotRotation(R, origin), inplace=True)
         return obj.transform(PivotRotation(R, origin))
     except AttributeError:
         raise NotImplementedError
@@ -0,0 +1,197 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''On-disk cache of the raw data read from morphology files
+
+Each entry holds the data block, the section table and the format of a file, in
+numpy's .npy format, so that the data block can be memory-mapped when loaded:
+
+    <cache_dir>/<key>/data_block.npy
+    <cache_dir>/<key>/sections.npy, <cache_dir>/<key>/section_ids.npy: the section table,
+        see neurom.io.datawrapper.sections_to_table
+    <cache_dir>/<key>/fmt: file format designation, eg: SWC
+
+The key is a hash of the absolute path, the size, the modification time and the content
+of the file, as well as the reader used to parse it.
+
+Entries are written to a temporary directory, which is then renamed, so that readers never
+see partially written entries. When the size of the cache is above its maximum size, the
+least recently used entries are removed.
+'''
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from io import open
+
+import numpy as np
+
+from neurom.io.datawrapper import DataWrapper, sections_from_table, sections_to_table
+
+L = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 10 * 1024 ** 3  # bytes
+
+_TMP_PREFIX = '.tmp-'
+_HASH_CHUNK_SIZE = 1024 ** 2
+
+
+def _file_hash(filename):
+    '''Get the hex digest of the content of filename'''
+    content_hash = hashlib.sha1()
+    with open(filename, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(_HASH_CHUNK_SIZE), b''):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def _dir_size(path):
+    '''Get the total size of the files in directory path'''
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+class DataCache(object):
+    '''On-disk cache of DataWrappers
+
+    Arguments:
+        cache_dir: path to the directory holding the cache, created if needed
+        max_size: maximum size in bytes of the cache
+    '''
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._size = None
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:  # pragma: no cover
+                if not os.path.isdir(cache_dir):
+                    raise
+
+    def key(self, filename, reader, *options):
+        '''Get the key of the entry for filename when read with reader and options'''
+        stat = os.stat(filename)
+        key = '\0'.join((os.path.abspath(filename), reader) + options +
+                         (str(stat.st_size), repr(stat.st_mtime), _file_hash(filename)))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _entries(self):
+        '''Get the paths of all the entries'''
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if not name.startswith(_TMP_PREFIX)]
+
+    def size(self):
+        '''Get the total size in bytes of the entries'''
+        return sum(_dir_size(path) for path in self._entries())
+
+    def get(self, key):
+        '''Get the DataWrapper stored for key, None if there isn't any
+
+        The data block is memory-mapped copy-on-write.
+        '''
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(path, 'fmt'), encoding='utf-8') as fd:
+                fmt = fd.read()
+            data_block = np.load(os.path.join(path, 'data_block.npy'), mmap_mode='c')
+            sections = sections_from_table(np.load(os.path.join(path, 'sections.npy')),
+                                           np.load(os.path.join(path, 'section_ids.npy')))
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            return None
+        return DataWrapper(data_block, fmt, sections)
+
+    def put(self, key, data_wrapper):
+        '''Store data_wrapper for key, and evict old entries if the cache is too big'''
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isdir(path):
+            return
+
+        tmp_path = tempfile.mkdtemp(prefix=_TMP_PREFIX, dir=self.cache_dir)
+        try:
+            table, section_ids = sections_to_table(data_wrapper.sections)
+            np.save(os.path.join(tmp_path, 'data_block.npy'),
+                    np.asarray(data_wrapper.data_block))
+            np.save(os.path.join(tmp_path, 'sections.npy'), table)
+            np.save(os.path.join(tmp_path, 'section_ids.npy'), section_ids)
+            with open(os.path.join(tmp_path, 'fmt'), 'w', encoding='utf-8') as fd:
+                fd.write(u'%s' % data_wrapper.fmt)
+            entry_size = _dir_size(tmp_path)
+            os.rename(tmp_path, path)
+        except OSError as e:
+            # eg: another process stored the same entry in the meantime
+            L.debug('Could not store cache entry %s: %s', path, e)
+            return
+        finally:
+            if os.path.isdir(tmp_path):
+                shutil.rmtree(tmp_path, ignore_errors=True)
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += entry_size
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        '''Remove the least recently used entries until the cache fits in max_size'''
+        entries = sorted((os.path.getmtime(path), _dir_size(path), path)
+                         for path in self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_size:
+                break
+            L.debug('Evicting cache entry %s', path)
+            shutil.rmtree(path, ignore_errors=True)
+            self._size -= size
+
+    def clear(self):
+        '''Remove all the entries'''
+        for path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+        self._size = 0
+
+
+_CACHES = {}
+
+
+def get_cache(cache_dir):
+    '''Get the DataCache for cache_dir
+
+    cache_dir can be either a path, in which case a DataCache with the default
+    maximum size is shared by all callers using that path, or a DataCache.
+    '''
+    if isinstance(cache_dir, DataCache):
+        return cache_dir
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = DataCache(cache_dir)
+    return _CACHES[cache_dir]
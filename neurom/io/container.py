@@ -0,0 +1,208 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Single file container of the raw data of many morphologies
+
+Loading a population from individual files opens, stats and parses every file. A container
+holds the already parsed data of all the morphologies in one HDF5 file:
+
+    data_block: the concatenated data blocks
+    sections, section_ids: the concatenated section tables,
+        see neurom.io.datawrapper.sections_to_table
+    offsets: one [data_block, sections, section_ids] row per morphology, the start of
+        its rows in each dataset, followed by a row with the total sizes
+    names, fmts: the name and the file format designation of each morphology
+
+The section tables reference the rows of the data block of their own morphology, so that
+the data of a morphology is read with a single slice of each dataset.
+'''
+
+import logging
+import os
+from collections import OrderedDict
+
+import h5py
+import numpy as np
+
+from neurom.exceptions import NeuroMError
+from neurom.fst._core import FstNeuron
+from neurom.io.datawrapper import DataWrapper, sections_from_table, sections_to_table
+
+L = logging.getLogger(__name__)
+
+CONTAINER_VERSION = 1
+
+_VERSION_ATTR = 'neurom_container'
+_CHUNK_ROWS = 8192
+
+
+def is_container(path):
+    '''Check if path is a morphology container file'''
+    if not os.path.isfile(path) or not h5py.is_hdf5(path):
+        return False
+    with h5py.File(path, 'r') as h5file:
+        return _VERSION_ATTR in h5file.attrs
+
+
+def _append(dataset, values):
+    '''Append values to the first axis of a resizable dataset'''
+    start = len(dataset)
+    dataset.resize(start + len(values), axis=0)
+    dataset[start:] = values
+
+
+def _create_datasets(h5file):
+    '''Create the empty resizable data_block, sections and section_ids datasets'''
+    return (h5file.create_dataset('data_block', shape=(0, 7), maxshape=(None, 7),
+                                  chunks=(_CHUNK_ROWS, 7), dtype=np.float64),
+            h5file.create_dataset('sections', shape=(0, 5), maxshape=(None, 5),
+                                  chunks=(_CHUNK_ROWS, 5), dtype=np.int64),
+            h5file.create_dataset('section_ids', shape=(0, ), maxshape=(None, ),
+                                  chunks=(_CHUNK_ROWS, ), dtype=np.int64))
+
+
+def _write_data(datasets, rdw):
+    '''Append the raw data of a morphology to the datasets of _create_datasets
+
+    Returns:
+        The sizes of the datasets, ie: the offsets of the next morphology
+    '''
+    data_block, sections, section_ids = datasets
+    table, ids = sections_to_table(rdw.sections)
+    _append(data_block, np.asarray(rdw.data_block, dtype=np.float64))
+    _append(sections, table)
+    _append(section_ids, ids)
+    return len(data_block), len(sections), len(section_ids)
+
+
+def write_container(output, files, ignored_exceptions=(), remove_duplicates=False):
+    '''Write the raw data of morphology files to a container file
+
+    Args:
+        output: path of the container file, it is overwritten if it exists
+        files: directory path or list of morphology file paths
+        ignored_exceptions: NeuroMError classes for which files are skipped
+        remove_duplicates: remove the duplicate first point of the sections of h5 files
+
+    Returns:
+        The names of the morphologies in the container, ie: the file names without
+        their extension
+    '''
+    from neurom.io.utils import get_files_by_path, load_data
+
+    if not isinstance(files, (list, tuple)):
+        files = get_files_by_path(files)
+
+    ignored_exceptions = tuple(ignored_exceptions)
+    # the file format of each morphology, by name
+    fmts, offsets = OrderedDict(), [(0, 0, 0)]
+    with h5py.File(output, 'w') as h5file:
+        h5file.attrs[_VERSION_ATTR] = CONTAINER_VERSION
+        datasets = _create_datasets(h5file)
+
+        for filename in files:
+            name = os.path.splitext(os.path.basename(filename))[0]
+            if name in fmts:
+                raise NeuroMError('Duplicate morphology name "%s" for file %s' %
+                                  (name, filename))
+            try:
+                rdw = load_data(filename, remove_duplicates=remove_duplicates)
+            except ignored_exceptions as e:
+                L.info('Ignoring exception "%s" for file %s', e, os.path.basename(filename))
+                continue
+
+            offsets.append(_write_data(datasets, rdw))
+            fmts[name] = rdw.fmt
+
+        h5file.create_dataset('offsets', data=np.array(offsets, dtype=np.int64))
+        h5file.create_dataset('names', data=np.array([n.encode('utf-8') for n in fmts],
+                                                     dtype=np.bytes_))
+        h5file.create_dataset('fmts', data=np.array([f.encode('utf-8') for f in fmts.values()],
+                                                    dtype=np.bytes_))
+    return list(fmts)
+
+
+class MorphologyContainer(object):
+    '''Random access by name to the morphologies of a container file
+
+    The names, formats and offsets of the morphologies are read when the container is
+    opened, the data of a morphology is read when it is loaded.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._h5file = h5py.File(path, 'r')
+        if _VERSION_ATTR not in self._h5file.attrs:
+            self._h5file.close()
+            raise NeuroMError('%s is not a morphology container' % path)
+
+        self.names = [n.decode('utf-8') for n in self._h5file['names'][:].tolist()]
+        self._fmts = [f.decode('utf-8') for f in self._h5file['fmts'][:].tolist()]
+        self._offsets = self._h5file['offsets'][:]
+        self._index = dict((name, i) for i, name in enumerate(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __reduce__(self):
+        # the HDF5 file handle can not be pickled, the file is opened again
+        return MorphologyContainer, (self.path, )
+
+    def close(self):
+        '''Close the container file'''
+        self._h5file.close()
+
+    def load_data(self, name):
+        '''Get the raw data wrapper of the morphology `name`'''
+        try:
+            i = self._index[name]
+        except KeyError:
+            raise NeuroMError("Can not find morphology '%s' in container %s" %
+                              (name, self.path))
+        (block_start, table_start, ids_start), (block_stop, table_stop, ids_stop) = \
+            self._offsets[i:i + 2].tolist()
+        data_block = self._h5file['data_block'][block_start:block_stop]
+        table = self._h5file['sections'][table_start:table_stop]
+        section_ids = self._h5file['section_ids'][ids_start:ids_stop]
+        return DataWrapper(data_block, self._fmts[i], sections_from_table(table, section_ids))
+
+    def load_neuron(self, name):
+        '''Get the FstNeuron of the morphology `name`'''
+        return FstNeuron(self.load_data(name), name)
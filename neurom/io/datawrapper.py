@@ -31,10 +31,12 @@
 import logging
 
 from collections import defaultdict, namedtuple
-from neurom.core.dataformat import POINT_TYPE, COLS, ROOT_ID
 
 import numpy as np
 
+from neurom.core.dataformat import POINT_TYPE, COLS, ROOT_ID
+from neurom.exceptions import MissingParentError, RawDataError
+
 L = logging.getLogger(__name__)
 
 
@@ -86,6 +88,16 @@ class DataWrapper(object):
         db = self.data_block
         return db[db[:, COLS.TYPE] == POINT_TYPE.SOMA]
 
+    def __reduce__(self):
+        '''Pickle the sections as a table of arrays instead of DataBlockSection objects'''
+        return (_rebuild_data_wrapper,
+                (self.data_block, self.fmt) + sections_to_table(self.sections))
+
+
+def _rebuild_data_wrapper(data_block, fmt, table, section_ids):
+    '''Build a DataWrapper from a data block and a table of sections, see sections_to_table'''
+    return DataWrapper(data_block, fmt, sections_from_table(table, section_ids))
+
 
 def _merge_sections(sec_a, sec_b):
     '''Merge two sections
@@ -101,28 +113,10 @@ def _merge_sections(sec_a, sec_b):
     sec_a.ntype = 0
 
 
-def _section_end_points(structure_block, id_map):
-    '''Get the section end-points'''
-    soma_idx = structure_block[:, TYPE] == POINT_TYPE.SOMA
-    soma_ids = structure_block[soma_idx, ID]
-    neurite_idx = structure_block[:, TYPE] != POINT_TYPE.SOMA
-    neurite_rows = structure_block[neurite_idx, :]
-    soma_end_pts = set(id_map[id_]
-                       for id_ in soma_ids[np.in1d(soma_ids, neurite_rows[:, PID])])
-
-    # end points have either no children or more than one
-    # ie: leaf or multifurcation nodes
-    n_children = defaultdict(int)
-    for row in structure_block:
-        n_children[row[PID]] += 1
-    end_pts = set(i for i, row in enumerate(structure_block)
-                  if n_children[row[ID]] != 1)
-
-    return end_pts.union(soma_end_pts)
-
-
 class DataBlockSection(object):
     '''sections ((ids), type, parent_id)'''
+    __slots__ = ('ids', 'ntype', 'pid')
+
     def __init__(self, ids=None, ntype=0, pid=-1):
         self.ids = [] if ids is None else ids
         self.ntype = ntype
@@ -140,10 +134,146 @@ class DataBlockSection(object):
     __repr__ = __str__
 
 
+def _section_end_points(structure_block, parents):
+    '''Get a boolean mask of the section end-points
+
+    Args:
+        structure_block: the [TYPE, ID, PID] columns of the data block
+        parents: the row of the parent of each row, -1 for the root
+    '''
+    n_rows = len(structure_block)
+    has_parent = parents != ROOT_ID
+
+    # end points have either no children or more than one
+    # ie: leaf or multifurcation nodes
+    n_children = np.bincount(parents[has_parent], minlength=n_rows)
+    end_pts = n_children != 1
+
+    # soma points with neurite children are end points as well
+    is_soma = structure_block[:, TYPE] == POINT_TYPE.SOMA
+    n_neurite_children = np.bincount(parents[has_parent & ~is_soma], minlength=n_rows)
+    end_pts |= is_soma & (n_neurite_children > 0)
+
+    return end_pts
+
+
+def _parent_rows(structure_block, sorted_rows, sorted_ids):
+    '''Get the row of the parent of each row, -1 for the root
+
+    Args:
+        structure_block: the [TYPE, ID, PID] columns of the data block
+        sorted_rows, sorted_ids: the rows sorting the IDs, and the sorted IDs
+    '''
+    pids = structure_block[:, PID]
+    pos = np.minimum(np.searchsorted(sorted_ids, pids), len(sorted_ids) - 1)
+    found = sorted_ids[pos] == pids
+    missing = ~found & (pids != ROOT_ID)
+    if np.any(missing):
+        raise MissingParentError('Missing parent IDs: %s' % np.unique(pids[missing]))
+    return np.where(found, sorted_rows[pos], ROOT_ID)
+
+
+def _section_starts(parents, end_pts):
+    '''Get the rows starting a section, and a boolean mask of the 'gap' rows
+
+    A row following an end point starts a new section, unless the end point is
+    itself the first row of a 'gap' section, ie:
+        after_end[i] = end_pts[i - 1] & (contiguous[i - 1] | after_end[i - 1])
+    which is resolved by finding the last contiguous row of each run of end points
+    '''
+    rows = np.arange(len(parents))
+    contiguous = parents == rows - 1
+    contiguous[0] = True
+    last_contiguous = np.maximum.accumulate(np.where(contiguous, rows, -1))
+    last_not_end = np.maximum.accumulate(np.where(end_pts, -1, rows))
+    after_end = np.empty(len(parents), dtype=bool)
+    after_end[0] = True
+    after_end[1:] = (last_contiguous > last_not_end)[:-1]
+
+    # a 'gap' is when a section has part of it's segments interleaved
+    # with those of another section
+    gap = ~after_end & ~contiguous
+
+    return np.flatnonzero(after_end | gap), gap
+
+
+def _section_parents(parents, starts, end_pts, gap):
+    '''Get the parent section of each section, -2 if no section ends at its first row
+
+    The last row of each section, except if the last section isn't
+    terminated by an end point, maps to that section
+    '''
+    n_rows = len(parents)
+    stops = np.append(starts[1:], n_rows)
+    closed = np.ones(len(starts), dtype=bool)
+    closed[-1] = end_pts[-1] and not gap[-1]
+    parent_section = np.full(n_rows + 1, -2, dtype=np.intp)
+    parent_section[stops[closed] - 1] = np.flatnonzero(closed)
+    parent_section[ROOT_ID] = ROOT_ID
+    return parent_section[parents[starts]].tolist()
+
+
+def _make_sections(structure_block, parents, starts):
+    '''Make the sections of the rows up to the next start, their parent section is not set'''
+    n_rows = len(structure_block)
+    # first in section point is parent
+    section_ids = np.insert(np.arange(n_rows), starts, parents[starts]).tolist()
+    offsets = (np.append(starts, n_rows) + np.arange(len(starts) + 1)).tolist()
+    types = structure_block[starts, TYPE].tolist()
+    return [DataBlockSection(section_ids[begin:end], ntype)
+            for begin, end, ntype in zip(offsets[:-1], offsets[1:], types)]
+
+
 def _extract_sections(data_block):
-    '''Make a list of sections from an SWC-style data wrapper block'''
+    '''Make a list of sections from an SWC-style data wrapper block
+
+    This is the array based equivalent of _extract_sections_by_row:
+        - the parent row of each row is found by a lookup in the sorted IDs
+        - a row starts a section if the previous row ended one, or if its parent
+          is not the previous row, ie: a 'gap'
+        - each section is the range of rows up to the next start, prepended by
+          the parent row of its first row
+
+    Data blocks with repeated IDs are handled by _extract_sections_by_row.
+    '''
     structure_block = data_block[:, COLS.TYPE:COLS.COL_COUNT].astype(np.int)
+    n_rows = len(structure_block)
+    if n_rows == 0:
+        return [DataBlockSection()]
+
+    sorted_rows = np.argsort(structure_block[:, ID], kind='mergesort')
+    sorted_ids = structure_block[sorted_rows, ID]
+    if np.any(sorted_ids[1:] == sorted_ids[:-1]):
+        return _extract_sections_by_row(structure_block)
+
+    parents = _parent_rows(structure_block, sorted_rows, sorted_ids)
+    end_pts = _section_end_points(structure_block, parents)
+    starts, gap = _section_starts(parents, end_pts)
+
+    sections = _make_sections(structure_block, parents, starts)
+    gap_sections = set(np.flatnonzero(gap[starts[1:]]).tolist())
+
+    for sec, pid in zip(sections, _section_parents(parents, starts, end_pts, gap)):
+        # get the section parent ID from the id of the first point.
+        if sec.ids:
+            if pid == -2:
+                raise RawDataError('No section ends at row %d' % sec.ids[0])
+            sec.pid = pid
+
+        # join gap sections and "disable" first half
+        if sec.pid in gap_sections:
+            _merge_sections(sections[sec.pid], sec)
+
+    # TODO find a way to remove empty sections.  Currently they are
+    # required to maintain tree integrity.
+    return sections
+
 
+def _extract_sections_by_row(structure_block):
+    '''Make a list of sections walking the structure block row by row
+
+    This handles any structure block, including ones with repeated IDs.
+    '''
     # SWC ID -> structure_block position
     id_map = {-1: -1}
     for i, row in enumerate(structure_block):
@@ -151,7 +281,7 @@ def _extract_sections(data_block):
 
     # end points have either no children, more than one, or are the start
     # of a new gap
-    sec_end_pts = _section_end_points(structure_block, id_map)
+    sec_end_pts = _section_end_points_by_row(structure_block, id_map)
 
     # a 'gap' is when a section has part of it's segments interleaved
     # with those of another section
@@ -193,7 +323,7 @@ def _extract_sections(data_block):
                 curr_section.ids.extend((parent_id, row_id))
                 curr_section.ntype = row[TYPE]
                 gap_sections.add(len(sections) - 2)
-            elif row_id != len(data_block) - 1:
+            elif row_id != len(structure_block) - 1:
                 # avoid creating an extra DataBlockSection for last row if it's a leaf
                 curr_section = new_section()
 
@@ -211,6 +341,60 @@ def _extract_sections(data_block):
     return sections
 
 
+def _section_end_points_by_row(structure_block, id_map):
+    '''Get the section end-points'''
+    soma_idx = structure_block[:, TYPE] == POINT_TYPE.SOMA
+    soma_ids = structure_block[soma_idx, ID]
+    neurite_idx = structure_block[:, TYPE] != POINT_TYPE.SOMA
+    neurite_rows = structure_block[neurite_idx, :]
+    soma_end_pts = set(id_map[id_]
+                       for id_ in soma_ids[np.in1d(soma_ids, neurite_rows[:, PID])])
+
+    # end points have either no children or more than one
+    # ie: leaf or multifurcation nodes
+    n_children = defaultdict(int)
+    for row in structure_block:
+        n_children[row[PID]] += 1
+    end_pts = set(i for i, row in enumerate(structure_block)
+                  if n_children[row[ID]] != 1)
+
+    return end_pts.union(soma_end_pts)
+
+
+# section table columns
+IS_SLICE, START, STOP, NTYPE, SECTION_PID = range(5)
+
+
+def sections_to_table(sections):
+    '''Get the arrays describing a list of DataBlockSection
+
+    Returns:
+        table: one [IS_SLICE, START, STOP, NTYPE, SECTION_PID] row per section. START and STOP
+            are the bounds of the slice for sections defined by slices, and the range of the ids
+            of the section in section_ids otherwise
+        section_ids: the concatenated ids of the sections not defined by slices
+    '''
+    table = []  # the rows, concatenated
+    section_ids = []
+    for sec in sections:
+        if isinstance(sec.ids, slice):
+            table.extend((1, sec.ids.start, sec.ids.stop, sec.ntype, sec.pid))
+        else:
+            start = len(section_ids)
+            section_ids.extend(sec.ids)
+            table.extend((0, start, len(section_ids), sec.ntype, sec.pid))
+    return (np.array(table, dtype=np.int64).reshape(-1, 5),
+            np.array(section_ids, dtype=np.int64))
+
+
+def sections_from_table(table, section_ids):
+    '''Get the list of DataBlockSection described by the arrays from sections_to_table'''
+    section_ids = section_ids.tolist()
+    return [DataBlockSection(slice(start, stop) if is_slice else section_ids[start:stop],
+                             ntype, pid)
+            for is_slice, start, stop, ntype, pid in table.tolist()]
+
+
 class BlockNeuronBuilder(object):
     '''Helper to create DataWrapper for 'block' sections
 
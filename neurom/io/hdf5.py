@@ -41,11 +41,17 @@ There is one such row per measured point.
 
 '''
 
+import logging
+from io import BytesIO
+
 import h5py
 import numpy as np
-from future.moves.itertools import zip_longest
 
-from .datawrapper import BlockNeuronBuilder, DataWrapper
+from neurom.core.dataformat import COLS, POINT_TYPE, ROOT_ID
+
+from .datawrapper import DataBlockSection, DataWrapper
+
+L = logging.getLogger(__name__)
 
 
 def get_version(h5file):
@@ -70,9 +76,12 @@ def read(filename, remove_duplicates=False, data_wrapper=DataWrapper):
     * Unpacks the first block it finds out of ('repaired', 'unraveled', 'raw')
 
     Parameters:
+        filename: file name, binary file-like object or bytes buffer
         remove_duplicates: boolean, If True removes duplicate points
         from the beginning of each section.
     '''
+    if isinstance(filename, (bytes, bytearray, memoryview)) and not isinstance(filename, str):
+        filename = BytesIO(filename)
     with h5py.File(filename, mode='r') as h5file:
         version = get_version(h5file)
         if version == 'H5V1':
@@ -85,16 +94,66 @@ def read(filename, remove_duplicates=False, data_wrapper=DataWrapper):
     if remove_duplicates:
         points, groups = _remove_duplicate_points(points, groups)
 
-    neuron_builder = BlockNeuronBuilder()
     points[:, POINT_DIAMETER] /= 2  # Store radius, not diameter
-    for id_, row in enumerate(zip_longest(groups,
-                                          groups[1:, GPFIRST],
-                                          fillvalue=len(points))):
-        (point_start, section_type, parent_id), point_end = row
-        neuron_builder.add_section(id_, int(parent_id), int(section_type),
-                                   points[point_start:point_end])
+    data_block, sections = _make_data_block(points, groups)
+    return data_wrapper(data_block, version, sections)
+
+
+def _group_rows(points, groups):
+    '''Get the rows of the points of each group in the data block
+
+    Returns:
+        offsets, stops: the first row and the row after the last one of each group
+        rows: the point of each row of the data block, a slice if they are in order
+    '''
+    starts = groups[:, GPFIRST].astype(np.intp)
+    lengths = np.maximum(np.append(starts[1:], len(points)) - starts, 0)
+    stops = np.cumsum(lengths)
+    offsets = stops - lengths
+    row_count = int(stops[-1]) if len(groups) else 0
+
+    if np.array_equal(starts, offsets) and row_count == len(points):
+        rows = slice(None)
+    else:
+        rows = np.arange(row_count) - np.repeat(offsets - starts, lengths)
+    return offsets, stops, rows
+
+
+def _make_data_block(points, groups):
+    '''Make a data_block and sections list as required by DataWrapper
+
+    This is the array based equivalent of adding each group to a BlockNeuronBuilder:
+    the points of group i are points[groups[i, GPFIRST]:groups[i + 1, GPFIRST]]
+    and the first point of a group is connected to the last point of its parent group.
+    '''
+    offsets, stops, rows = _group_rows(points, groups)
+    lengths = stops - offsets
+    row_count = int(stops[-1]) if len(stops) else 0
+
+    data_block = np.empty((row_count, COLS.COL_COUNT), dtype=np.float)
+    data_block[:, COLS.XYZR] = points[rows, :4]
+    data_block[:, COLS.TYPE] = np.repeat(groups[:, GTYPE], lengths)
+    data_block[:, COLS.ID] = np.arange(len(data_block))
+    data_block[:, COLS.P] = data_block[:, COLS.ID] - 1
+
+    # the first point of a section is connected to the last point of its parent,
+    # groups with an unknown parent are roots
+    parents = groups[:, GPID].astype(np.intp)
+    has_parent = (parents >= 0) & (parents < len(groups))
+    first_rows = np.where(has_parent, stops[np.where(has_parent, parents, 0)] - 1, ROOT_ID)
+    non_empty = lengths > 0
+    data_block[offsets[non_empty], COLS.P] = first_rows[non_empty]
+
+    n_somata = np.count_nonzero(groups[:, GTYPE] == POINT_TYPE.SOMA)
+    if n_somata != 1:
+        L.info('Have %d somas, expected 1', n_somata)
+
+    sections = [DataBlockSection(slice(start, stop), section_type, parent_id)
+                for start, stop, section_type, parent_id in
+                zip(offsets.tolist(), stops.tolist(),
+                    groups[:, GTYPE].astype(int).tolist(), parents.tolist())]
 
-    return neuron_builder.get_datawrapper(version, data_wrapper=data_wrapper)
+    return data_block, sections
 
 
 def _remove_duplicate_points(points, groups):
@@ -106,24 +165,24 @@ def _remove_duplicate_points(points, groups):
 
     '''
 
-    group_initial_ids = groups[:, GPFIRST]
+    section_types = groups[:, GTYPE]
+    parent_ids = groups[:, GPID]
 
-    to_be_reduced = np.zeros(len(group_initial_ids))
-    to_be_removed = []
+    # Remove first point from sections that are
+    # not the root section, a soma, or a child of a soma
+    has_parent = parent_ids != -1
+    parent_types = section_types[np.where(has_parent, parent_ids, 0)]
+    duplicated = (has_parent &
+                  (section_types != POINT_TYPE.SOMA) &
+                  (parent_types != POINT_TYPE.SOMA))
 
-    for ig, g in enumerate(groups):
-        iid, typ, pid = g[GPFIRST], g[GTYPE], g[GPID]
-        # Remove first point from sections that are
-        # not the root section, a soma, or a child of a soma
-        if pid != -1 and typ != 1 and groups[pid][GTYPE] != 1:
-            # Remove duplicate from list of points
-            to_be_removed.append(iid)
-            # Reduce the id of the following sections
-            # in groups structure by one
-            to_be_reduced[ig + 1:] += 1
+    # Remove duplicate from list of points
+    points = np.delete(points, groups[duplicated, GPFIRST], axis=0)
 
-    groups[:, GPFIRST] = groups[:, GPFIRST] - to_be_reduced
-    points = np.delete(points, to_be_removed, axis=0)
+    # Reduce the id of the following sections
+    # in groups structure by the number of points removed before them
+    n_removed = np.cumsum(duplicated)
+    groups[1:, GPFIRST] -= n_removed[:-1].astype(groups.dtype)
 
     return points, groups
 
@@ -31,12 +31,13 @@ Neuroludica
 '''
 
 import logging
+import re
 import warnings
-from io import open
+from io import IOBase, open
 
 import numpy as np
 
-from neurom._compat import StringType
+from neurom._compat import StringType, range
 from neurom.core.dataformat import COLS, POINT_TYPE
 
 from .datawrapper import DataWrapper
@@ -60,6 +61,19 @@ UNWANTED_SECTION_NAMES = [
 UNWANTED_SECTIONS = dict([(name, True) for name in UNWANTED_SECTION_NAMES])
 L = logging.getLogger(__name__)
 
+_COMMENT = re.compile(r';[^\n]*')
+# tokens of the content of a file, once comments are removed, one of:
+#  - the values of a row of 4 numbers, eg: (1 2 3 4)
+#  - the content of a list without nested lists nor quotes
+#  - a parenthesis, a quoted string (possibly containing whitespace and parentheses,
+#    on a single line), an unterminated quoted string (ignored), any other token
+_NUMBER = r'[-+.0-9eE]+'
+_TOKEN = re.compile(r'''\s*(?:\(\s*({0}\s+{0}\s+{0}\s+{0})\s*\)|
+                           \(([^()"]*)\)|
+                           ([()]|"(?:[^\s()]*")?(?![^\s()])|"[^\n]*?"(?![^\s()])|"[^\n]*|[^\s()]+))
+                    '''.format(_NUMBER), re.UNICODE | re.VERBOSE)
+_UNWANTED = frozenset(UNWANTED_SECTION_NAMES)
+
 
 def _match_section(section, match):
     '''checks whether the `type` of section is in the `match` dictionary
@@ -84,140 +98,193 @@ def _match_section(section, match):
     return None
 
 
-def _get_tokens(morph_fd):
-    '''split a file-like into tokens: split on whitespace
+def _close_section(stack, current):
+    '''Append the section current to its parent, on top of the stack, unless it is unwanted
 
-    Note: this also strips newlines and comments
-    '''
-    for line in morph_fd:
-        line = line.rstrip()   # remove \r\n
-        line = line.split(';', 1)[0]  # strip comments
-        squash_token = []  # quoted strings get squashed into one token
-        for token in line.replace('(', ' ( ').replace(')', ' ) ').split():
-            if squash_token:
-                squash_token.append(token)
-                if token.endswith('"'):
-                    token = ' '.join(squash_token)
-                    squash_token = []
-                    yield token
-            elif token.startswith('"') and not token.endswith('"'):
-                squash_token.append(token)
-            else:
-                yield token
-
-
-def _parse_section(token_iter):
-    '''take a stream of tokens, and create the tree structure that is defined
-    by the s-expressions
+    Returns:
+        the parent section
     '''
-    sexp = []
-    for token in token_iter:
-        if token == '(':
-            new_sexp = _parse_section(token_iter)
-            if not _match_section(new_sexp, UNWANTED_SECTIONS):
-                sexp.append(new_sexp)
-        elif token == ')':
-            return sexp
-        else:
-            sexp.append(token)
-    return sexp
+    parent = stack.pop()
+    if not _match_section(current, UNWANTED_SECTIONS):
+        parent.append(current)
+    return parent
+
+
+def _token_value(token):
+    '''Get the value of a token in a section, None for an unterminated quoted string'''
+    if token[0] != '"':
+        return token
+    if token[-1] == '"':
+        return ' '.join(token.replace('(', ' ( ').replace(')', ' ) ').split())
+    return None
+
+
+def _parse_text(text):
+    '''returns array of all the sections that exist in the content of a file
 
+    The format is nested lists that correspond to the s-expressions, except that
+    the rows of 4 numbers are replaced by their index in the returned list of row
+    values. The tokens are found with a regex, lists without nested lists are split
+    in one go, and the nesting is tracked with a stack instead of recursion.
 
-def _parse_sections(morph_fd):
-    '''returns array of all the sections that exist
+    Rows and tokens outside of the sections are ignored.
 
-    The format is nested lists that correspond to the s-expressions
+    Returns:
+        sections, row_values: the list of the values of the rows of 4 numbers, as strings,
+            including the rows of the ignored sections
     '''
     sections = []
-    token_iter = _get_tokens(morph_fd)
-    for token in token_iter:
-        if token == '(':  # find top-level sections
-            section = _parse_section(token_iter)
-            if not _match_section(section, UNWANTED_SECTIONS):
-                sections.append(section)
-    return sections
+    row_values = []
+    stack = []
+    current = sections
+    for values, content, token in _TOKEN.findall(_COMMENT.sub('', text)):
+        if values:
+            if stack:
+                current.append(len(row_values))
+                row_values.append(values)
+        elif not token:
+            sexp = content.split()
+            if _UNWANTED.isdisjoint(sexp[:5]):
+                current.append(sexp)
+        elif token == '(':
+            stack.append(current)
+            current = []
+        elif token == ')':
+            if stack:
+                current = _close_section(stack, current)
+        elif stack:
+            value = _token_value(token)
+            if value is not None:
+                current.append(value)
 
+    while stack:  # close the sections left open at the end of the file
+        current = _close_section(stack, current)
 
-def _flatten_subsection(subsection, _type, offset, parent):
+    return sections, row_values
+
+
+def _flatten_section(subsection, parent):
     '''Flatten a subsection from its nested version
 
+    The nested subsections are handled with a stack instead of recursion, and the
+    values are not converted
+
     Args:
-        subsection: Nested subsection as produced by _parse_section, except one level in
-        _type: type of section, ie: AXON, etc
+        subsection: Nested subsection as produced by _parse_text, except one level in
         parent: first element has this as it's parent
-        offset: position in the final array of the first element
 
     Returns:
-        Generator of values corresponding to [X, Y, Z, R, TYPE, ID, PARENT_ID]
+        the points, either indices in the row values of _parse_text or lists of [X, Y, Z, D]
+        strings, and the list of their parents
     '''
-    for row in subsection:
-        # TODO: Figure out what these correspond to in neurolucida
-        if row in ('Low', 'Generated', 'High', ):
-            continue
-        elif isinstance(row[0], StringType):
-            if len(row) in (4, 5, ):
-                if len(row) == 5:
-                    assert row[4][0] == 'S', \
-                        'Only known usage of a fifth member is Sn, found: %s' % row[4][0]
-                yield (float(row[0]), float(row[1]), float(row[2]), float(row[3]) / 2.,
-                       _type, offset, parent)
-                parent = offset
-                offset += 1
-        elif isinstance(row[0], list):
-            split_parent = offset - 1
-            start_offset = 0
-
-            slices = []
-            start = 0
-            for i, value in enumerate(row):
-                if value == '|':
-                    slices.append(slice(start + start_offset, i))
-                    start = i + 1
-            slices.append(slice(start + start_offset, len(row)))
-
-            for split_slice in slices:
-                for _row in _flatten_subsection(row[split_slice], _type, offset,
-                                                split_parent):
-                    offset += 1
-                    yield _row
-
-
-def _extract_section(section):
-    '''Find top level sections, and get their flat contents, and append them all
+    points = []
+    parents = []
+    stack = [(iter(subsection), parent)]
+    while stack:
+        rows, parent = stack.pop()
+        for row in rows:
+            if isinstance(row, int):
+                points.append(row)
+                parents.append(parent)
+                parent = len(points) - 1
+            # TODO: Figure out what these correspond to in neurolucida
+            elif row in ('Low', 'Generated', 'High', ):
+                continue
+            elif isinstance(row[0], StringType):
+                if len(row) in (4, 5, ):
+                    if len(row) == 5:
+                        assert row[4][0] == 'S', \
+                            'Only known usage of a fifth member is Sn, found: %s' % row[4][0]
+                    points.append(list(row[:4]))
+                    parents.append(parent)
+                    parent = len(points) - 1
+            elif isinstance(row[0], (list, int)):
+                # the next rows are handled once the subsections split by '|' are
+                split_parent = len(points) - 1
+                stack.append((rows, parent))
+
+                end = len(row)
+                for i in range(len(row) - 1, -1, -1):
+                    if row[i] == '|':
+                        stack.append((iter(row[i + 1:end]), split_parent))
+                        end = i
+                stack.append((iter(row[:end]), split_parent))
+                break
+
+    return points, parents
+
+
+def _points_values(points, row_values):
+    '''Convert the points of _flatten_section to an array of [X, Y, Z, D]'''
+    values = [row_values[point] if isinstance(point, int) else ' '.join(point)
+              for point in points]
+    with warnings.catch_warnings():
+        # a string that can't be fully parsed is checked with the float conversion
+        warnings.simplefilter('ignore', DeprecationWarning)
+        ret = np.fromstring(' '.join(values), sep=' ')
+    if len(ret) == 4 * len(points):
+        return ret.reshape(-1, 4)
+    return np.array([row_values[point].split() if isinstance(point, int) else point
+                     for point in points], dtype=np.float64)
+
+
+def _section_type(section):
+    '''Find the type of a section, and the position of its first row
 
-    Returns a numpy array with the row format:
-        [X, Y, Z, R, TYPE, ID, PARENT_ID]
-
-    Note: PARENT_ID starts at -1 for soma and 0 for neurites
+    Returns:
+        None, None if the section has no type
     '''
+    def head(element):
+        '''the first element of an element, the index of a row has none'''
+        return None if isinstance(element, int) else element[0]
+
     # sections with only one element will be skipped,
     if len(section) == 1:
         assert section[0] == 'Sections', \
             ('Only known usage of a single Section content is "Sections", found %s' %
              section[0])
-        return None
+        return None, None
 
     # try and detect type
-    _type = WANTED_SECTIONS.get(section[0][0], None)
+    _type = WANTED_SECTIONS.get(head(section[0]), None)
+    if _type is not None:
+        return _type, 1
 
-    start = 1
     # CellBody often has [['"CellBody"'], ['CellBody'] as its first two elements
-    if _type is None:
-        _type = WANTED_SECTIONS.get(section[1][0], None)
+    _type = WANTED_SECTIONS.get(head(section[1]), None)
+    if _type is not None:
+        return _type, 2
 
-        if _type is None:  # can't determine the type
-            return None
-        start = 2
+    return None, None
 
-    parent = -1 if _type == POINT_TYPE.SOMA else 0
-    subsection_iter = _flatten_subsection(section[start:], _type, offset=0,
-                                          parent=parent)
 
-    ret = np.array([row for row in subsection_iter])
+def _extract_points(section, row_values):
+    '''Get the flat contents of a section of _parse_text
+
+    Returns a numpy array with the row format:
+        [X, Y, Z, R, TYPE, ID, PARENT_ID]
+
+    Note: PARENT_ID starts at -1 for soma and 0 for neurites
+    '''
+    _type, start = _section_type(section)
+    if _type is None:
+        return None
+
+    parent = -1 if _type == POINT_TYPE.SOMA else 0
+    points, parents = _flatten_section(section[start:], parent)
+    if not points:
+        return np.array([])
+
+    ret = np.empty((len(points), 7), dtype=np.float64)
+    ret[:, COLS.XYZR] = _points_values(points, row_values)
+    ret[:, COLS.R] /= 2.
+    ret[:, COLS.TYPE] = _type
+    ret[:, COLS.ID] = np.arange(len(points))
+    ret[:, COLS.P] = parents
     return ret
 
 
-def _sections_to_raw_data(sections):
+def _sections_to_raw_data(sections, row_values):
     '''convert list of sections into the `raw_data` format used in neurom
 
     This finds the soma, and attaches the neurites
@@ -225,7 +292,7 @@ def _sections_to_raw_data(sections):
     soma = None
     neurites = []
     for section in sections:
-        neurite = _extract_section(section)
+        neurite = _extract_points(section, row_values)
         if neurite is None:
             continue
         elif neurite[0][COLS.TYPE] == POINT_TYPE.SOMA:
@@ -252,9 +319,28 @@ def _sections_to_raw_data(sections):
     return ret
 
 
+def _read_text(handle):
+    '''Get the content of a file name, a file-like object or a bytes buffer as text'''
+    if isinstance(handle, StringType):
+        with open(handle, encoding='utf-8', errors='replace') as morph_fd:
+            return morph_fd.read()
+    if not isinstance(handle, (bytes, bytearray, memoryview)):
+        if isinstance(handle, IOBase) and handle.seekable():
+            handle.seek(0)
+        handle = handle.read()
+    if not isinstance(handle, StringType):
+        handle = bytes(handle).decode('utf-8', 'replace')
+    if '\r' in handle:  # universal newlines, as when reading a file in text mode
+        handle = handle.replace('\r\n', '\n').replace('\r', '\n')
+    return handle
+
+
 def read(morph_file, data_wrapper=DataWrapper):
     '''return a 'raw_data' np.array with the full neuron, and the format of the file
     suitable to be wrapped by DataWrapper
+
+    Parameters:
+        morph_file: file name, file-like object or bytes buffer
     '''
 
     msg = ('This is an experimental reader. '
@@ -264,7 +350,6 @@ def read(morph_file, data_wrapper=DataWrapper):
     warnings.warn(msg)
     L.warning(msg)
 
-    with open(morph_file, encoding='utf-8', errors='replace') as morph_fd:
-        sections = _parse_sections(morph_fd)
-    raw_data = _sections_to_raw_data(sections)
+    sections, row_values = _parse_text(_read_text(morph_file))
+    raw_data = _sections_to_raw_data(sections, row_values)
     return data_wrapper(raw_data, 'NL-ASCII')
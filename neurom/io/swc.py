@@ -37,17 +37,46 @@ SWC format:
 
 There is one such row per measured point.
 '''
+from io import BytesIO, IOBase, open
+
 import numpy as np
+
+from neurom._compat import StringType
+
 from .datawrapper import DataWrapper
 
 
 ID, TYPE, X, Y, Z, R, P = range(7)
+SWC_COL_COUNT = 7
+
+
+def _parse(content):
+    '''Parse the content of an SWC file into an array with the SWC columns
+
+    Comments and blank lines are skipped, any whitespace separates columns and
+    the columns after the 7th one are ignored.
+    '''
+    return np.loadtxt(BytesIO(content), usecols=range(SWC_COL_COUNT), ndmin=2)
+
+
+def _read_bytes(handle):
+    '''Get the content of a file name, a file-like object or a bytes buffer as bytes'''
+    if isinstance(handle, StringType):
+        with open(handle, 'rb') as fd:
+            return fd.read()
+    if not isinstance(handle, (bytes, bytearray, memoryview)):
+        if isinstance(handle, IOBase) and handle.seekable():
+            handle.seek(0)
+        handle = handle.read()
+    return handle.encode('utf-8') if isinstance(handle, StringType) else bytes(handle)
+
 
+def read(handle, data_wrapper=DataWrapper):
+    '''Read an SWC file and return a tuple of data, format.
 
-def read(filename, data_wrapper=DataWrapper):
-    '''Read an SWC file and return a tuple of data, format.'''
-    data = np.loadtxt(filename)
-    if len(np.shape(data)) == 1:
-        data = np.reshape(data, (1, -1))
+    Parameters:
+        handle: file name, file-like object or bytes buffer
+    '''
+    data = _parse(_read_bytes(handle))
     data = data[:, [X, Y, Z, R, TYPE, ID, P]]
     return data_wrapper(data, 'SWC', None)
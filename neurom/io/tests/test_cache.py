@@ -0,0 +1,175 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Test neurom.io.cache'''
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from mock import patch
+from nose import tools as nt
+
+from neurom import get
+from neurom.io import cache, utils
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data')
+SWC_FILE = os.path.join(DATA_PATH, 'swc', 'Neuron.swc')
+H5_FILE = os.path.join(DATA_PATH, 'h5', 'v1', 'Neuron.h5')
+ASC_FILE = os.path.join(DATA_PATH, 'neurolucida', 'sample.asc')
+
+
+@contextmanager
+def _tmp_dir():
+    path = tempfile.mkdtemp()
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path)
+
+
+def _check_round_trip(filename, cache_dir):
+    ref = utils.load_data(filename)
+    rdw = utils.load_data(filename, cache_dir=cache_dir)
+    nt.eq_(len(os.listdir(cache_dir)), 1)
+
+    rdw = utils.load_data(filename, cache_dir=cache_dir)
+    nt.ok_(isinstance(rdw.data_block, np.memmap))
+    nt.eq_(rdw.fmt, ref.fmt)
+    np.testing.assert_array_equal(rdw.data_block, ref.data_block)
+    nt.eq_(rdw.sections, ref.sections)
+
+
+def test_round_trip():
+    for filename in (SWC_FILE, H5_FILE, ASC_FILE):
+        with _tmp_dir() as cache_dir:
+            _check_round_trip(filename, cache_dir)
+            cache.DataCache(cache_dir).clear()
+            nt.eq_(os.listdir(cache_dir), [])
+
+
+def test_modified_file():
+    with _tmp_dir() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'neuron.swc')
+        shutil.copy(SWC_FILE, filename)
+        data_cache = cache.DataCache(os.path.join(tmp_dir, 'cache'))
+        key = data_cache.key(filename, 'swc')
+        nt.eq_(key, data_cache.key(filename, 'swc'))
+        nt.ok_(key != data_cache.key(filename, 'asc'))
+        nt.ok_(key != data_cache.key(filename, 'swc', 'remove_duplicates'))
+
+        with open(filename, 'a') as fd:
+            fd.write('# modified\n')
+        nt.ok_(key != data_cache.key(filename, 'swc'))
+
+
+def test_get_missing():
+    with _tmp_dir() as cache_dir:
+        nt.ok_(cache.DataCache(cache_dir).get('missing') is None)
+
+
+def test_eviction():
+    rdw = utils.load_data(SWC_FILE)
+    with _tmp_dir() as cache_dir:
+        data_cache = cache.DataCache(cache_dir, max_size=1.5 * rdw.data_block.nbytes)
+        data_cache.put('first', rdw)
+        os.utime(os.path.join(cache_dir, 'first'), (0, 0))
+        data_cache.put('second', rdw)
+        nt.eq_(os.listdir(cache_dir), ['second'])
+        nt.ok_(data_cache.size() <= data_cache.max_size)
+
+
+def test_put_existing():
+    rdw = utils.load_data(SWC_FILE)
+    with _tmp_dir() as cache_dir:
+        data_cache = cache.DataCache(cache_dir)
+        data_cache.put('key', rdw)
+        data_block = os.path.join(cache_dir, 'key', 'data_block.npy')
+        mtime = os.path.getmtime(data_block)
+        data_cache.put('key', utils.load_data(H5_FILE))
+        nt.eq_(os.listdir(cache_dir), ['key'])
+        nt.eq_(os.path.getmtime(data_block), mtime)
+        np.testing.assert_array_equal(data_cache.get('key').data_block, rdw.data_block)
+
+
+def test_put_rename_error():
+    rdw = utils.load_data(SWC_FILE)
+    with _tmp_dir() as cache_dir:
+        data_cache = cache.DataCache(cache_dir)
+        with patch('os.rename', side_effect=OSError('Directory not empty')):
+            data_cache.put('key', rdw)
+        # the temporary directory is removed and nothing is stored
+        nt.eq_(os.listdir(cache_dir), [])
+        nt.ok_(data_cache.get('key') is None)
+        nt.ok_(data_cache._size is None)
+
+
+def test_load_neuron():
+    ref = utils.load_neuron(SWC_FILE)
+    with _tmp_dir() as cache_dir:
+        for _ in range(2):
+            nrn = utils.load_neuron(SWC_FILE, cache_dir=cache_dir)
+            nt.eq_(nrn.name, ref.name)
+            np.testing.assert_allclose(get('section_lengths', nrn),
+                                       get('section_lengths', ref))
+
+
+def test_load_neuron_remove_duplicates():
+    with _tmp_dir() as cache_dir:
+        for _ in range(2):
+            nrn = utils.load_neuron(H5_FILE, cache_dir=cache_dir)
+            nrn_unique = utils.load_neuron(H5_FILE, cache_dir=cache_dir,
+                                           remove_duplicates=True)
+            nt.ok_(len(nrn_unique.points) < len(nrn.points))
+        nt.eq_(len(os.listdir(cache_dir)), 2)
+
+
+def test_load_neurons():
+    files = [SWC_FILE, H5_FILE]
+    with _tmp_dir() as cache_dir:
+        pop = utils.load_neurons(files, cache_dir=cache_dir)
+        nt.eq_(len(os.listdir(cache_dir)), 2)
+        pop = utils.load_neurons(files, cache_dir=cache_dir)
+        nt.eq_([nrn.name for nrn in pop], ['Neuron', 'Neuron'])
+
+
+def test_neuron_loader():
+    with _tmp_dir() as cache_dir:
+        loader = utils.NeuronLoader(os.path.join(DATA_PATH, 'swc'), file_ext='.swc',
+                                    cache_dir=cache_dir)
+        nt.eq_(loader.get('Neuron').name, 'Neuron')
+        nt.eq_(len(os.listdir(cache_dir)), 1)
+
+
+def test_get_cache():
+    with _tmp_dir() as cache_dir:
+        data_cache = cache.get_cache(cache_dir)
+        nt.ok_(cache.get_cache(cache_dir) is data_cache)
+        nt.ok_(cache.get_cache(data_cache) is data_cache)
@@ -0,0 +1,171 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Test neurom.io.container'''
+import os
+import pickle
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from nose import tools as nt
+
+from neurom import get
+from neurom.core import LazyPopulation
+from neurom.exceptions import NeuroMError, RawDataError
+from neurom.io import container, utils
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data')
+SWC_FILE = os.path.join(DATA_PATH, 'swc', 'Neuron.swc')
+H5_FILE = os.path.join(DATA_PATH, 'h5', 'v1', 'Neuron_2_branch.h5')
+ASC_FILE = os.path.join(DATA_PATH, 'neurolucida', 'sample.asc')
+FILES = [SWC_FILE, H5_FILE, ASC_FILE]
+NAMES = ['Neuron', 'Neuron_2_branch', 'sample']
+INVALID_FILE = os.path.join(DATA_PATH, 'swc', 'Neuron_missing_ids.swc')
+
+
+@contextmanager
+def _tmp_container(files=FILES, **kwargs):
+    path = tempfile.mkdtemp()
+    try:
+        output = os.path.join(path, 'container.h5')
+        container.write_container(output, files, **kwargs)
+        yield output
+    finally:
+        shutil.rmtree(path)
+
+
+def test_round_trip():
+    with _tmp_container() as output:
+        nt.ok_(container.is_container(output))
+        with container.MorphologyContainer(output) as morphs:
+            nt.eq_(len(morphs), 3)
+            nt.eq_(list(morphs), NAMES)
+            nt.ok_('sample' in morphs)
+            for filename, name in zip(reversed(FILES), reversed(NAMES)):
+                ref = utils.load_data(filename)
+                rdw = morphs.load_data(name)
+                nt.eq_(rdw.fmt, ref.fmt)
+                np.testing.assert_array_equal(rdw.data_block, ref.data_block)
+                nt.eq_(rdw.sections, ref.sections)
+
+                nrn = morphs.load_neuron(name)
+                nt.eq_(nrn.name, name)
+                nt.eq_(get('total_length', nrn),
+                       get('total_length', utils.load_neuron(filename)))
+
+
+def test_remove_duplicates():
+    with _tmp_container([H5_FILE], remove_duplicates=True) as output:
+        with container.MorphologyContainer(output) as morphs:
+            ref = utils.load_data(H5_FILE, remove_duplicates=True)
+            np.testing.assert_array_equal(morphs.load_data('Neuron_2_branch').data_block,
+                                          ref.data_block)
+
+
+def test_is_container():
+    nt.ok_(not container.is_container(H5_FILE))
+    nt.ok_(not container.is_container(SWC_FILE))
+    nt.ok_(not container.is_container(DATA_PATH))
+    nt.assert_raises(NeuroMError, container.MorphologyContainer, H5_FILE)
+
+
+def test_directory():
+    directory = os.path.join(DATA_PATH, 'valid_set')
+    files = utils.get_morph_files(directory)
+    with _tmp_container(directory) as output:
+        with container.MorphologyContainer(output) as morphs:
+            nt.eq_(sorted(morphs),
+                   sorted(os.path.splitext(os.path.basename(f))[0] for f in files))
+            for filename in files:
+                name = os.path.splitext(os.path.basename(filename))[0]
+                np.testing.assert_array_equal(morphs.load_data(name).data_block,
+                                              utils.load_data(filename).data_block)
+
+
+@nt.raises(NeuroMError)
+def test_unknown_name():
+    with _tmp_container() as output:
+        with container.MorphologyContainer(output) as morphs:
+            morphs.load_data('unknown')
+
+
+@nt.raises(NeuroMError)
+def test_duplicate_names():
+    with _tmp_container([SWC_FILE, SWC_FILE]):
+        pass
+
+
+def test_ignored_exceptions():
+    nt.assert_raises(RawDataError, _tmp_container([INVALID_FILE]).__enter__)
+    with _tmp_container([INVALID_FILE, SWC_FILE], ignored_exceptions=(RawDataError, )) as output:
+        with container.MorphologyContainer(output) as morphs:
+            nt.eq_(list(morphs), ['Neuron'])
+
+
+def test_empty():
+    with _tmp_container([]) as output:
+        with container.MorphologyContainer(output) as morphs:
+            nt.eq_(len(morphs), 0)
+
+
+def test_pickle():
+    with _tmp_container() as output:
+        with container.MorphologyContainer(output) as morphs:
+            copy = pickle.loads(pickle.dumps(morphs))
+            nt.eq_(list(copy), NAMES)
+            np.testing.assert_array_equal(copy.load_data('Neuron').data_block,
+                                          morphs.load_data('Neuron').data_block)
+            copy.close()
+
+
+def test_load_neurons():
+    with _tmp_container() as output:
+        pop = utils.load_neurons(output)
+        nt.eq_(pop.name, 'container')
+        nt.eq_([n.name for n in pop], NAMES)
+        np.testing.assert_allclose(get('total_length', pop),
+                                   get('total_length', utils.load_neurons(FILES)))
+
+        pop = utils.load_neurons(output, lazy=True)
+        nt.ok_(isinstance(pop, LazyPopulation))
+        nt.eq_([n.name for n in pop], NAMES)
+
+        pop = utils.load_neurons(output, n_workers=2)
+        nt.eq_([n.name for n in pop], NAMES)
+
+
+def test_neuron_loader():
+    with _tmp_container() as output:
+        loader = utils.NeuronLoader(output, cache_size=2)
+        nrn = loader.get('sample')
+        nt.eq_(nrn.name, 'sample')
+        nt.ok_(loader.get('sample') is nrn)
+        nt.assert_raises(NeuroMError, loader.get, 'unknown')
@@ -1,10 +1,17 @@
 '''Test neurom.io.utils'''
 import os
+import pickle
 import numpy as np
+from mock import patch
 from nose import tools as nt
 
 from neurom.io import datawrapper as dw
-from neurom.core.dataformat import POINT_TYPE, ROOT_ID
+from neurom.io.utils import load_data
+from neurom.core.dataformat import COLS, POINT_TYPE, ROOT_ID
+from neurom.exceptions import MissingParentError, RawDataError
+
+_path = os.path.dirname(os.path.abspath(__file__))
+SWC_PATH = os.path.join(_path, '../../../test_data/swc')
 
 
 def test__merge_sections():
@@ -24,11 +31,51 @@ def test__merge_sections():
     nt.eq_(sec_b.pid, 1)
 
 
-#def test__section_end_points():
-#    _section_end_points
-#
-#def test__extract_sections():
-#    pass
+def test__section_end_points():
+    structure_block = np.array([[POINT_TYPE.SOMA, 0, -1],
+                                [POINT_TYPE.AXON, 1, 0],
+                                [POINT_TYPE.AXON, 2, 1],
+                                [POINT_TYPE.AXON, 3, 1],
+                                [POINT_TYPE.AXON, 4, 3]])
+    parents = np.array([-1, 0, 1, 1, 3])
+    nt.eq_(dw._section_end_points(structure_block, parents).tolist(),
+           [True, True, True, False, True])
+
+
+def _check_extract_sections(path):
+    data_block = load_data(path).data_block
+    structure_block = data_block[:, COLS.TYPE:COLS.COL_COUNT].astype(int)
+    nt.eq_(dw._extract_sections(data_block), dw._extract_sections_by_row(structure_block))
+
+
+def test__extract_sections():
+    for path in ['Neuron.swc',
+                 'simple.swc',
+                 'simple_reversed.swc',
+                 'split_soma_single_neurites.swc',
+                 'Neuron_zero_length_sections.swc',
+                 'ordering/sample_disordered.swc',
+                 'ordering/sample_mixed_tree_sections.swc',
+                 ]:
+        _check_extract_sections(os.path.join(SWC_PATH, path))
+
+
+def test__extract_sections_empty():
+    nt.eq_(dw._extract_sections(np.empty((0, COLS.COL_COUNT))), [dw.DataBlockSection()])
+
+
+@nt.raises(MissingParentError)
+def test__extract_sections_missing_parent():
+    dw._extract_sections(np.array([[0, 0, 0, 1, POINT_TYPE.SOMA, 0, -1],
+                                   [0, 0, 0, 1, POINT_TYPE.AXON, 1, 42]]))
+
+
+@nt.raises(RawDataError)
+def test__extract_sections_no_section_end():
+    # the first neurite point's parent comes later, so no section ends at its parent row
+    dw._extract_sections(np.array([[0, 0, 0, 1, POINT_TYPE.AXON, 1, -1],
+                                   [0, 0, 0, 1, POINT_TYPE.AXON, 2, 3],
+                                   [0, 0, 0, 1, POINT_TYPE.AXON, 3, 1]]))
 
 #DataWrapper
 #neurite_root_section_ids
@@ -61,3 +108,43 @@ def test_BlockNeuronBuilder():
                   [ 1., 0., 0., 1., 2., 1.,  0.],
                   [ 2., 0., 0., 1., 4., 2.,  0.],
                   [10., 0., 0., 1., 4., 3.,  2.]]))
+
+
+def test_BlockNeuronBuilder_soma_count():
+    builder = dw.BlockNeuronBuilder()
+    builder.add_section(0, ROOT_ID, POINT_TYPE.SOMA, np.array([[0, 0, 0, 1]]))
+    builder.add_section(1, ROOT_ID, POINT_TYPE.SOMA, np.array([[5, 0, 0, 1]]))
+    builder.add_section(2, 0, POINT_TYPE.AXON, np.array([[1, 0, 0, 1]]))
+    with patch.object(dw.L, 'info') as info:
+        wrapped = builder.get_datawrapper()
+    info.assert_called_once_with('Have %d somas, expected 1', 2)
+    nt.eq_(len(wrapped.data_block), 3)
+
+    with patch.object(dw.L, 'info') as info:
+        dw.BlockNeuronBuilder().get_datawrapper()
+    info.assert_called_once_with('Have %d somas, expected 1', 0)
+
+
+def test_section_table():
+    sections = [dw.DataBlockSection([-1, 0, 1], 1, -1),
+                dw.DataBlockSection(slice(2, 5), 2, 0),
+                dw.DataBlockSection([], 0, -1),
+                dw.DataBlockSection(range(1, 4), 3, 0)]
+    table, section_ids = dw.sections_to_table(sections)
+    nt.eq_(dw.sections_from_table(table, section_ids),
+           [dw.DataBlockSection([-1, 0, 1], 1, -1),
+            dw.DataBlockSection(slice(2, 5), 2, 0),
+            dw.DataBlockSection([], 0, -1),
+            dw.DataBlockSection([1, 2, 3], 3, 0)])
+
+
+def test_data_wrapper_pickle():
+    data_block = np.arange(21, dtype=float).reshape(3, 7)
+    sections = [dw.DataBlockSection([0], POINT_TYPE.SOMA, -1),
+                dw.DataBlockSection(slice(1, 3), POINT_TYPE.AXON, 0),
+                dw.DataBlockSection([0, 2], POINT_TYPE.BASAL_DENDRITE, 0),
+                dw.DataBlockSection()]
+    rdw = pickle.loads(pickle.dumps(dw.DataWrapper(data_block, 'SWC', sections)))
+    nt.eq_(rdw.fmt, 'SWC')
+    np.testing.assert_array_equal(rdw.data_block, data_block)
+    nt.eq_(rdw.sections, sections)
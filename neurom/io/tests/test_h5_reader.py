@@ -30,6 +30,7 @@ import os
 import numpy as np
 import h5py
 from neurom.io import hdf5, swc
+from neurom.io.datawrapper import BlockNeuronBuilder, DataBlockSection
 from neurom.core.dataformat import COLS
 from nose import tools as nt
 
@@ -73,6 +74,32 @@ def test_consistency_between_h5_swc():
     nt.ok_(np.allclose(h5_data.data_block.shape, swc_data.data_block.shape))
 
 
+def test__remove_duplicate_points():
+    points = np.arange(40.).reshape(10, 4)
+    # soma, 2 children of the soma, and children of these
+    groups = np.array([[0, 1, -1],
+                       [2, 3, 0],
+                       [4, 3, 1],
+                       [6, 3, 1],
+                       [8, 2, 0],
+                       [9, 2, 4]])
+    new_points, new_groups = hdf5._remove_duplicate_points(points, groups.copy())
+    np.testing.assert_array_equal(new_points, points[[0, 1, 2, 3, 5, 7, 8]])
+    np.testing.assert_array_equal(new_groups[:, hdf5.GPFIRST], [0, 2, 4, 5, 6, 7])
+    np.testing.assert_array_equal(new_groups[:, 1:], groups[:, 1:])
+
+
+def test_read_remove_duplicates():
+    filename = os.path.join(H5V1_PATH, 'Neuron.h5')
+    with h5py.File(filename, mode='r') as h5file:
+        points, groups = hdf5._unpack_v1(h5file)
+    n_duplicates = sum(1 for _, section_type, parent_id in groups
+                       if parent_id != -1 and section_type != 1 and
+                       groups[parent_id, 1] != 1)
+    data = hdf5.read(filename, remove_duplicates=True)
+    nt.eq_(len(data.data_block), len(points) - n_duplicates)
+
+
 class DataWrapper_Neuron(object):
     '''Base class for H5 tests'''
 
@@ -153,3 +180,45 @@ class DataWrapper_Neuron_with_duplicates(object):
     def test_end_point_parents(self):
         epar = [self.data.get_parent(i) for i in self.data.get_end_points()]
         nt.assert_equal(epar, DataWrapper_Neuron_with_duplicates.end_parents)
+
+
+def _block_neuron_builder_data(points, groups):
+    builder = BlockNeuronBuilder()
+    ends = list(groups[1:, hdf5.GPFIRST]) + [len(points)]
+    for id_, ((start, section_type, parent_id), end) in enumerate(zip(groups, ends)):
+        builder.add_section(id_, int(parent_id), int(section_type), points[start:end])
+    return builder._make_datablock()
+
+
+def test__make_data_block():
+    for filename in (os.path.join(H5V1_PATH, 'Neuron.h5'),
+                     os.path.join(H5V1_PATH, 'bio_neuron-000.h5')):
+        with h5py.File(filename, mode='r') as h5file:
+            points, groups = hdf5._unpack_v1(h5file)
+        data_block, sections = hdf5._make_data_block(points, groups)
+        expected_block, expected_sections = _block_neuron_builder_data(points, groups)
+        nt.eq_(data_block.dtype, np.float64)
+        np.testing.assert_array_equal(data_block, expected_block)
+        nt.eq_(sections, expected_sections)
+
+
+def test__make_data_block_gaps():
+    # point 0 does not belong to any group, group 2 is empty
+    points = np.arange(20.).reshape(5, 4)
+    groups = np.array([[1, 1, -1],
+                       [2, 3, 0],
+                       [4, 3, 0],
+                       [4, 3, 1]])
+    data_block, sections = hdf5._make_data_block(points, groups)
+    np.testing.assert_array_equal(data_block[:, COLS.XYZR], points[1:5])
+    np.testing.assert_array_equal(data_block[:, COLS.TYPE], [1, 3, 3, 3])
+    np.testing.assert_array_equal(data_block[:, COLS.P], [-1, 0, 1, 2])
+    nt.eq_(sections, [DataBlockSection(slice(0, 1), 1, -1),
+                      DataBlockSection(slice(1, 3), 3, 0),
+                      DataBlockSection(slice(3, 3), 3, 0),
+                      DataBlockSection(slice(3, 4), 3, 1)])
+    nt.eq_(sections, _block_neuron_builder_data(points, groups)[1])
+
+    data_block, sections = hdf5._make_data_block(points, groups[:0])
+    nt.eq_(data_block.shape, (0, COLS.COL_COUNT))
+    nt.eq_(sections, [])
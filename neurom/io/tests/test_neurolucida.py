@@ -1,10 +1,10 @@
 import os
 import textwrap
-from io import StringIO
+from io import BytesIO, StringIO
 
 import numpy as np
 from mock import patch
-from nose.tools import eq_, ok_
+from nose.tools import assert_raises, eq_, ok_
 
 import neurom.io as io
 import neurom.io.neurolucida as nasc
@@ -23,37 +23,24 @@ def test__match_section():
     eq_(nasc._match_section(section, match), None)
 
 
-def test__get_tokens():
-    morph_fd = StringIO(u'((()))')
-    tokens = list(nasc._get_tokens(morph_fd))
-    eq_(tokens, ['(', '(', '(', ')', ')', ')'])
+def test__token_value():
+    eq_(nasc._token_value('Foo'), 'Foo')
+    eq_(nasc._token_value('"Foo"'), '"Foo"')
+    eq_(nasc._token_value('"Cell  Bar (Body)"'), '"Cell Bar ( Body ) "')
+    eq_(nasc._token_value('"Foo'), None)
 
-    morph_fd = StringIO(u'(Baz("Bar"("Foo")))')
-    tokens = list(nasc._get_tokens(morph_fd))
-    eq_(tokens, ['(', 'Baz', '(', '"Bar"', '(', '"Foo"', ')', ')', ')'])
 
-    morph_fd = StringIO(u'(Baz("Cell Bar Body"("Foo")))')
-    tokens = list(nasc._get_tokens(morph_fd))
-    eq_(tokens, ['(', 'Baz', '(', '"Cell Bar Body"', '(', '"Foo"', ')', ')', ')'])
-
-
-def test__parse_section():
+def test__parse_text_nesting():
     with patch('neurom.io.neurolucida._match_section') as mock_match:
         mock_match.return_value = False  # want all sections
 
-        token_iter = iter(['(', '(', '(', ')', ')', ')'])
-        section = nasc._parse_section(token_iter)
-        eq_(section, [[[[]]]])
-
-        token_iter = iter(['(', 'Baz', '(', '"Bar"', '(', '"Foo"', ')', ')', ')'])
-        section = nasc._parse_section(token_iter)
-        eq_(section, [['Baz',
-                       ['"Bar"',
-                        ['"Foo"',
-                         ]]]])
+        eq_(nasc._parse_text(u'((()))')[0], [[[[]]]])
+        eq_(nasc._parse_text(u'(Baz("Bar"("Foo")))')[0], [['Baz', ['"Bar"', ['"Foo"']]]])
+        eq_(nasc._parse_text(u'(Baz("Cell Bar Body"("Foo")))')[0],
+            [['Baz', ['"Cell Bar Body"', ['"Foo"']]]])
 
 
-def test__parse_sections():
+def test__parse_text_unwanted_sections():
     string_section = textwrap.dedent(
         u'''(FilledCircle
            (Color RGB (64, 0, 128))
@@ -70,13 +57,107 @@ def test__parse_sections():
            Generated
            )  ;  End of tree
         ''')
-    morph_fd = StringIO(string_section)
-    sections = nasc._parse_sections(morph_fd)
+    sections, row_values = nasc._parse_text(string_section)
     eq_(len(sections), 1)  # FilledCircle is ignored
-    eq_(sections[0], [['Axon'],
-                      ['-40.54', '-113.20', '-36.61', '0.12'],
-                      ['-40.54', '-113.20', '-36.61', '0.12'],
-                      'Generated'])
+    eq_(sections[0], [['Axon'], 1, 2, 'Generated'])
+    eq_(row_values[1:], ['-40.54  -113.20   -36.61     0.12'] * 2)
+
+
+def test__parse_text_outside_sections():
+    # rows and tokens outside of the sections are ignored
+    sections, row_values = nasc._parse_text(u'(1 2 3 4) Foo "Bar" )\n((Axon) (5 6 7 8))')
+    eq_(sections, [[['Axon'], 0]])
+    eq_(row_values, ['5 6 7 8'])
+
+
+def test__parse_text_unclosed_sections():
+    sections, row_values = nasc._parse_text(u'((Axon) (1 2 3 4) ( (5 6 7 8) "unterminated')
+    eq_(sections, [[['Axon'], 0, [1]]])
+    eq_(row_values, ['1 2 3 4', '5 6 7 8'])
+
+    # unclosed unwanted sections are ignored as well
+    eq_(nasc._parse_text(u'((Axon) (1 2 3 4)) (Marker (5 6 7 8)')[0], [[['Axon'], 0]])
+
+
+def test__parse_text():
+    string_section = textwrap.dedent(
+        u'''(FilledCircle
+           (Color RGB (64, 0, 128))
+           (Name "Marker 11")
+           ( -189.59    55.67    28.68     0.12)  ; 1
+           )  ;  End of markers
+
+           ( (Color Yellow)
+           (Axon)
+           (Set "axons (left)")
+           (  -40.54  -113.20   -36.61     0.12)  ; Root
+           (  -40.54  -113.20   -36.61     0.12 S1)  ; 1, R
+           (
+             (1 2 3 4)
+           |
+             (nan 2 3 4)
+           )
+           Generated
+           )  ;  End of tree
+        ''')
+    sections, row_values = nasc._parse_text(string_section)
+    eq_(sections, [[['Axon'],
+                    1,
+                    ['-40.54', '-113.20', '-36.61', '0.12', 'S1'],
+                    [2, '|', ['nan', '2', '3', '4']],
+                    'Generated']])
+    eq_(row_values[1:], ['-40.54  -113.20   -36.61     0.12', '1 2 3 4'])
+
+
+def test__sections_to_raw_data_files():
+    # column sums of the data blocks of the recursive parser this one replaces
+    for filename, shape, sums in (
+            ('sample.asc', (18, 7), [38.0, -2.0, 0.0, 14.0, 40.0, 153.0, 127.0]),
+            ('bio_neuron-000.asc', (6237, 7),
+             [129062.78944836004, 226595.88775179943, -170803.498551201,
+              1030.174999999935, 13616.0, 19446966.0, 19382069.0]),
+            ('bio_neuron-001.asc', (5235, 7),
+             [-29721.93999999997, 1674032.0300000012, -88928.0999999998,
+              546.9949999999934, 11113.0, 13699995.0, 13653322.0])):
+        with open(os.path.join(NEUROLUCIDA_PATH, filename)) as fd:
+            raw_data = nasc._sections_to_raw_data(*nasc._parse_text(fd.read()))
+        eq_(raw_data.shape, shape)
+        np.testing.assert_allclose(raw_data.sum(axis=0), sums)
+
+
+def test__flatten_section_row_indices():
+    subsection = [0,
+                  [1,
+                   [[['1', '2', '3', '4']], '|', [2]],
+                   '|',
+                   ['5', '6', '7', '8'],
+                   'Low',
+                   ],
+                  3,
+                  ]
+    points, parents = nasc._flatten_section(subsection, parent=-1)
+    eq_(points, [0, 1, ['1', '2', '3', '4'], 2, ['5', '6', '7', '8'], 3])
+    eq_(parents, [-1, 0, 1, 2, 0, 0])
+
+
+def test__points_values():
+    row_values = ['1 2 3 4', '5.5 -6e1 7 8']
+    np.testing.assert_array_equal(
+        nasc._points_values([1, ['9', '10', '11', '12'], 0], row_values),
+        [[5.5, -60, 7, 8], [9, 10, 11, 12], [1, 2, 3, 4]])
+
+    np.testing.assert_array_equal(nasc._points_values([['nan', '1', '2', '3']], []),
+                                  [[np.nan, 1, 2, 3]])
+    assert_raises(ValueError, nasc._points_values, [['a', '1', '2', '3']], [])
+
+
+def test_read_deep_tree():
+    depth = 5000
+    morph = (u'("CellBody" (CellBody) (0 0 0 1) (1 0 0 1))\n((Dendrite) (2 0 0 1)\n' +
+             u'(\n  (%d 0 0 1)\n' * depth + u')' * depth + u')')
+    rdw = io.load_data(StringIO(morph % tuple(range(3, depth + 3))), reader='asc')
+    eq_(len(rdw.data_block), depth + 3)
+    np.testing.assert_array_equal(rdw.data_block[2:, COLS.P], np.arange(1, depth + 2))
 
 
 def test__flatten_section():
@@ -88,10 +169,10 @@ def test__flatten_section():
                   ['4', '4', '4', '4'],
                   'Generated',
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    points, parents = nasc._flatten_section(subsection, parent=-1)
     # correct parents
-    ok_(np.allclose(ret[:, COLS.P], np.arange(-1, 4)))
-    ok_(np.allclose(ret[:, COLS.ID], np.arange(0, 5)))
+    eq_(parents, list(range(-1, 4)))
+    eq_(len(points), 5)
 
     subsection = [['-1', '-1', '-1', '-1'],
                   [['0', '0', '0', '0'],
@@ -106,20 +187,20 @@ def test__flatten_section():
                    ['1', '2', '3', '4'],
                    ['1', '2', '3', '4'], ]
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    points, parents = nasc._flatten_section(subsection, parent=-1)
     # correct parents
-    eq_(ret[0, COLS.P], -1.)
-    eq_(ret[1, COLS.P], 0.0)
-    eq_(ret[6, COLS.P], 0.0)
-    ok_(np.allclose(ret[:, COLS.ID], np.arange(0, 11)))  # correct ID
+    eq_(parents[0], -1)
+    eq_(parents[1], 0)
+    eq_(parents[6], 0)
+    eq_(len(points), 11)
 
     # Try a non-standard bifurcation, ie: missing '|' separator
     subsection = [['-1', '-1', '-1', '-1'],
                   [['0', '0', '0', '0'],
                    ['1', '1', '1', '1'], ]
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
-    eq_(ret.shape, (3, 7))
+    points, parents = nasc._flatten_section(subsection, parent=-1)
+    eq_(len(points), 3)
 
     # try multifurcation
     subsection = [['-1', '-1', '-1', '-1'],
@@ -132,22 +213,24 @@ def test__flatten_section():
                    ['4', '4', '4', '4'],
                    ['5', '5', '5', '5'], ]
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    points, parents = nasc._flatten_section(subsection, parent=-1)
     # correct parents
-    eq_(ret[0, COLS.P], -1.)
-    eq_(ret[1, COLS.P], 0.0)
-    eq_(ret[3, COLS.P], 0.0)
-    eq_(ret[5, COLS.P], 0.0)
-    ok_(np.allclose(ret[:, COLS.ID], np.arange(0, 7)))  # correct ID
+    eq_(parents[0], -1)
+    eq_(parents[1], 0)
+    eq_(parents[3], 0)
+    eq_(parents[5], 0)
+    eq_(len(points), 7)
 
 
-def test__extract_section():
+def test__extract_points():
     section = ['"CellBody"',
                ['CellBody'],
                ['-1', '-1', '-1', '-1'],
                ['1', '1', '1', '1'],
                ]
-    section = nasc._extract_section(section)
+    ret = nasc._extract_points(section, [])
+    np.testing.assert_array_equal(ret, [[-1, -1, -1, -0.5, 1, 0, -1],
+                                        [1, 1, 1, 0.5, 1, 1, 0]])
 
     # unknown type
     section = ['"Foo"',
@@ -155,7 +238,13 @@ def test__extract_section():
                ['-1', '-1', '-1', '-1'],
                ['1', '1', '1', '1'],
                ]
-    section = nasc._extract_section(section)
+    eq_(nasc._extract_points(section, []), None)
+
+    # no points
+    eq_(nasc._extract_points([['Axon'], 'Generated'], []).shape, (0, ))
+
+    # a single 'Sections' element
+    eq_(nasc._extract_points(['Sections'], []), None)
 
 
 def test_sections_to_raw_data():
@@ -187,7 +276,7 @@ def test_sections_to_raw_data():
                 ]
     fake_neurite = [['This is not ', ], ['a neurite']]
     sections = [soma, fake_neurite, axon, dendrite, ]
-    raw_data = nasc._sections_to_raw_data(sections)
+    raw_data = nasc._sections_to_raw_data(sections, [])
     eq_(raw_data.shape, (15, 7))
     ok_(np.allclose(raw_data[:, COLS.ID], np.arange(0, 15)))  # correct ID
     # 3 is ID of end of the soma, 2 sections attach to this
@@ -244,8 +333,23 @@ def test_read():
     ok_(np.count_nonzero(raw_data[:, COLS.P] == 3),  2)
 
 
+def test__read_text():
+    content = u'(Foo)\r\n(Bar ; \u00e9\r(Baz)'
+    expected = u'(Foo)\n(Bar ; \u00e9\n(Baz)'
+    eq_(nasc._read_text(StringIO(content)), expected)
+    eq_(nasc._read_text(content.encode('utf-8')), expected)
+    eq_(nasc._read_text(BytesIO(content.encode('utf-8'))), expected)
+    eq_(nasc._read_text(b'(\xff)'), u'(\ufffd)')
+
+
 def test_load_neurolucida_ascii():
     f = os.path.join(NEUROLUCIDA_PATH, 'sample.asc')
     ascii = io.load_data(f)
     ok_(isinstance(ascii, DataWrapper))
     eq_(len(ascii.data_block), 18)
+
+
+def test_load_row_outside_sections():
+    rdw = io.load_data(os.path.join(NEUROLUCIDA_PATH, 'row_outside_sections.asc'))
+    eq_(rdw.data_block.shape, (5, 7))
+    np.testing.assert_array_equal(rdw.data_block[:, COLS.X], np.arange(5))
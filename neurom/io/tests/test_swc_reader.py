@@ -27,6 +27,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
+from io import BytesIO, StringIO
 
 import numpy as np
 
@@ -94,3 +95,52 @@ def test_simple_reversed():
     nt.eq_(rdw.neurite_root_section_ids(), [5, 6])
     nt.eq_(len(rdw.soma_points()), 1)
     nt.eq_(len(rdw.sections), 7)
+
+
+SWC_CONTENT = b'''# a comment
+  1 1  0 0 0 1. -1 # trailing comment
+
+2\t3 0 0 1 1.  1\r
+ 3 3 0 0 2 1. 2 42 extra
+'''
+SWC_CONTENT_DATA = [[1, 1, 0, 0, 0, 1, -1],
+                    [2, 3, 0, 0, 1, 1, 1],
+                    [3, 3, 0, 0, 2, 1, 2]]
+
+
+def test__parse():
+    np.testing.assert_array_equal(swc._parse(SWC_CONTENT), SWC_CONTENT_DATA)
+    np.testing.assert_array_equal(swc._parse(b'1 1 0 0 0 1 -1'), [[1, 1, 0, 0, 0, 1, -1]])
+
+    with open(os.path.join(SWC_PATH, 'Neuron.swc'), 'rb') as fd:
+        np.testing.assert_array_equal(swc._parse(fd.read()),
+                                      np.loadtxt(os.path.join(SWC_PATH, 'Neuron.swc')))
+
+
+def test__parse_extra_columns():
+    content = b'''1 1 0 0 0 1. -1 0.5
+2 3 0 0 1 1. 1
+3 3 0 0 2 1. 2 42 43
+'''
+    np.testing.assert_array_equal(swc._parse(content),
+                                  [[1, 1, 0, 0, 0, 1, -1],
+                                   [2, 3, 0, 0, 1, 1, 1],
+                                   [3, 3, 0, 0, 2, 1, 2]])
+
+
+@nt.raises(ValueError)
+def test__parse_missing_columns():
+    swc._parse(b'1 1 0 0 0 1 -1\n2 3 0 0\n')
+
+
+@nt.raises(ValueError)
+def test__parse_invalid_value():
+    swc._parse(b'1 1 0 0 0 1 -1\n2 3 0 0 x 1 1\n')
+
+
+def test_read_buffer():
+    for handle in (SWC_CONTENT, bytearray(SWC_CONTENT), BytesIO(SWC_CONTENT),
+                   StringIO(SWC_CONTENT.decode('utf-8'))):
+        data = swc.read(handle).data_block
+        np.testing.assert_array_equal(data[:, COLS.ID], [1, 2, 3])
+        np.testing.assert_array_equal(data[:, COLS.P], [-1, 1, 2])
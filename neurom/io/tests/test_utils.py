@@ -29,13 +29,14 @@
 '''Test neurom.io.utils'''
 import os
 import sys
-from io import StringIO
+from io import BytesIO, StringIO
 
 import numpy as np
+from mock import patch
 from nose import tools as nt
 
 from neurom import get
-from neurom.core import Neuron, SomaError
+from neurom.core import LazyPopulation, Neuron, SomaError
 from neurom.exceptions import NeuroMError, RawDataError, SomaError
 from neurom.fst import _neuritefunc as _nf
 from neurom.io import utils
@@ -134,6 +135,58 @@ def test_load_neuron():
     utils.load_neuron(StringIO(neuron_str), reader='swc')
 
 
+def test_load_neuron_in_memory():
+    for filename, reader in ((os.path.join(SWC_PATH, 'Neuron.swc'), 'swc'),
+                             (os.path.join(DATA_PATH, 'h5/v1/Neuron.h5'), 'h5'),
+                             (os.path.join(DATA_PATH, 'neurolucida/sample.asc'), 'asc')):
+        ref = utils.load_neuron(filename)
+        with open(filename, 'rb') as fd:
+            content = fd.read()
+
+        # the content is neither written to a temporary file nor read from a file
+        with patch('tempfile.mkstemp', side_effect=AssertionError), \
+                patch('neurom.io.swc.open', side_effect=AssertionError), \
+                patch('neurom.io.neurolucida.open', side_effect=AssertionError):
+            for handle in (content, bytearray(content), BytesIO(content)):
+                nrn = utils.load_neuron(handle, reader=reader)
+                nt.eq_(nrn.name, None)
+                np.testing.assert_array_equal(nrn.points, ref.points)
+
+        with open(filename, 'rb') as fd:
+            np.testing.assert_array_equal(utils.load_neuron(fd, reader=reader).points,
+                                          ref.points)
+
+    nt.assert_raises(NeuroMError, utils.load_neuron, BytesIO(content))
+
+
+def test_load_neuron_written_buffer():
+    for filename, reader in ((os.path.join(SWC_PATH, 'Neuron.swc'), 'swc'),
+                             (os.path.join(DATA_PATH, 'neurolucida/sample.asc'), 'asc')):
+        ref = utils.load_neuron(filename)
+        with open(filename, 'rb') as fd:
+            content = fd.read()
+
+        # the buffers are read from their start, not from where the writing stopped
+        for handle in (BytesIO(), StringIO()):
+            handle.write(content if isinstance(handle, BytesIO) else content.decode('utf-8'))
+            np.testing.assert_array_equal(utils.load_neuron(handle, reader=reader).points,
+                                          ref.points)
+
+
+def test_load_neuron_stream_error_message():
+    content = b'1 1 0 0 0 1 -1\n2 3 0 0 1 1 42\n' * 1000
+    for handle in (content, BytesIO(content)):
+        with nt.assert_raises(RawDataError) as cm:
+            utils.load_neuron(handle, reader='swc')
+        nt.ok_('<bytes>' in str(cm.exception))
+        nt.ok_(len(str(cm.exception)) < 200)
+
+    with open(MISSING_PARENTS_FILE, 'rb') as fd:
+        with nt.assert_raises(RawDataError) as cm:
+            utils.load_neuron(fd, reader='swc')
+        nt.ok_(MISSING_PARENTS_FILE in str(cm.exception))
+
+
 def test_neuron_name():
 
     for fn, nn in zip(FILENAMES, NRN_NAMES):
@@ -353,3 +406,59 @@ def test_get_files_by_path():
     nt.eq_(len(neuron_dir), 6)
 
     nt.assert_raises(IOError, utils.get_files_by_path, 'this/is/a/fake/path')
+
+
+def _assert_same_population(pop0, pop1):
+    nt.eq_([n.name for n in pop0], [n.name for n in pop1])
+    for n0, n1 in zip(pop0, pop1):
+        np.testing.assert_array_equal(n0.points, n1.points)
+        nt.eq_(len(n0.sections), len(n1.sections))
+
+
+def test_load_neurons_n_workers():
+    files = [f for f in FILES if f != NO_SOMA_FILE] + FILENAMES
+    pop = utils.load_neurons(files, n_workers=2)
+    _assert_same_population(pop, utils.load_neurons(files))
+
+
+def test_load_neurons_executor():
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pop = utils.load_neurons(VALID_DATA_PATH, executor=executor)
+        _assert_same_population(pop, utils.load_neurons(VALID_DATA_PATH))
+
+        pop = utils.load_neurons(FILES, neuron_loader=_mock_load_neuron, executor=executor)
+        nt.eq_([n.name for n in pop], [_get_name(f) for f in FILES])
+
+
+def test_load_neurons_parallel_ignore_exceptions():
+    files = [FILES[0], NO_SOMA_FILE, FILES[2]]
+    pop = utils.load_neurons(files, n_workers=2, ignored_exceptions=(SomaError, ))
+    nt.eq_([n.name for n in pop], ['Neuron', 'Single_apical'])
+
+    with nt.assert_raises(SomaError) as cm:
+        utils.load_neurons(files, n_workers=2)
+    nt.ok_(NO_SOMA_FILE in str(cm.exception))
+
+    with nt.assert_raises(RawDataError) as cm:
+        utils.load_neurons([FILES[0], os.path.join(DATA_PATH, 'h5/v1/no_such_file.h5')],
+                           n_workers=2)
+    nt.ok_('no_such_file.h5' in str(cm.exception))
+
+
+def test_load_neurons_lazy():
+    pop = utils.load_neurons(VALID_DATA_PATH, lazy=True, cache_size=1)
+    nt.ok_(isinstance(pop, LazyPopulation))
+    nt.eq_(pop.name, 'valid_set')
+    eager = utils.load_neurons(VALID_DATA_PATH)
+    _assert_same_population(pop, eager)
+    for feature in ('section_lengths', 'section_path_distances', 'soma_radii',
+                    'number_of_neurites', 'segment_radii'):
+        np.testing.assert_allclose(get(feature, pop), get(feature, eager))
+
+    nt.assert_raises(NeuroMError, utils.load_neurons, VALID_DATA_PATH, lazy=True, n_workers=2)
+
+
+@nt.raises(TypeError)
+def test_load_neurons_unknown_option():
+    utils.load_neurons(VALID_DATA_PATH, n_worker=2)
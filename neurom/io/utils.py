@@ -31,18 +31,18 @@
 import glob
 import logging
 import os
-import shutil
-import tempfile
-import uuid
 from functools import partial
-from io import IOBase, open
+
+import numpy as np
+from future.utils import raise_from
 
 from neurom._compat import StringType, filter
-from neurom.core.population import Population
+from neurom.core.population import LazyPopulation, Population
 from neurom.exceptions import NeuroMError, RawDataError
 from neurom.fst._core import FstNeuron
 from neurom.io import neurolucida, swc
-from neurom.io.datawrapper import DataWrapper
+from neurom.io.cache import get_cache
+from neurom.io.datawrapper import DataWrapper, sections_from_table, sections_to_table
 
 L = logging.getLogger(__name__)
 
@@ -60,14 +60,25 @@ class NeuronLoader(object):
         Caching morphology loader.
 
         Arguments:
-            directory: path to directory with morphology files
+            directory: path to directory with morphology files, or to a morphology\
+                container file, see neurom.io.container
             file_ext: file extension to look for (if not set, will pick any of .swc|.h5|.asc)
             cache_size: size of LRU cache (if not set, no caching done)
+            cache_dir: directory of the on-disk cache of the parsed files (if not set,
+                no on-disk caching done), see neurom.io.cache
+            remove_duplicates: remove the duplicate first point of the sections of h5 files
     """
 
-    def __init__(self, directory, file_ext=None, cache_size=None):
+    def __init__(self, directory, file_ext=None, cache_size=None, cache_dir=None,
+                 remove_duplicates=False):
         self.directory = directory
         self.file_ext = file_ext
+        self.cache_dir = cache_dir
+        self.remove_duplicates = remove_duplicates
+        self._container = None
+        if os.path.isfile(directory):
+            from neurom.io.container import MorphologyContainer
+            self._container = MorphologyContainer(directory)
         if cache_size is not None:
             from pylru import FunctionCacheManager
             self.get = FunctionCacheManager(self.get, size=cache_size)
@@ -86,7 +97,10 @@ class NeuronLoader(object):
     # pylint:disable=method-hidden
     def get(self, name):
         """ Get `name` morphology data. """
-        return load_neuron(self._filepath(name))
+        if self._container is not None:
+            return self._container.load_neuron(name)
+        return load_neuron(self._filepath(name), cache_dir=self.cache_dir,
+                           remove_duplicates=self.remove_duplicates)
 
 
 def get_morph_files(directory):
@@ -112,9 +126,19 @@ def get_files_by_path(path):
     raise IOError('Invalid data path %s' % path)
 
 
-def load_neuron(handle, reader=None):
-    '''Build section trees from an h5 or swc file'''
-    rdw = load_data(handle, reader)
+def load_neuron(handle, reader=None, cache_dir=None, remove_duplicates=False):
+    '''Build section trees from an h5 or swc file
+
+    Parameters:
+        handle: file name, file-like object or bytes buffer
+        reader: file format, by default the file name extension, required for\
+            file-like objects and bytes buffers
+        cache_dir: optional directory of the on-disk cache of the parsed files,\
+            or a neurom.io.cache.DataCache
+        remove_duplicates: if True, remove the first point of the sections that\
+            duplicates the last point of their parent, only used for h5 files
+    '''
+    rdw = load_data(handle, reader, cache_dir, remove_duplicates)
     if isinstance(handle, StringType):
         name = os.path.splitext(os.path.basename(handle))[0]
     else:
@@ -126,81 +150,225 @@ def load_neurons(neurons,
                  neuron_loader=load_neuron,
                  name=None,
                  population_class=Population,
-                 ignored_exceptions=()):
+                 ignored_exceptions=(),
+                 cache_dir=None,
+                 **options):
     '''Create a population object from all morphologies in a directory\
         of from morphologies in a list of file names
 
     Parameters:
-        neurons: directory path or list of neuron file paths
+        neurons: directory path, list of neuron file paths or path to a\
+            morphology container file, see neurom.io.container
         neuron_loader: function taking a filename and returning a neuron
         population_class: class representing populations
         name (str): optional name of population. By default 'Population' or\
             filepath basename depending on whether neurons is list or\
             directory path respectively.
+        ignored_exceptions: NeuroMError classes for which files are skipped
+        cache_dir: optional directory of the on-disk cache of the parsed files,\
+            passed to neuron_loader
+        options: keyword only loading options, see _loading_options:
+            n_workers: if set, the files are loaded by a pool of n_workers processes
+            executor: optional concurrent.futures.Executor loading the files,\
+                it is not shut down once the files are loaded
+            lazy: if True, return a LazyPopulation loading the neurons on demand,\
+                population_class is not used
+            cache_size: number of neurons kept in memory by a lazy population
 
     Returns:
         neuron population object
 
+    Note:
+        When loading in parallel with the default neuron_loader, the workers only
+        send back the data block and the section table of each file, the neurons
+        are built in this process. A custom neuron_loader must be picklable.
+
+        The neurons of a container file are loaded by the container, neuron_loader
+        and cache_dir are not used.
     '''
+    n_workers, executor, lazy, cache_size = _loading_options(**options)
+    container = None
     if isinstance(neurons, (list, tuple)):
         files = neurons
         name = name if name is not None else 'Population'
+    elif isinstance(neurons, StringType) and _is_container(neurons):
+        from neurom.io.container import MorphologyContainer
+        container = MorphologyContainer(neurons)
+        files = container.names
+        neuron_loader = container.load_neuron
+        cache_dir = None
+        name = name if name is not None else os.path.splitext(os.path.basename(neurons))[0]
     elif isinstance(neurons, StringType):
         files = get_files_by_path(neurons)
         name = name if name is not None else os.path.basename(neurons)
 
+    if cache_dir is not None:
+        neuron_loader = partial(neuron_loader, cache_dir=cache_dir)
+
+    if lazy:
+        if ignored_exceptions or n_workers is not None or executor is not None:
+            raise NeuroMError('ignored_exceptions, n_workers and executor '
+                              'are not supported by lazy populations')
+        return LazyPopulation(files, neuron_loader, name=name, cache_size=cache_size)
+
+    try:
+        pop = _load_all(files, neuron_loader, ignored_exceptions, n_workers, executor)
+    finally:
+        if container is not None:
+            container.close()
+
+    return population_class(pop, name=name)
+
+
+def _loading_options(n_workers=None, executor=None, lazy=False, cache_size=16):
+    '''Get the keyword only options of load_neurons, unknown ones raise a TypeError'''
+    return n_workers, executor, lazy, cache_size
+
+
+def _is_container(path):
+    '''Check if path is a morphology container file, without importing h5py otherwise'''
+    if not os.path.isfile(path) or os.path.splitext(path)[1].lower() in ('.swc', '.asc'):
+        return False
+    from neurom.io.container import is_container
+    return is_container(path)
+
+
+def _load_all(files, neuron_loader, ignored_exceptions, n_workers, executor):
+    '''Load the neurons of files, skipping the ignored_exceptions'''
+    if n_workers is not None or executor is not None:
+        loaded = _load_parallel(files, neuron_loader, n_workers, executor)
+    else:
+        loaded = ((f, partial(neuron_loader, f)) for f in files)
+
     ignored_exceptions = tuple(ignored_exceptions)
     pop = []
-    for f in files:
+    for f, load in loaded:
         try:
-            pop.append(neuron_loader(f))
+            pop.append(load())
         except NeuroMError as e:
             if isinstance(e, ignored_exceptions):
                 L.info('Ignoring exception "%s" for file %s',
                        e, os.path.basename(f))
                 continue
-            raise
+            if f in str(e):
+                raise
+            raise_from(type(e)('Error loading file %s:\n%s' % (f, e)), e)
 
-    return population_class(pop, name=name)
+    return pop
 
 
-def _get_file(handle):
-    '''Returns the filename of the file to read
+def _load_data_table(filename, **kwargs):
+    '''Load the data of a file as picklable arrays
 
-    If handle is a stream, a temp file is written on disk first
-    and its filename is returned'''
-    if not isinstance(handle, IOBase):
-        return handle
+    Returns:
+        data_block, fmt and the section table from sections_to_table
+    '''
+    rdw = load_data(filename, **kwargs)
+    table, section_ids = sections_to_table(rdw.sections)
+    return np.asarray(rdw.data_block), rdw.fmt, table, section_ids
 
-    fd, temp_file = tempfile.mkstemp(str(uuid.uuid4()), prefix='neurom-')
-    os.close(fd)
-    with open(temp_file, 'w') as fd:
-        handle.seek(0)
-        shutil.copyfileobj(handle, fd)
-    return temp_file
 
+def _neuron_from_data_table(filename, future):
+    '''Build the neuron of a file from the result of _load_data_table'''
+    data_block, fmt, table, section_ids = future.result()
+    rdw = DataWrapper(data_block, fmt, sections_from_table(table, section_ids))
+    return FstNeuron(rdw, os.path.splitext(os.path.basename(filename))[0])
 
-def load_data(handle, reader=None):
-    '''Unpack data into a raw data wrapper'''
+
+def _load_parallel(files, neuron_loader, n_workers, executor):
+    '''Submit the loading of files to an executor
+
+    Yields:
+        (filename, callable returning the neuron of the file) pairs, in the order of files
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+
+    func = getattr(neuron_loader, 'func', neuron_loader)
+    from_table = func is load_neuron and not getattr(neuron_loader, 'args', ())
+    kwargs = getattr(neuron_loader, 'keywords', None) or {}
+
+    futures = []
+    try:
+        if from_table:
+            futures = [executor.submit(_load_data_table, f, **kwargs) for f in files]
+        else:
+            futures = [executor.submit(neuron_loader, f) for f in files]
+
+        for f, future in zip(files, futures):
+            if from_table:
+                yield f, partial(_neuron_from_data_table, f, future)
+            else:
+                yield f, future.result
+    finally:
+        for future in futures:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=False)
+
+
+def load_data(handle, reader=None, cache_dir=None, remove_duplicates=False):
+    '''Unpack data into a raw data wrapper
+
+    The handle is either a file name, or a file-like object or a bytes buffer which
+    are read in memory, in which case the reader, ie: the file format, must be given.
+
+    If cache_dir is set, the data wrapper of a file is read from the on-disk
+    cache if present, and stored in it otherwise. Streams are never cached.
+
+    If remove_duplicates is True, the h5 reader removes the first point of the
+    sections that duplicates the last point of their parent.
+    '''
     if not reader:
+        if not isinstance(handle, StringType):
+            raise NeuroMError('The reader of a stream or bytes buffer must be given')
         reader = os.path.splitext(handle)[1][1:].lower()
 
     if reader not in _READERS:
         raise NeuroMError('Do not have a loader for "%s" extension' % reader)
 
-    filename = _get_file(handle)
+    if cache_dir is not None and isinstance(handle, StringType) and os.path.isfile(handle):
+        cache = get_cache(cache_dir)
+        key = (cache.key(handle, reader, 'remove_duplicates') if remove_duplicates else
+               cache.key(handle, reader))
+        rdw = cache.get(key)
+        if rdw is None:
+            rdw = _read_data(handle, reader, remove_duplicates)
+            cache.put(key, rdw)
+        return rdw
+
+    return _read_data(handle, reader, remove_duplicates)
+
+
+def _read_data(handle, reader, remove_duplicates=False):
+    '''Read data using the reader for the `reader` file format'''
+    read = _READERS[reader]
+    if remove_duplicates and reader == 'h5':
+        read = partial(read, remove_duplicates=True)
     try:
-        return _READERS[reader](filename)
+        return read(handle)
     except Exception as e:
-        L.exception('Error reading file %s, using "%s" loader', filename, reader)
-        raise RawDataError('Error reading file %s:\n%s' % (filename, str(e)))
+        name = _handle_name(handle)
+        L.exception('Error reading file %s, using "%s" loader', name, reader)
+        raise RawDataError('Error reading file %s:\n%s' % (name, str(e)))
+
+
+def _handle_name(handle):
+    '''Get the name of a file name, a file-like object or a bytes buffer for messages'''
+    if isinstance(handle, StringType):
+        return handle
+    name = getattr(handle, 'name', None)
+    return name if isinstance(name, StringType) else '<bytes>'
 
 
-def _load_h5(filename):
+def _load_h5(filename, remove_duplicates=False):
     '''Delay loading of h5py until it is needed'''
     from neurom.io import hdf5
     return hdf5.read(filename,
-                     remove_duplicates=False,
+                     remove_duplicates=remove_duplicates,
                      data_wrapper=DataWrapper)
 
 
@@ -344,6 +344,46 @@ def segment_taper_rate(seg):
     return taper_rate(seg[0], seg[1])
 
 
+def segment_lengths(begins, ends):
+    '''Compute the lengths of segments
+
+    Args:
+        begins, ends: 2D arrays of the [x, y, z, r] begin and end points of the segments
+
+    Returns: 1D array of the segment lengths
+    '''
+    return np.linalg.norm(ends[:, COLS.XYZ] - begins[:, COLS.XYZ], axis=1)
+
+
+def segment_areas(begins, ends):
+    '''Compute the surface areas of segments, see segment_area'''
+    r0, r1 = begins[:, COLS.R], ends[:, COLS.R]
+    h2 = np.sum(np.square(ends[:, COLS.XYZ] - begins[:, COLS.XYZ]), axis=1)
+    return math.pi * (r0 + r1) * np.sqrt(np.square(r0 - r1) + h2)
+
+
+def segment_volumes(begins, ends):
+    '''Compute the volumes of segments, see segment_volume'''
+    r0, r1 = begins[:, COLS.R], ends[:, COLS.R]
+    return math.pi * segment_lengths(begins, ends) * (r0 * r0 + r0 * r1 + r1 * r1) / 3.0
+
+
+def segment_radii(begins, ends):
+    '''Compute the mean radii of segments, see segment_radius'''
+    return (begins[:, COLS.R] + ends[:, COLS.R]) / 2.
+
+
+def segment_taper_rates(begins, ends):
+    '''Compute the taper rates of segments, see segment_taper_rate'''
+    return np.divide(2 * np.abs(ends[:, COLS.R] - begins[:, COLS.R]),
+                     segment_lengths(begins, ends))
+
+
+def segment_midpoints(begins, ends):
+    '''Compute the [x, y, z] mid-points of segments'''
+    return (begins[:, COLS.XYZ] + ends[:, COLS.XYZ]) / 2.
+
+
 def pca(points):
     '''
     Estimate the principal components of the covariance on the given point cloud
@@ -457,3 +457,18 @@ def test_pca():
 def test_sphere_area():
     area = mm.sphere_area(0.5)
     nt.assert_almost_equal(area, pi)
+
+
+def test_segment_kernels():
+    begins = uniform(0.5, 10., (20, 4))
+    ends = uniform(0.5, 10., (20, 4))
+    segments = list(zip(begins, ends))
+    for kernel, func in ((mm.segment_lengths, mm.segment_length),
+                         (mm.segment_areas, mm.segment_area),
+                         (mm.segment_volumes, mm.segment_volume),
+                         (mm.segment_radii, mm.segment_radius),
+                         (mm.segment_taper_rates, mm.segment_taper_rate)):
+        np.testing.assert_allclose(kernel(begins, ends), [func(seg) for seg in segments])
+    np.testing.assert_allclose(mm.segment_midpoints(begins, ends),
+                               (begins[:, :3] + ends[:, :3]) / 2.)
+    nt.eq_(mm.segment_lengths(np.empty((0, 4)), np.empty((0, 4))).shape, (0, ))
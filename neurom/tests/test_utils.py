@@ -57,6 +57,61 @@ def test_memoize_caches():
         nt.assert_not_equal(A().dummy(42, y=43), ref3)
 
 
+class _Cached(object):
+    __slots__ = ('value', '_cached_double')
+
+    def __init__(self, value):
+        self.value = value
+
+    @nu.cached_property
+    def double(self):
+        '''twice the value'''
+        return 2 * self.value
+
+
+def test_cached_property():
+    nt.ok_(isinstance(_Cached.double, nu.cached_property))
+    nt.eq_(_Cached.double.__doc__, 'twice the value')
+
+    obj = _Cached(1)
+    nt.eq_(obj.double, 2)
+    obj.value = 2
+    nt.eq_(obj.double, 2)
+    nu.invalidate_cache(obj)
+    nt.eq_(obj.double, 4)
+    nu.invalidate_cache(obj)
+    nu.invalidate_cache(obj)
+
+
+def test_cached_property_no_slots():
+    class A(object):
+        @nu.cached_property
+        def dummy(self):
+            return random.random()
+
+    a = A()
+    ref = a.dummy
+    nt.eq_(a.dummy, ref)
+    nt.assert_not_equal(A().dummy, ref)
+    nu.invalidate_cache(a)
+    nt.assert_not_equal(a.dummy, ref)
+
+
+def test_set_caching():
+    obj = _Cached(1)
+    try:
+        nt.ok_(nu.set_caching(False))
+        nt.eq_(obj.double, 2)
+        obj.value = 2
+        nt.eq_(obj.double, 4)
+    finally:
+        nt.ok_(not nu.set_caching(True))
+    obj.value = 3
+    nt.eq_(obj.double, 6)
+    obj.value = 4
+    nt.eq_(obj.double, 6)
+
+
 def test_deprecated():
     @nu.deprecated(msg='Hello')
     def dummy():
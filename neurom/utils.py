@@ -50,6 +50,8 @@ class memoize(object):
             return self + arg
     Obj.add_to(1) # not enough arguments
     Obj.add_to(1, 2) # returns 3, result is not cached
+
+    The values of properties are cached at a lower cost by cached_property.
     """
 
     def __init__(self, func):
@@ -64,7 +66,8 @@ class memoize(object):
             cache = obj.__cache  # pylint: disable=protected-access
         except AttributeError:
             cache = obj.__cache = {}
-        key = (self.func, args[1:], frozenset(kw.items()))
+        # properties, called without arguments, are the common case: the method is the key
+        key = (self.func, args[1:], frozenset(kw.items())) if len(args) > 1 or kw else self.func
         try:
             res = cache[key]
         except KeyError:
@@ -72,6 +75,78 @@ class memoize(object):
         return res
 
 
+_CACHING = {'enabled': True}
+
+
+def set_caching(enabled):
+    '''Turn the caching of the cached_property values on or off
+
+    When caching is off, the values that are not already stored are computed at every
+    access and never stored, which limits the memory used by large populations.
+
+    Returns:
+        whether caching was on before the call
+    '''
+    previous = _CACHING['enabled']
+    _CACHING['enabled'] = bool(enabled)
+    return previous
+
+
+class cached_property(object):
+    """property whose value is computed at the first access and then stored
+
+    The value is stored in the '_cached_<name>' attribute of the instance. Classes
+    with __slots__ must declare it, eg:
+    class Obj(object):
+        __slots__ = ('points', '_cached_length')
+
+        @cached_property
+        def length(self):
+            return compute_length(self.points)
+
+    The stored values are removed with invalidate_cache, which must be called when
+    the data they are computed from is modified.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.attr = '_cached_' + func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, objtype=None):
+        try:
+            return getattr(obj, self.attr)
+        except AttributeError:
+            if obj is None:
+                return self
+            value = self.func(obj)
+            if _CACHING['enabled']:
+                setattr(obj, self.attr, value)
+            return value
+
+
+_CACHED_ATTRIBUTES = {}
+
+
+def _cached_attributes(cls):
+    '''Get the names of the attributes storing the cached_property values of cls'''
+    try:
+        return _CACHED_ATTRIBUTES[cls]
+    except KeyError:
+        attrs = _CACHED_ATTRIBUTES[cls] = tuple(prop.attr
+                                                for klass in cls.__mro__
+                                                for prop in vars(klass).values()
+                                                if isinstance(prop, cached_property))
+        return attrs
+
+
+def invalidate_cache(obj):
+    '''Remove the values of the cached_property of obj'''
+    for attr in _cached_attributes(type(obj)):
+        if hasattr(obj, attr):
+            delattr(obj, attr)
+
+
 def _warn_deprecated(msg):
     '''Issue a deprecation warning'''
     warnings.simplefilter('always', DeprecationWarning)
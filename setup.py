@@ -38,7 +38,7 @@ VERSION = "1.4.6"
 
 REQS = ['enum34>=1.0.4',
         'future>=0.16.0',
-        'h5py==2.7.1',
+        'h5py>=2.9',
         'matplotlib>=1.3.1',
         'numpy>=1.8.0',
         'pylru>=1.0',
@@ -66,6 +66,8 @@ config = {
     'scripts': ['apps/raw_data_check',
                 'apps/morph_check',
                 'apps/morph_stats',
+                'apps/morph_cache',
+                'apps/morph_container',
                 ],
     'name': 'neurom',
     'include_package_data': True,